@@ -0,0 +1,68 @@
+// Client-side region switching for DASHBOARD_CLIENTSIDE=1.
+//
+// The server sends every region's daily series once (see
+// load_region_series in sales_visulaizers.py); switching regions only
+// slices those arrays and fills in the figure templates here.
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    dashboard: {
+        updateRegion: function (region, payload, windowStart, windowEnd, splitDate) {
+            if (!payload) {
+                return Array(8).fill(window.dash_clientside.no_update);
+            }
+
+            const series = payload.series;
+            const view = series.regions[region];
+            let dates = [];
+            let sales = [];
+            let quantity = [];
+            if (view) {
+                dates = view.index === null ? series.dates : view.index.map(function (i) { return series.dates[i]; });
+                sales = view.sales;
+                quantity = view.quantity;
+            }
+
+            // ISO dates compare correctly as strings; the pickers may send
+            // a time part, so only the day is kept.
+            const split = (splitDate || series.split_date).slice(0, 10);
+            const first = windowStart ? windowStart.slice(0, 10) : null;
+            const last = windowEnd ? windowEnd.slice(0, 10) : null;
+            let beforeSales = 0, afterSales = 0, beforeQty = 0, afterQty = 0;
+            for (let i = 0; i < dates.length; i++) {
+                if ((first && dates[i] < first) || (last && dates[i] > last)) {
+                    continue;
+                }
+                if (dates[i] < split) {
+                    beforeSales += sales[i];
+                    beforeQty += quantity[i];
+                } else {
+                    afterSales += sales[i];
+                    afterQty += quantity[i];
+                }
+            }
+
+            function withTrace(template, y) {
+                const figure = JSON.parse(JSON.stringify(template));
+                figure.data[0].x = dates;
+                figure.data[0].y = y;
+                return figure;
+            }
+            function count(value) {
+                return Math.round(value).toLocaleString("en-US");
+            }
+            function dollars(value) {
+                return "$" + count(value);
+            }
+
+            return [
+                withTrace(payload.templates.sales, sales),
+                count(beforeQty + afterQty),
+                count(beforeQty),
+                count(afterQty),
+                dollars(beforeSales + afterSales),
+                dollars(beforeSales),
+                dollars(afterSales),
+                withTrace(payload.templates.quantity, quantity),
+            ];
+        },
+    },
+});
@@ -0,0 +1,487 @@
+"""Query backends behind the dashboard callbacks.
+
+The callbacks only ask for a region's daily series, window totals split
+at a date, the region list and the browser payload, all from one
+``snapshot()`` of the backend so a callback never mixes dataset versions. ``CubeBackend`` (the
+default) answers from an in-memory SalesCube; ``SQLBackend`` keeps the rows
+in an embedded SQLite or DuckDB file and pushes every aggregation down to
+the engine, so datasets larger than memory can be served. Pick one with
+DASHBOARD_BACKEND=cube|mmap|sqlite|duckdb; ``mmap`` is the cube backend
+with its arrays memory-mapped from files shared by all worker processes.
+"""
+import os
+import sqlite3
+import threading
+import time
+import weakref
+from collections import Counter, namedtuple
+
+import numpy as np
+import pandas as pd
+
+import metrics
+import perf_log
+from data_cache import _read_json, _write_json_atomic, cache_dir_for, file_sha256, file_stat
+from dataset_store import DatasetStore, FileWatcher
+from partitions import iter_source_chunks, source_files
+from sales_cube import ALL_REGIONS, WindowTotals
+
+BACKENDS = ("cube", "mmap", "sqlite", "duckdb")
+INGEST_CHUNK_ROWS = 500_000
+
+
+class CubeSnapshot:
+    """One dataset version of a CubeBackend; every answer comes from the same cube."""
+
+    def __init__(self, snapshot):
+        self.version = snapshot.version
+        self.cube = snapshot.cube
+
+    def regions(self):
+        return self.cube.regions
+
+    def daily_series(self, region, start=None, end=None):
+        """Return (dates, sales, quantity) for ``region`` between two days.
+
+        The nearest day outside each bound is included so lines run to the
+        plot border.
+        """
+        view = self.cube.view(region)
+        lo, hi = 0, len(view.dates)
+        if start is not None:
+            lo = max(int(view.dates.searchsorted(pd.Timestamp(start))) - 1, 0)
+        if end is not None:
+            hi = min(int(view.dates.searchsorted(pd.Timestamp(end), side="right")) + 1, len(view.dates))
+        return view.dates[lo:hi], view.sales[lo:hi], view.quantity[lo:hi]
+
+    def split_totals(self, region, split, start=None, end=None):
+        return self.cube.split_totals(region, split, start, end)
+
+    def payload(self):
+        return self.cube.to_payload()
+
+
+class CubeBackend:
+    """Dataset reduced to a SalesCube per version (see DatasetStore).
+
+    With ``shared`` the cube is memory-mapped from disk instead of being
+    built in this process. Callbacks take one ``snapshot()`` and query it
+    throughout; the methods below each answer from the current one.
+    """
+
+    def __init__(self, csv_path, split_date, shared=False):
+        self.csv_path = csv_path
+        self.store = DatasetStore(csv_path, split_date, shared=shared)
+
+    @property
+    def version(self):
+        return self.store.current().version
+
+    def snapshot(self):
+        """The current dataset version as a CubeSnapshot."""
+        return CubeSnapshot(self.store.current())
+
+    def regions(self):
+        return self.snapshot().regions()
+
+    def daily_series(self, region, start=None, end=None):
+        return self.snapshot().daily_series(region, start, end)
+
+    def split_totals(self, region, split, start=None, end=None):
+        return self.snapshot().split_totals(region, split, start, end)
+
+    def payload(self):
+        return self.snapshot().payload()
+
+    def on_swap(self, listener):
+        """Register ``listener()`` to run after a new dataset version is swapped in."""
+        self.store.on_swap(lambda snapshot: listener())
+
+    def start_watching(self, interval=30.0):
+        self.store.start_watching(interval)
+
+    def stop_watching(self):
+        self.store.stop_watching()
+
+
+def _day(value):
+    return pd.Timestamp(value).strftime("%Y-%m-%d")
+
+
+def _where(region, start=None, end=None):
+    clauses, params = [], []
+    if region != ALL_REGIONS:
+        clauses.append("region = ?")
+        params.append(region)
+    if start is not None:
+        clauses.append("date >= ?")
+        params.append(_day(start))
+    if end is not None:
+        clauses.append("date <= ?")
+        params.append(_day(end))
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+
+def _build_sqlite(csv_path, db_path):
+    """Stream the merged CSV into a new SQLite file, a chunk at a time."""
+    con = sqlite3.connect(db_path)
+    try:
+        # The file is written once and then only read, so durability during
+        # the build does not matter; a failed build is simply deleted.
+        con.execute("PRAGMA journal_mode = OFF")
+        con.execute("PRAGMA synchronous = OFF")
+        con.execute("CREATE TABLE sales (date TEXT NOT NULL, region TEXT NOT NULL, sales REAL, quantity INTEGER)")
+        reader = iter_source_chunks(
+            csv_path, INGEST_CHUNK_ROWS, usecols=["Date", "Region", "Sales", "Quantity"],
+            dtype={"Date": str, "Region": str},
+        )
+        for chunk in reader:
+            rows = zip(
+                chunk["Date"].str.slice(0, 10).tolist(),
+                chunk["Region"].str.lower().tolist(),
+                chunk["Sales"].astype(float).tolist(),
+                chunk["Quantity"].astype(np.int64).tolist(),
+            )
+            con.executemany("INSERT INTO sales VALUES (?, ?, ?, ?)", rows)
+        # Covering indexes: every query is answered from the index alone.
+        con.execute("CREATE INDEX sales_region_date ON sales (region, date, sales, quantity)")
+        con.execute("CREATE INDEX sales_date ON sales (date, sales, quantity)")
+        con.execute("ANALYZE")
+        con.commit()
+    finally:
+        con.close()
+
+
+def _build_duckdb(csv_path, db_path):
+    import duckdb
+
+    con = duckdb.connect(db_path)
+    try:
+        # Rows sorted by (region, date) let DuckDB's min/max zone maps skip
+        # row groups outside the requested region and window.
+        con.execute(
+            """
+            CREATE TABLE sales AS
+            SELECT strftime(CAST("Date" AS DATE), '%Y-%m-%d') AS date,
+                   lower("Region") AS region,
+                   CAST("Sales" AS DOUBLE) AS sales,
+                   CAST("Quantity" AS BIGINT) AS quantity
+            FROM read_csv(?, header = true)
+            ORDER BY region, date
+            """,
+            [[str(path) for path in source_files(csv_path)]],
+        )
+    finally:
+        con.close()
+
+
+def _connect_sqlite(db_path):
+    con = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, check_same_thread=False)
+    con.execute("PRAGMA query_only = ON")
+    return con
+
+
+def _connect_duckdb(db_path):
+    import duckdb
+
+    return duckdb.connect(db_path, read_only=True)
+
+
+_ENGINES = {
+    "sqlite": (".sqlite", _build_sqlite, _connect_sqlite),
+    "duckdb": (".duckdb", _build_duckdb, _connect_duckdb),
+}
+
+
+# One database version, replaced as a whole so a query never pairs one
+# version's file with another's region list.
+_SQLState = namedtuple("_SQLState", ["version", "db_path", "regions"])
+
+
+class _Connection:
+    """A thread's connection to one database file, released when it is closed or dropped."""
+
+    def __init__(self, backend, db_path):
+        self.db_path = db_path
+        self.connection = backend._connect(db_path)
+        backend._acquire(db_path)
+        self.close = weakref.finalize(self, _close_connection, self.connection, backend, db_path)
+
+
+def _close_connection(connection, backend, db_path):
+    connection.close()
+    backend._release(db_path)
+
+
+class SQLSnapshot:
+    """One database version of a SQLBackend.
+
+    Every query goes to the same file, which stays on disk while the
+    snapshot is alive even if a reload has swapped in a newer one.
+    """
+
+    def __init__(self, backend, state):
+        self._backend = backend
+        self._state = state
+        self.version = state.version
+        backend._acquire(state.db_path)
+        weakref.finalize(self, backend._release, state.db_path)
+
+    def _fetch(self, sql, params=()):
+        cursor = self._backend._cursor(self._state.db_path)
+        cursor.execute(sql, list(params))
+        return cursor.fetchall()
+
+    def _query_regions(self):
+        return [row[0] for row in self._fetch("SELECT DISTINCT region FROM sales ORDER BY region")]
+
+    def regions(self):
+        return self._state.regions
+
+    def _neighbour(self, region, date, before):
+        where, params = _where(region)
+        op, agg = ("<", "MAX") if before else (">", "MIN")
+        where = f"{where} AND date {op} ?" if where else f" WHERE date {op} ?"
+        return self._fetch(f"SELECT {agg}(date) FROM sales{where}", [*params, _day(date)])[0][0]
+
+    def daily_series(self, region, start=None, end=None):
+        """Return (dates, sales, quantity) for ``region`` between two days.
+
+        The nearest day outside each bound is included so lines run to the
+        plot border, as in CubeBackend.
+        """
+        region = str(region).lower()
+        if start is not None:
+            start = self._neighbour(region, start, before=True) or _day(start)
+        if end is not None:
+            end = self._neighbour(region, end, before=False) or _day(end)
+        where, params = _where(region, start, end)
+        rows = self._fetch(
+            f"SELECT date, SUM(sales), SUM(quantity) FROM sales{where} GROUP BY date ORDER BY date", params
+        )
+        if not rows:
+            return pd.DatetimeIndex([]), np.zeros(0), np.zeros(0, dtype=np.int64)
+        dates, sales, quantity = zip(*rows)
+        return (
+            pd.DatetimeIndex(pd.to_datetime(dates, format="%Y-%m-%d")),
+            np.asarray(sales, dtype=np.float64),
+            np.asarray(quantity, dtype=np.int64),
+        )
+
+    def split_totals(self, region, split, start=None, end=None):
+        """Return (before, after) WindowTotals, computed in a single pass by the engine."""
+        where, params = _where(str(region).lower(), start, end)
+        split = _day(split)
+        row = self._fetch(
+            f"""
+            SELECT COALESCE(SUM(CASE WHEN date < ? THEN sales END), 0),
+                   COALESCE(SUM(CASE WHEN date < ? THEN quantity END), 0),
+                   COUNT(DISTINCT CASE WHEN date < ? THEN date END),
+                   COALESCE(SUM(CASE WHEN date >= ? THEN sales END), 0),
+                   COALESCE(SUM(CASE WHEN date >= ? THEN quantity END), 0),
+                   COUNT(DISTINCT CASE WHEN date >= ? THEN date END)
+            FROM sales{where}
+            """,
+            [split] * 6 + params,
+        )[0]
+        return (
+            WindowTotals(float(row[0]), int(row[1]), int(row[2])),
+            WindowTotals(float(row[3]), int(row[4]), int(row[5])),
+        )
+
+    def payload(self):
+        """Same shape as SalesCube.to_payload, built from per-region queries."""
+        all_dates, all_sales, all_quantity = self.daily_series(ALL_REGIONS)
+        regions = {ALL_REGIONS: {"index": None, "sales": np.round(all_sales, 2).tolist(),
+                                 "quantity": all_quantity.tolist()}}
+        for region in self._state.regions:
+            dates, sales, quantity = self.daily_series(region)
+            dense = len(dates) == len(all_dates)
+            regions[region] = {
+                "index": None if dense else all_dates.searchsorted(dates).tolist(),
+                "sales": np.round(sales, 2).tolist(),
+                "quantity": quantity.tolist(),
+            }
+        return {
+            "dates": all_dates.strftime("%Y-%m-%d").tolist(),
+            "split_date": self._backend.split_date.strftime("%Y-%m-%d"),
+            "regions": regions,
+        }
+
+
+class SQLBackend:
+    """Rows kept in an embedded database file; aggregations run in the engine.
+
+    The database is built from the merged CSV once per content version and
+    stored next to the columnar cache as ``sales-<sha256>.<engine>``. Each
+    thread gets its own read-only connection. A reload builds the new file
+    first and then swaps the whole state in one assignment, so queries never
+    see a half-built database. Each call answers from one ``snapshot()``. A
+    replaced file is deleted once no snapshot or connection refers to it.
+    """
+
+    def __init__(self, csv_path, split_date, engine="sqlite"):
+        if engine not in _ENGINES:
+            raise ValueError(f"unknown SQL engine {engine!r}; expected one of {sorted(_ENGINES)}")
+        if engine == "duckdb":
+            try:
+                import duckdb  # noqa: F401
+            except ImportError as exc:
+                raise RuntimeError("DASHBOARD_BACKEND=duckdb needs the duckdb package") from exc
+        self.csv_path = csv_path
+        self.split_date = pd.Timestamp(split_date)
+        self.engine = engine
+        self._suffix, self._build, self._connect = _ENGINES[engine]
+        self._local = threading.local()
+        self._listeners = []
+        self._lock = threading.Lock()
+        # Guards _state, _users and _retired; reentrant because finalizers
+        # can release a file while it is held.
+        self._files_lock = threading.RLock()
+        self._users = Counter()
+        self._retired = set()
+        self._watcher = FileWatcher(csv_path, self.reload, name=f"{engine}-watcher")
+        self._state = self._load_state()
+        self._prune()
+
+    @property
+    def version(self):
+        return self._state.version
+
+    @property
+    def db_path(self):
+        return self._state.db_path
+
+    def snapshot(self):
+        """The current database version; all of its answers come from one file."""
+        with self._files_lock:
+            return SQLSnapshot(self, self._state)
+
+    def _load_state(self):
+        version, db_path = self._open()
+        regions = SQLSnapshot(self, _SQLState(version, db_path, []))._query_regions()
+        return _SQLState(version, db_path, regions)
+
+    def _open(self):
+        """Return (version, db_path), building the database if the CSV changed."""
+        start = time.perf_counter()
+        cache_dir = cache_dir_for(self.csv_path)
+        pointer = cache_dir / f"{self.engine}.json"
+        stat = file_stat(self.csv_path)
+        current = _read_json(pointer)
+        if current and current["source"] == stat and (cache_dir / current["file"]).exists():
+            metrics.record_cache(self.engine, True)
+            return current["sha256"], str(cache_dir / current["file"])
+
+        sha = file_sha256(self.csv_path)
+        name = f"sales-{sha}{self._suffix}"
+        db_path = cache_dir / name
+        cache_hit = db_path.exists()
+        if not cache_hit:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            staging = cache_dir / f".build-{os.getpid()}-{name}"
+            try:
+                self._build(self.csv_path, str(staging))
+                os.replace(staging, db_path)
+            finally:
+                if staging.exists():
+                    staging.unlink()
+        _write_json_atomic(pointer, {"sha256": sha, "source": stat, "file": name})
+
+        metrics.record_cache(self.engine, cache_hit)
+        metrics.DATASET_LOAD_SECONDS.set(time.perf_counter() - start)
+        metrics.DATASET_BYTES.set(db_path.stat().st_size)
+        perf_log.log_event("dataset_loaded", version=sha, backend=self.engine, built=not cache_hit)
+        return sha, str(db_path)
+
+    def _acquire(self, db_path):
+        with self._files_lock:
+            self._users[db_path] += 1
+
+    def _release(self, db_path):
+        with self._files_lock:
+            self._users[db_path] -= 1
+            if self._users[db_path] <= 0:
+                del self._users[db_path]
+                if db_path in self._retired:
+                    self._delete(db_path)
+
+    def _delete(self, db_path):
+        try:
+            os.unlink(db_path)
+        except FileNotFoundError:
+            pass
+        except OSError:
+            # Still open elsewhere (e.g. another process on Windows); a later start removes it.
+            return
+        self._retired.discard(db_path)
+
+    def _prune(self):
+        """Delete database files of other versions left behind by earlier runs."""
+        with self._files_lock:
+            for entry in cache_dir_for(self.csv_path).glob(f"sales-*{self._suffix}"):
+                if str(entry) != self._state.db_path and not self._users[str(entry)]:
+                    self._delete(str(entry))
+
+    def _cursor(self, db_path):
+        local = self._local
+        held = getattr(local, "held", None)
+        if held is None or held.db_path != db_path:
+            local.held = _Connection(self, db_path)
+            if held is not None:
+                held.close()
+        return local.held.connection.cursor()
+
+    def regions(self):
+        return self._state.regions
+
+    def daily_series(self, region, start=None, end=None):
+        return self.snapshot().daily_series(region, start, end)
+
+    def split_totals(self, region, split, start=None, end=None):
+        return self.snapshot().split_totals(region, split, start, end)
+
+    def payload(self):
+        return self.snapshot().payload()
+
+    def on_swap(self, listener):
+        self._listeners.append(listener)
+        return listener
+
+    def reload(self):
+        """Rebuild the database if the CSV content changed. Returns True on swap."""
+        with self._lock:
+            state = self._load_state()
+            if state.version == self._state.version:
+                return False
+            with self._files_lock:
+                old, self._state = self._state, state
+                self._retired.discard(state.db_path)
+                self._retired.add(old.db_path)
+                if not self._users[old.db_path]:
+                    del self._users[old.db_path]
+                    self._delete(old.db_path)
+        metrics.DATASET_RELOADS.inc()
+        perf_log.log_event("dataset_reload", version=state.version, backend=self.engine)
+        for listener in self._listeners:
+            listener()
+        return True
+
+    def start_watching(self, interval=30.0):
+        self._watcher.start(interval)
+
+    def stop_watching(self):
+        self._watcher.stop()
+
+
+def create(name, csv_path, split_date):
+    """Build the backend called ``name`` (one of BACKENDS) for ``csv_path``."""
+    if name in ("cube", "mmap"):
+        return CubeBackend(csv_path, split_date, shared=name == "mmap")
+    if name in _ENGINES:
+        return SQLBackend(csv_path, split_date, engine=name)
+    raise ValueError(f"unknown backend {name!r}; expected one of {', '.join(BACKENDS)}")
+
+
+def from_env(csv_path, split_date):
+    return create(os.environ.get("DASHBOARD_BACKEND", "cube"), csv_path, split_date)
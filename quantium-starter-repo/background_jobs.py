@@ -0,0 +1,280 @@
+"""Run Dash background callbacks on a local process pool.
+
+``ProcessPoolManager`` is a Dash background-callback manager that needs only
+the standard library: jobs run on a ``concurrent.futures`` process pool and
+results, progress and ``set_props`` updates go through a
+``callback_cache.DiskBackend`` directory, so any worker process on the host
+can answer the browser's polling requests. Files under the store:
+
+    results/*.pkl        job results, progress and set_props updates
+    jobs/<id>.running    a submitted job that has not finished yet
+    jobs/<id>.cancel     a cancelled job; it stores no result
+
+A job superseded by a newer request (Dash passes it as ``oldJob``) is
+dropped from the queue if it has not started; a running job finishes its
+current step but its result is discarded, and jobs reporting progress stop
+at their next ``set_progress`` call.
+
+Jobs run through the same job body as Dash's DiskcacheManager, so the
+callback context, progress, ``set_props`` and error handling match Dash's
+own managers. That body is not public API, so the manager only starts on
+the Dash releases in SUPPORTED_DASH. Metrics recorded inside a job stay in
+its pool process; the serving process records each finished job's
+wall-clock time as callback latency with ``input="background"``.
+
+DASHBOARD_JOBS_DIR sets the store, DASHBOARD_JOB_WORKERS the pool size and
+DASHBOARD_JOB_TIMEOUT (seconds) when an unfinished job is given up on.
+"""
+import concurrent.futures
+import multiprocessing
+import os
+import re
+import tempfile
+import threading
+import time
+import uuid
+from functools import partial
+from pathlib import Path
+
+import dash
+from dash.background_callback.managers import BaseBackgroundCallbackManager
+
+import callback_cache
+import metrics
+
+DEFAULT_DIR = os.path.join(tempfile.gettempdir(), "dashboard-jobs")
+DEFAULT_WORKERS = min(2, os.cpu_count() or 1)
+DEFAULT_TIMEOUT = 300.0
+# Dash releases [low, high) whose job body (see _dash_job_fn) this module
+# runs; outside them the manager refuses to start.
+SUPPORTED_DASH = ((3, 0), (5, 0))
+
+
+class JobCancelled(Exception):
+    """Raised inside a job by ``set_progress`` once the job has been cancelled."""
+
+
+def _marker(directory, job, kind):
+    return Path(directory) / "jobs" / f"{job}.{kind}"
+
+
+def _touch(path):
+    try:
+        path.touch()
+    except OSError:
+        pass
+
+
+class _JobStore:
+    """A job's handle on the result store; once the job is cancelled it stores nothing.
+
+    Writing progress after cancellation raises JobCancelled, which stops a
+    job that reports progress at its next step.
+    """
+
+    def __init__(self, directory, job, result_key):
+        self.results = callback_cache.DiskBackend(Path(directory) / "results")
+        self.cancel_marker = _marker(directory, job, "cancel")
+        self.progress_key = BaseBackgroundCallbackManager._make_progress_key(result_key)
+
+    def cancelled(self):
+        return self.cancel_marker.exists()
+
+    def set(self, key, value):
+        if self.cancelled():
+            if key == self.progress_key:
+                raise JobCancelled(key)
+            return
+        self.results.set(key, value)
+
+
+def _dash_job_fn(fn, store, progress):
+    """Dash's own job body for ``fn`` (callback context, progress, set_props, errors) writing to ``store``.
+
+    This is the one place that relies on Dash internals; check_dash_version
+    guards it.
+    """
+    from dash.background_callback.managers.diskcache_manager import _make_job_fn
+
+    return _make_job_fn(fn, store, progress)
+
+
+def _run_job(fn, progress, directory, job, result_key, args, context):
+    """Body of a job in a pool process; returns (callback name, seconds) for the serving process's metrics."""
+    started = time.perf_counter()
+    store = _JobStore(directory, job, result_key)
+    try:
+        if not store.cancelled():
+            _dash_job_fn(fn, store, progress)(result_key, store.progress_key, args, context)
+    finally:
+        _marker(directory, job, "running").unlink(missing_ok=True)
+        _marker(directory, job, "cancel").unlink(missing_ok=True)
+    return fn.__name__, time.perf_counter() - started
+
+
+def check_dash_version(version=None):
+    """Raise RuntimeError unless the installed Dash (or ``version``) is in SUPPORTED_DASH."""
+    version = version or dash.__version__
+    release = tuple(int(part) for part in re.findall(r"\d+", version)[:2])
+    low, high = SUPPORTED_DASH
+    if not low <= release < high:
+        raise RuntimeError(
+            f"background jobs need dash>={'.'.join(map(str, low))},<{'.'.join(map(str, high))} "
+            f"(installed: {version}); pin Dash or unset DASHBOARD_BACKGROUND"
+        )
+
+
+class ProcessPoolManager(BaseBackgroundCallbackManager):
+    """Background-callback manager backed by a process pool and a shared disk store.
+
+    ``cache_by`` works as for Dash's own managers: when given, results stay
+    in the store (bounded by ``max_entries`` and ``expire`` seconds) and a
+    request whose result is already stored is answered without a new job.
+    """
+
+    def __init__(self, directory=DEFAULT_DIR, workers=DEFAULT_WORKERS, cache_by=None,
+                 expire=None, timeout=DEFAULT_TIMEOUT, max_entries=1024):
+        check_dash_version()
+        self.directory = Path(directory)
+        (self.directory / "jobs").mkdir(parents=True, exist_ok=True)
+        self.results = callback_cache.DiskBackend(self.directory / "results", ttl=expire, max_entries=max_entries)
+        self.workers = workers
+        self.timeout = timeout
+        self._pool = None
+        self._futures = {}
+        self._lock = threading.Lock()
+        super().__init__(cache_by)
+
+    def _executor(self):
+        with self._lock:
+            if self._pool is None:
+                # Fresh interpreters rather than forks of a threaded web worker.
+                self._pool = concurrent.futures.ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._pool
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait, cancel_futures=True)
+
+    def make_job_fn(self, fn, progress, key=None):
+        return partial(_run_job, fn, bool(progress), str(self.directory))
+
+    def call_job_fn(self, key, job_fn, args, context):
+        job = uuid.uuid4().hex
+        if self.cache_by is not None and self.result_ready(key):
+            metrics.BACKGROUND_JOBS.inc(event="cached")
+            return job
+        _touch(_marker(self.directory, job, "running"))
+        try:
+            try:
+                future = self._executor().submit(job_fn, job, key, args, context)
+            except concurrent.futures.process.BrokenProcessPool:
+                self.shutdown(wait=False)
+                future = self._executor().submit(job_fn, job, key, args, context)
+        except BaseException:
+            _marker(self.directory, job, "running").unlink(missing_ok=True)
+            raise
+        with self._lock:
+            self._futures[job] = future
+        future.add_done_callback(partial(self._finished, job))
+        metrics.BACKGROUND_JOBS.inc(event="submitted")
+        return job
+
+    def _finished(self, job, future):
+        with self._lock:
+            self._futures.pop(job, None)
+        # Covers jobs cancelled before they started and crashed pool processes.
+        _marker(self.directory, job, "running").unlink(missing_ok=True)
+        _marker(self.directory, job, "cancel").unlink(missing_ok=True)
+        if not future.cancelled() and future.exception() is None:
+            name, seconds = future.result()
+            metrics.CALLBACK_LATENCY.observe(seconds, callback=name, input="background")
+
+    def terminate_job(self, job):
+        if not job:
+            return
+        job = str(job)
+        if not _marker(self.directory, job, "running").exists():
+            return
+        _touch(_marker(self.directory, job, "cancel"))
+        _marker(self.directory, job, "running").unlink(missing_ok=True)
+        with self._lock:
+            future = self._futures.get(job)
+        if future is not None:
+            future.cancel()
+        metrics.BACKGROUND_JOBS.inc(event="cancelled")
+
+    def job_running(self, job):
+        try:
+            started = _marker(self.directory, str(job), "running").stat().st_mtime
+        except OSError:
+            return False
+        return time.time() - started <= self.timeout
+
+    def terminate_unhealthy_job(self, job):
+        if _marker(self.directory, str(job), "running").exists() and not self.job_running(job):
+            self.terminate_job(job)
+            return True
+        return False
+
+    def get_progress(self, key):
+        progress_key = self._make_progress_key(key)
+        value = self.results.get(progress_key)
+        if value is callback_cache._MISSING:
+            return None
+        self.results.delete(progress_key)
+        return value
+
+    def result_ready(self, key):
+        return self.results.get(key) is not callback_cache._MISSING
+
+    def get_result(self, key, job):
+        value = self.results.get(key)
+        if value is callback_cache._MISSING:
+            return self.UNDEFINED
+        if self.cache_by is None:
+            self.results.delete(key)
+        self.results.delete(self._make_progress_key(key))
+        return value
+
+    def get_updated_props(self, key):
+        props_key = self._make_set_props_key(key)
+        value = self.results.get(props_key)
+        if value is callback_cache._MISSING:
+            return {}
+        self.results.delete(props_key)
+        return value
+
+    def clear_cache_entry(self, key):
+        self.results.delete(key)
+
+    def get_or_create_signing_secret(self, generate):
+        path = self.directory / "signing-secret"
+        try:
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        except FileExistsError:
+            # Another worker created it; wait for its write to land.
+            for _ in range(50):
+                secret = path.read_bytes()
+                if secret:
+                    return secret
+                time.sleep(0.01)
+            return path.read_bytes() or None
+        secret = generate()
+        with os.fdopen(fd, "wb") as f:
+            f.write(secret if isinstance(secret, bytes) else str(secret).encode("utf-8"))
+        return secret
+
+
+def from_env(cache_by=None):
+    """Build a ProcessPoolManager configured from DASHBOARD_JOB* variables."""
+    return ProcessPoolManager(
+        directory=os.environ.get("DASHBOARD_JOBS_DIR") or DEFAULT_DIR,
+        workers=int(os.environ.get("DASHBOARD_JOB_WORKERS", DEFAULT_WORKERS)),
+        timeout=float(os.environ.get("DASHBOARD_JOB_TIMEOUT", DEFAULT_TIMEOUT)),
+        cache_by=cache_by,
+    )
@@ -0,0 +1,271 @@
+"""Load-test the dashboard callback endpoint with simulated users.
+
+Each virtual user replays a region-filter session (open the page, then
+switch regions in a random order) against ``/_dash-update-component``.
+Users run on ``--concurrency`` threads for ``--duration`` seconds; the
+report lists throughput, errors and p50/p95/p99 latency. Everything runs
+locally: by default a server is started from this checkout and stopped
+afterwards. Servers whose region switch is clientside or a background job
+are refused, since a switch there is not one request. Usage:
+
+    python benchmarks/load_test.py --concurrency 16 --duration 30
+    python benchmarks/load_test.py --server gunicorn --workers 4 --max-p95-ms 250
+    python benchmarks/load_test.py --url http://127.0.0.1:8050   # an already running server
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = BENCH_DIR.parent
+
+REGIONS = ["all", "north", "east", "south", "west"]
+# The callback a region switch fires in the default server-side mode, as
+# listed by /_dash-dependencies; run_load reads the live one instead.
+DASHBOARD_DEPENDENCY = {
+    "output": "..sales-graph.figure...total-quantity.children...before-qty.children...after-qty.children"
+              "...total-sales.children...before-sales.children...after-sales.children...quantity-graph.figure..",
+    "inputs": [
+        {"id": "region-filter", "property": "value"},
+        {"id": "sales-graph", "property": "relayoutData"},
+        {"id": "quantity-graph", "property": "relayoutData"},
+        {"id": "kpi-window", "property": "start_date"},
+        {"id": "kpi-window", "property": "end_date"},
+        {"id": "split-date", "property": "date"},
+        {"id": "granularity", "property": "value"},
+    ],
+    "state": [],
+}
+
+# Starts the development server on a given port, warmed up like production.
+_DEV_SERVER = """
+import sys
+import sales_visulaizers as sv
+sv.warm_up()
+sv.app.run(host="127.0.0.1", port=int(sys.argv[1]), debug=False, threaded=True)
+"""
+
+
+def _outputs(output):
+    parts = output[2:-2].split("...") if output.startswith("..") else [output]
+    return [dict(zip(("id", "property"), part.rsplit(".", 1))) for part in parts]
+
+
+def callback_body(region, split_date="2021-01-15", granularity="daily", dependency=DASHBOARD_DEPENDENCY):
+    """Request body Dash sends when ``region-filter`` changes.
+
+    ``dependency`` is the callback's entry from ``/_dash-dependencies``.
+    Inputs other than the region, split date and granularity are sent
+    empty, as on a fresh page.
+    """
+    values = {("region-filter", "value"): region, ("split-date", "date"): split_date,
+              ("granularity", "value"): granularity}
+    return {
+        "output": dependency["output"],
+        "outputs": _outputs(dependency["output"]),
+        "inputs": [dict(item, value=values.get((item["id"], item["property"]))) for item in dependency["inputs"]],
+        "changedPropIds": ["region-filter.value"],
+        "state": [dict(item, value=None) for item in dependency["state"]],
+    }
+
+
+def region_dependency(dependencies):
+    """Pick the callback ``region-filter`` fires from a ``/_dash-dependencies`` list.
+
+    Raises RuntimeError when a switch is not one plain POST: clientside
+    callbacks (DASHBOARD_CLIENTSIDE=1) never reach the server and
+    background ones (DASHBOARD_BACKGROUND) answer with a job to poll.
+    """
+    for dependency in dependencies:
+        if {"id": "region-filter", "property": "value"} not in dependency["inputs"]:
+            continue
+        if dependency.get("clientside_function"):
+            raise RuntimeError("the region switch runs in the browser (DASHBOARD_CLIENTSIDE=1); nothing to load-test")
+        if dependency.get("background"):
+            raise RuntimeError("the region switch is a background job (DASHBOARD_BACKGROUND); "
+                               "load-test the server without it")
+        return dependency
+    raise RuntimeError("no callback takes region-filter.value as an input")
+
+
+def session_regions(rng, length):
+    """One user's region sequence: the initial "all" load, then ``length`` switches."""
+    regions = ["all"]
+    for _ in range(length):
+        regions.append(rng.choice([r for r in REGIONS if r != regions[-1]]))
+    return regions
+
+
+def summarize(latencies, errors, elapsed):
+    """Throughput and latency percentiles (milliseconds) for one run."""
+    report = {
+        "requests": len(latencies),
+        "errors": errors,
+        "seconds": elapsed,
+        "throughput_rps": len(latencies) / elapsed if elapsed else 0.0,
+    }
+    if len(latencies) >= 2:
+        cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+        report.update(
+            p50_ms=cuts[49] * 1000,
+            p95_ms=cuts[94] * 1000,
+            p99_ms=cuts[98] * 1000,
+            max_ms=max(latencies) * 1000,
+        )
+    return report
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_ready(url, process, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f"server exited with status {process.returncode}")
+        try:
+            urllib.request.urlopen(url + "/_dash-layout", timeout=2).read()
+            return
+        except (urllib.error.URLError, ConnectionError, OSError):
+            time.sleep(0.2)
+    raise RuntimeError(f"server at {url} not ready after {timeout}s")
+
+
+def start_server(kind, workers, workdir):
+    """Start a local server (``dev`` or ``gunicorn``) in ``workdir``; return (url, process)."""
+    port = _free_port()
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(PROJECT_ROOT), env.get("PYTHONPATH")]))
+    env["DASHBOARD_RELOAD_INTERVAL"] = "0"
+    if kind == "gunicorn":
+        if shutil.which("gunicorn") is None:
+            raise RuntimeError("--server gunicorn needs gunicorn installed")
+        env["DASHBOARD_BIND"] = f"127.0.0.1:{port}"
+        env["DASHBOARD_WORKERS"] = str(workers)
+        cmd = ["gunicorn", "-c", str(PROJECT_ROOT / "gunicorn.conf.py"), "wsgi:server"]
+    else:
+        cmd = [sys.executable, "-c", _DEV_SERVER, str(port)]
+    # The server logs every request; an unread pipe would fill up and stall it.
+    process = subprocess.Popen(cmd, cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return f"http://127.0.0.1:{port}", process
+
+
+def run_load(url, concurrency, duration, session_length=6, think_ms=0.0, seed=0, timeout=30.0):
+    """Drive ``url`` with ``concurrency`` simulated users for ``duration`` seconds; return the summary.
+
+    The request body is built from the server's ``/_dash-dependencies``, so
+    it follows the callback's current inputs and outputs.
+    """
+    endpoint = url + "/_dash-update-component"
+    with urllib.request.urlopen(url + "/_dash-dependencies", timeout=timeout) as response:
+        dependency = region_dependency(json.load(response))
+    deadline = time.monotonic() + duration
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+
+    def user(index):
+        rng = random.Random(seed * 100003 + index)
+        own, failed = [], 0
+        while time.monotonic() < deadline:
+            for region in session_regions(rng, session_length):
+                if time.monotonic() >= deadline:
+                    break
+                data = json.dumps(callback_body(region, dependency=dependency)).encode("utf-8")
+                request = urllib.request.Request(endpoint, data=data, headers={"Content-Type": "application/json"})
+                start = time.perf_counter()
+                try:
+                    with urllib.request.urlopen(request, timeout=timeout) as response:
+                        response.read()
+                    own.append(time.perf_counter() - start)
+                except (urllib.error.URLError, ConnectionError, OSError):
+                    failed += 1
+                if think_ms:
+                    time.sleep(rng.expovariate(1000.0 / think_ms))
+        with lock:
+            latencies.extend(own)
+            errors[0] += failed
+
+    started = time.monotonic()
+    threads = [threading.Thread(target=user, args=(i,), daemon=True) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return summarize(latencies, errors[0], time.monotonic() - started)
+
+
+def check_gates(report, max_p95_ms=None, max_p99_ms=None, max_error_rate=0.0):
+    """Return the release-gate failures for ``report`` as readable strings."""
+    failures = []
+    total = report["requests"] + report["errors"]
+    if total == 0:
+        return ["no requests completed"]
+    if report["errors"] / total > max_error_rate:
+        failures.append(f"error rate {report['errors'] / total:.2%} > {max_error_rate:.2%}")
+    for key, limit in (("p95_ms", max_p95_ms), ("p99_ms", max_p99_ms)):
+        if limit is not None and report.get(key, float("inf")) > limit:
+            failures.append(f"{key} {report.get(key, float('nan')):.1f} > {limit:.1f}")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="test an already running server instead of starting one")
+    parser.add_argument("--server", choices=["dev", "gunicorn"], default="dev")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="gunicorn workers")
+    parser.add_argument("--workdir", default=str(PROJECT_ROOT), help="directory holding the dataset")
+    parser.add_argument("--concurrency", type=int, default=8, help="simulated users")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds of load")
+    parser.add_argument("--session-length", type=int, default=6, help="region switches per session")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="mean pause between interactions")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-p95-ms", type=float, help="fail if p95 latency exceeds this")
+    parser.add_argument("--max-p99-ms", type=float, help="fail if p99 latency exceeds this")
+    parser.add_argument("--max-error-rate", type=float, default=0.0, help="allowed fraction of failed requests")
+    parser.add_argument("--output", help="also write the report as JSON")
+    args = parser.parse_args(argv)
+
+    process = None
+    url = args.url
+    try:
+        if url is None:
+            url, process = start_server(args.server, args.workers, args.workdir)
+        _wait_ready(url, process, timeout=120)
+        report = run_load(url, args.concurrency, args.duration, args.session_length, args.think_ms, args.seed)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=30)
+
+    report.update(concurrency=args.concurrency, server=args.url or args.server)
+    print(f"{report['requests']:,} requests, {report['errors']} errors in {report['seconds']:.1f}s "
+          f"({report['throughput_rps']:.1f} req/s)")
+    if "p50_ms" in report:
+        print(f"latency ms: p50 {report['p50_ms']:.1f}  p95 {report['p95_ms']:.1f}  "
+              f"p99 {report['p99_ms']:.1f}  max {report['max_ms']:.1f}")
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+
+    failures = check_gates(report, args.max_p95_ms, args.max_p99_ms, args.max_error_rate)
+    for failure in failures:
+        print(f"GATE FAILED: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,193 @@
+"""Benchmark merge throughput, dashboard startup and callback latency.
+
+Each dataset size gets a fresh working directory with synthetic raw files
+(see synthetic_data.py). Results are written as JSON so runs can be
+compared; ``--compare`` exits non-zero when a metric regressed by more
+than ``--tolerance``. Usage:
+
+    python benchmarks/run_benchmarks.py --rows 10000 1000000
+    python benchmarks/run_benchmarks.py --rows 10000 --compare benchmarks/results/<previous>.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = BENCH_DIR.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import merge_file
+from synthetic_data import generate
+
+REGIONS = ["all", "north", "east", "south", "west"]
+
+# Runs inside the dataset's working directory so the dashboard loads the
+# synthetic merged CSV. Importing no longer reads data, so the startup time
+# includes loading the backend. The callback cache is cleared before each timed
+# call so every call does the real work.
+_CALLBACK_SNIPPET = """
+import json, statistics, sys, time
+start = time.perf_counter()
+import sales_visulaizers as sv
+sv.get_backend()
+import_seconds = time.perf_counter() - start
+repeats = int(sys.argv[1])
+regions = sys.argv[2:]
+result = {"import_seconds": import_seconds, "callbacks": {}}
+for region in regions:
+    start = time.perf_counter()
+    sv.update_dashboard(region)
+    first = time.perf_counter() - start
+    samples = []
+    for _ in range(repeats):
+        sv.outputs_cache.invalidate()
+        start = time.perf_counter()
+        sv.update_dashboard(region)
+        samples.append(time.perf_counter() - start)
+    result["callbacks"][region] = {"first_seconds": first, "median_seconds": statistics.median(samples),
+                                   "max_seconds": max(samples)}
+print(json.dumps(result))
+"""
+
+
+def _dashboard_env():
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(PROJECT_ROOT), env.get("PYTHONPATH")]))
+    env["DASHBOARD_RELOAD_INTERVAL"] = "0"
+    env.pop("DASHBOARD_CACHE_DIR", None)
+    return env
+
+
+def _run_snippet(workdir, repeats, regions):
+    out = subprocess.run(
+        [sys.executable, "-c", _CALLBACK_SNIPPET, str(repeats), *regions],
+        cwd=workdir, env=_dashboard_env(), capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def bench_merge(workdir, raw_paths, workers, chunk_size_mb):
+    input_bytes = sum(os.path.getsize(p) for p in raw_paths)
+    start = time.perf_counter()
+    rows = merge_file.merge_files(raw_paths, str(workdir / merge_file.OUTPUT_FILE), chunk_size_mb, workers)
+    seconds = time.perf_counter() - start
+    return {
+        "seconds": seconds,
+        "input_bytes": input_bytes,
+        "output_rows": sum(rows.values()),
+        "mb_per_second": input_bytes / 1e6 / seconds,
+    }
+
+
+def bench_dashboard(workdir, repeats):
+    # The first start builds the columnar cache; the second one reuses it.
+    cold = _run_snippet(workdir, repeats, REGIONS)
+    warm = _run_snippet(workdir, repeats, [])
+    return {
+        "import_cold_cache_seconds": cold["import_seconds"],
+        "import_warm_cache_seconds": warm["import_seconds"],
+        "callbacks": cold["callbacks"],
+    }
+
+
+def run(rows_list, files, workers, chunk_size_mb, repeats):
+    results = {}
+    for rows in rows_list:
+        with tempfile.TemporaryDirectory(prefix=f"bench-{rows}-") as tmp:
+            workdir = Path(tmp)
+            start = time.perf_counter()
+            raw_paths = generate(workdir / "data", rows, files=files)
+            generate_seconds = time.perf_counter() - start
+            results[str(rows)] = {
+                "generate_seconds": generate_seconds,
+                "merge": bench_merge(workdir, raw_paths, workers, chunk_size_mb),
+                "dashboard": bench_dashboard(workdir, repeats),
+            }
+            print(f"{rows:>12,} rows: merge {results[str(rows)]['merge']['seconds']:.2f}s, "
+                  f"import {results[str(rows)]['dashboard']['import_warm_cache_seconds']:.2f}s", flush=True)
+    return results
+
+
+def _git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "HEAD"], cwd=PROJECT_ROOT, capture_output=True, text=True)
+        return out.stdout.strip() or None
+    except OSError:
+        return None
+
+
+def _flatten(prefix, value, out):
+    if isinstance(value, dict):
+        for key, child in value.items():
+            _flatten(f"{prefix}.{key}" if prefix else key, child, out)
+    else:
+        out[prefix] = value
+    return out
+
+
+def compare(current, baseline, tolerance, min_delta=0.005):
+    """Return metrics that got slower than ``baseline`` by more than ``tolerance`` (a fraction).
+
+    Slowdowns smaller than ``min_delta`` seconds are treated as noise.
+    """
+    now = _flatten("", current["results"], {})
+    before = _flatten("", baseline["results"], {})
+    regressions = []
+    for name, value in sorted(now.items()):
+        old = before.get(name)
+        # Data generation is setup, not code under test.
+        if not name.endswith("seconds") or name.endswith("generate_seconds") or not old:
+            continue
+        ratio = value / old
+        if ratio > 1 + tolerance and value - old > min_delta:
+            regressions.append((name, old, value, ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000],
+                        help="dataset sizes to benchmark, 10K to 100M rows")
+    parser.add_argument("--files", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size-mb", type=float, default=merge_file.DEFAULT_CHUNK_SIZE_MB)
+    parser.add_argument("--repeats", type=int, default=20, help="timed callback calls per region")
+    parser.add_argument("--output", help="result file (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--compare", help="earlier result file to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown before failing")
+    parser.add_argument("--min-delta", type=float, default=0.005, help="ignore slowdowns below this many seconds")
+    args = parser.parse_args(argv)
+
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "results": run(args.rows, args.files, args.workers, args.chunk_size_mb, args.repeats),
+    }
+    output = Path(args.output or BENCH_DIR / "results" / f"{time.strftime('%Y%m%d-%H%M%S')}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"Results written to {output}")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        regressions = compare(report, baseline, args.tolerance, args.min_delta)
+        for name, old, new, ratio in regressions:
+            print(f"REGRESSION {name}: {old:.4f}s -> {new:.4f}s ({ratio:.2f}x)")
+        if regressions:
+            return 1
+        print("No regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
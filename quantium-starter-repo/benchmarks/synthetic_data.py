@@ -0,0 +1,74 @@
+"""Generate raw ``daily_sales_data_*.csv``-shaped inputs of any size.
+
+Rows are written in fixed-size chunks, so 100M-row inputs can be produced
+without holding them in memory. Usage:
+
+    python benchmarks/synthetic_data.py OUT_DIR --rows 1000000 --files 3
+"""
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+PRODUCTS = np.array(["pink morsel", "chartreuse morsel", "gold morsel", "magenta morsel", "vermilion morsel"])
+# Price labels are looked up rather than formatted per row; the last
+# entry is Pink Morsels after the price increase.
+PRICE_LABELS = np.array(["$3.00", "$2.50", "$9.99", "$4.25", "$1.75", "$5.00"])
+REGIONS = np.array(["north", "south", "east", "west"])
+START_DATE = "2018-02-06"
+PRICE_INCREASE_DATE = "2021-01-15"
+HEADER = "product,price,quantity,date,region\n"
+
+
+def _chunk(rng, first_row, n_rows, total_rows, days, start):
+    # Dates advance monotonically with the row number, like the real drops.
+    day = (np.arange(first_row, first_row + n_rows, dtype=np.int64) * days) // max(total_rows, 1)
+    dates = start + pd.to_timedelta(day, unit="D")
+    product = rng.integers(0, len(PRODUCTS), n_rows)
+    price = np.where((product == 0) & (dates >= pd.Timestamp(PRICE_INCREASE_DATE)), len(PRICE_LABELS) - 1, product)
+    return pd.DataFrame(
+        {
+            "product": PRODUCTS[product],
+            "price": PRICE_LABELS[price],
+            "quantity": rng.integers(0, 1000, n_rows),
+            "date": dates.strftime("%Y-%m-%d"),
+            "region": REGIONS[rng.integers(0, len(REGIONS), n_rows)],
+        }
+    )
+
+
+def generate(out_dir, rows, files=3, days=1826, seed=0, chunk_rows=1_000_000):
+    """Write ``rows`` raw sales rows spread over ``files`` CSVs in ``out_dir``; return their paths."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp(START_DATE)
+
+    paths = []
+    bounds = np.linspace(0, rows, files + 1).astype(np.int64)
+    for i in range(files):
+        path = out_dir / f"daily_sales_data_{i}.csv"
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(HEADER)
+            for first in range(bounds[i], bounds[i + 1], chunk_rows):
+                n_rows = min(chunk_rows, bounds[i + 1] - first)
+                _chunk(rng, first, n_rows, rows, days, start).to_csv(f, header=False, index=False, lineterminator="\n")
+        paths.append(str(path))
+    return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("out_dir")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--files", type=int, default=3)
+    parser.add_argument("--days", type=int, default=1826, help="length of the generated history")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    for path in generate(args.out_dir, args.rows, args.files, args.days, args.seed):
+        print(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""Memoization of callback outputs keyed by inputs and dataset version.
+
+Memoized functions take a dataset snapshot (see backends) as their first
+argument and are keyed on its ``version``, so an entry is always stored
+under the version its data came from.
+
+Backends are checked in order, so a per-process ``MemoryBackend`` can sit
+in front of a ``DiskBackend`` shared by every worker on the host. Setting
+DASHBOARD_CACHE_DIR enables the disk tier; DASHBOARD_CACHE_TTL (seconds)
+and DASHBOARD_CACHE_SIZE tune expiry and the in-memory entry limit.
+"""
+import functools
+import hashlib
+import inspect
+import os
+import pickle
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+import metrics
+
+_MISSING = object()
+
+
+class MemoryBackend:
+    """Thread-safe LRU with an optional time-to-live."""
+
+    def __init__(self, maxsize=128, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return _MISSING
+            stored_at, value = entry
+            if self.ttl is not None and time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                return _MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class DiskBackend:
+    """Pickled entries in a directory, shareable between worker processes.
+
+    Entries are written atomically and expire by file age. When more than
+    ``max_entries`` files exist the oldest are removed on the next write.
+    """
+
+    def __init__(self, directory, ttl=None, max_entries=1024):
+        self.directory = Path(directory)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key):
+        return self.directory / (hashlib.sha256(repr(key).encode("utf-8")).hexdigest() + ".pkl")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            if self.ttl is not None and time.time() - path.stat().st_mtime > self.ttl:
+                return _MISSING
+            with open(path, "rb") as f:
+                stored_key, value = pickle.load(f)
+        except (OSError, pickle.PickleError, EOFError):
+            return _MISSING
+        return value if stored_key == key else _MISSING
+
+    def set(self, key, value):
+        try:
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump((key, value), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self._path(key))
+            self._prune()
+        except OSError:
+            pass
+
+    def delete(self, key):
+        self._path(key).unlink(missing_ok=True)
+
+    def _prune(self):
+        entries = list(self.directory.glob("*.pkl"))
+        if len(entries) <= self.max_entries:
+            return
+        entries.sort(key=lambda p: p.stat().st_mtime)
+        for path in entries[: len(entries) - self.max_entries]:
+            path.unlink(missing_ok=True)
+
+    def clear(self):
+        for path in self.directory.glob("*.pkl"):
+            path.unlink(missing_ok=True)
+
+
+class CallbackCache:
+    """Memoizes ``func(snapshot, *args)`` on (name, snapshot version, args) across ``backends``."""
+
+    def __init__(self, backends, name="callback"):
+        self.backends = list(backends)
+        self.name = name
+
+    def memoize(self, func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args):
+            # Key on every argument, defaults filled in, so f("all") and
+            # f("all", None) share an entry.
+            bound = signature.bind(*args)
+            bound.apply_defaults()
+            snapshot, *rest = bound.arguments.values()
+            key = (func.__qualname__, tuple(rest), snapshot.version)
+            for i, backend in enumerate(self.backends):
+                value = backend.get(key)
+                if value is not _MISSING:
+                    metrics.record_cache(self.name, True)
+                    # Warm the faster tiers in front of the one that hit.
+                    for faster in self.backends[:i]:
+                        faster.set(key, value)
+                    return value
+            metrics.record_cache(self.name, False)
+            value = func(*args)
+            for backend in self.backends:
+                backend.set(key, value)
+            return value
+
+        wrapper.cache = self
+        return wrapper
+
+    def invalidate(self):
+        for backend in self.backends:
+            backend.clear()
+
+
+def from_env(name="callback"):
+    """Build a CallbackCache configured from DASHBOARD_CACHE_* variables."""
+    ttl = os.environ.get("DASHBOARD_CACHE_TTL")
+    ttl = float(ttl) if ttl else None
+    backends = [MemoryBackend(maxsize=int(os.environ.get("DASHBOARD_CACHE_SIZE", "128")), ttl=ttl)]
+    directory = os.environ.get("DASHBOARD_CACHE_DIR")
+    if directory:
+        backends.append(DiskBackend(directory, ttl=ttl))
+    return CallbackCache(backends, name=name)
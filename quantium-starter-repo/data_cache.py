@@ -0,0 +1,228 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from partitions import read_source, source_files
+
+CACHE_FORMAT = 3
+# Columns of dollar amounts; never narrowed (see compact_frame).
+MONEY_COLUMNS = ("Sales", "Price")
+_CURRENT = "current.json"
+
+
+def file_sha256(path, block_size=1 << 20):
+    """Return the hex SHA-256 of a file, read in fixed-size blocks.
+
+    For a partition directory the digest covers every partition's relative
+    path and content, in order.
+    """
+    digest = hashlib.sha256()
+    root = Path(path)
+    for part in source_files(root):
+        if part != root:
+            digest.update(part.relative_to(root).as_posix().encode("utf-8") + b"\0")
+        with open(part, "rb") as f:
+            for block in iter(lambda: f.read(block_size), b""):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def file_stat(path):
+    """Size and mtime of a file; a partition directory reports its files' total and latest."""
+    if not os.path.isdir(path):
+        st = os.stat(path)
+        return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+    stats = [os.stat(part) for part in source_files(path)]
+    return {
+        "size": sum(st.st_size for st in stats),
+        "mtime_ns": max((st.st_mtime_ns for st in stats), default=0),
+        "files": len(stats),
+    }
+
+
+def cache_dir_for(csv_path):
+    """The cache lives next to the CSV: ``pink_morsels_sales.csv`` -> ``pink_morsels_sales.cache/``."""
+    csv_path = Path(csv_path)
+    return csv_path.with_name(csv_path.stem + ".cache")
+
+
+def _read_json(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_json_atomic(path, payload):
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(payload, f)
+    os.chmod(tmp, 0o644)
+    os.replace(tmp, path)
+
+
+def _resolve_version(csv_path, cache_dir):
+    """Return (sha256, stat, cached, restamp) for the CSV.
+
+    The cheap size/mtime check is tried first; the content hash is only
+    computed when it fails, so touching the CSV without changing it does not
+    force a rebuild. ``cached`` is True when a cache for the current content
+    exists, and ``restamp`` when it was matched by hash under a new stat.
+    """
+    stat = file_stat(csv_path)
+    current = _read_json(cache_dir / _CURRENT)
+    if current and current.get("format") == CACHE_FORMAT:
+        version_dir = cache_dir / current["sha256"]
+        if version_dir.is_dir():
+            if current["source"] == stat:
+                return current["sha256"], stat, True, False
+            sha = file_sha256(csv_path)
+            if sha == current["sha256"]:
+                return sha, stat, True, True
+            return sha, stat, False, False
+    return file_sha256(csv_path), stat, False, False
+
+
+def _write_version(df, cache_dir, sha):
+    """Write every column of ``df`` as a typed .npy file under ``cache_dir/<sha>``."""
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(dir=cache_dir, prefix=".build-"))
+    os.chmod(staging, 0o755)
+    columns = []
+    try:
+        for name in df.columns:
+            series = df[name]
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                np.save(staging / f"{name}.codes.npy", series.cat.codes.to_numpy())
+                columns.append({"name": name, "kind": "categorical", "categories": [str(c) for c in series.cat.categories]})
+            elif pd.api.types.is_numeric_dtype(series) or pd.api.types.is_datetime64_any_dtype(series):
+                np.save(staging / f"{name}.npy", series.to_numpy())
+                columns.append({"name": name, "kind": "array"})
+            else:
+                codes, categories = pd.factorize(series, sort=True)
+                np.save(staging / f"{name}.codes.npy", codes.astype(np.int32))
+                columns.append({"name": name, "kind": "categorical", "categories": [str(c) for c in categories]})
+        _write_json_atomic(staging / "columns.json", columns)
+        target = cache_dir / sha
+        if target.exists():
+            shutil.rmtree(staging, ignore_errors=True)
+        else:
+            os.replace(staging, target)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+
+def _read_version(version_dir, mmap):
+    columns = _read_json(version_dir / "columns.json")
+    mmap_mode = "r" if mmap else None
+    data = {}
+    for column in columns:
+        name = column["name"]
+        if column["kind"] == "array":
+            data[name] = np.load(version_dir / f"{name}.npy", mmap_mode=mmap_mode)
+        else:
+            codes = np.load(version_dir / f"{name}.codes.npy")
+            data[name] = pd.Categorical.from_codes(codes, categories=column["categories"])
+    return pd.DataFrame(data)
+
+
+def _prune(cache_dir, keep):
+    for entry in cache_dir.iterdir():
+        if entry.is_dir() and entry.name != keep and not entry.name.startswith("."):
+            shutil.rmtree(entry, ignore_errors=True)
+
+
+def _is_lossless(values, dtype):
+    narrowed = values.astype(dtype)
+    return np.array_equal(narrowed.astype(values.dtype), values, equal_nan=values.dtype.kind == "f")
+
+
+def compact_frame(df, sort_by="Date"):
+    """Return ``df`` in its smallest lossless in-memory form.
+
+    Text columns are stripped, lower-cased and stored as categoricals, so a
+    region filter compares integer codes instead of strings. Integer and
+    float columns are narrowed only when every value survives the round
+    trip; MONEY_COLUMNS stay float64 because they get summed, and a float32
+    sum drifts by dollars. Rows are sorted by ``sort_by`` so it can serve as
+    a sorted index.
+    """
+    if sort_by in df.columns:
+        df = df.sort_values(sort_by, kind="mergesort", ignore_index=True)
+    compact = {}
+    for name in df.columns:
+        series = df[name]
+        if pd.api.types.is_datetime64_any_dtype(series) or isinstance(series.dtype, pd.CategoricalDtype):
+            compact[name] = series
+        elif pd.api.types.is_integer_dtype(series):
+            compact[name] = pd.to_numeric(series, downcast="integer")
+        elif pd.api.types.is_float_dtype(series) and name not in MONEY_COLUMNS:
+            values = series.to_numpy()
+            compact[name] = series.astype(np.float32) if _is_lossless(values, np.float32) else series
+        elif pd.api.types.is_numeric_dtype(series):
+            compact[name] = series
+        else:
+            compact[name] = series.astype("string").str.strip().str.lower().astype("category")
+    return pd.DataFrame(compact)
+
+
+def memory_report(df):
+    """Return the in-memory size in bytes of the index and each column."""
+    usage = df.memory_usage(deep=True)
+    return {str(name): int(size) for name, size in usage.items()}
+
+
+def _parse_csv(csv_path, date_columns):
+    df = read_source(csv_path)
+    for name in date_columns:
+        df[name] = pd.to_datetime(df[name])
+    return compact_frame(df, sort_by=date_columns[0] if date_columns else None)
+
+
+def load_sales(csv_path="pink_morsels_sales.csv", date_columns=("Date",), mmap=False):
+    """Load the merged sales CSV through a columnar cache written next to it.
+
+    ``csv_path`` may also be a product partition directory (see partitions),
+    in which case only that product's partitions are read.
+
+    The frame comes back compacted (see ``compact_frame``) and indexed by
+    the first of ``date_columns``. The cache is rebuilt only when the CSV
+    content changes. ``df.attrs`` carries the dataset ``version`` (the CSV's
+    SHA-256) and whether the load was a ``cache_hit``. If the cache cannot
+    be written (e.g. a read-only deploy) the CSV is parsed directly.
+    """
+    csv_path = Path(csv_path)
+    cache_dir = cache_dir_for(csv_path)
+    sha, stat, cache_hit, restamp = _resolve_version(csv_path, cache_dir)
+    current = {"format": CACHE_FORMAT, "sha256": sha, "source": stat}
+
+    if cache_hit:
+        df = _read_version(cache_dir / sha, mmap)
+        if restamp:
+            # Same content under a new mtime: remember it so the next start skips hashing.
+            try:
+                _write_json_atomic(cache_dir / _CURRENT, current)
+            except OSError:
+                pass
+    else:
+        df = _parse_csv(csv_path, date_columns)
+        try:
+            _write_version(df, cache_dir, sha)
+            _write_json_atomic(cache_dir / _CURRENT, current)
+            _prune(cache_dir, keep=sha)
+        except OSError:
+            pass
+
+    if date_columns:
+        df = df.set_index(date_columns[0])
+    df.attrs["version"] = sha
+    df.attrs["cache_hit"] = cache_hit
+    return df
@@ -0,0 +1,178 @@
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: builds are not serialised across processes.
+    fcntl = None
+
+import metrics
+import perf_log
+from data_cache import _read_json, _write_json_atomic, cache_dir_for, file_stat, load_sales, memory_report
+from sales_cube import build_cube, load_cube, save_cube
+
+# ``memory_bytes`` is the row-level frame's memory report (data_cache.memory_report)
+# from when the cube was built; the frame itself is not kept.
+Snapshot = namedtuple("Snapshot", ["version", "cube", "loaded_at", "memory_bytes"])
+
+
+def file_signature(path):
+    """Cheap change marker for ``path`` (see data_cache.file_stat), or None if it is missing."""
+    try:
+        return file_stat(path)
+    except OSError:
+        return None
+
+
+@contextmanager
+def _build_lock(cache_dir):
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    with open(cache_dir / ".build.lock", "w") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        yield
+
+
+def open_shared_cube(csv_path, split_date):
+    """Return (version, cube) with the cube memory-mapped from files shared by every process.
+
+    The cube for the CSV's current content is built once and stored in the
+    columnar cache as ``<sha256>/cube/``; later calls, in any process, only
+    map those files read-only, so N workers hold one copy in the page cache
+    and never load the row-level frame. Concurrent builders wait on a file
+    lock rather than all building the same version.
+    """
+    cache_dir = cache_dir_for(csv_path)
+    pointer = cache_dir / "cube.json"
+    stat = file_stat(csv_path)
+    current = _read_json(pointer)
+    if not (current and current["source"] == stat and (cache_dir / current["dir"]).is_dir()):
+        with _build_lock(cache_dir):
+            current = _read_json(pointer)
+            if not (current and current["source"] == stat and (cache_dir / current["dir"]).is_dir()):
+                df = load_sales(csv_path)
+                version = df.attrs["version"]
+                save_cube(build_cube(df, split_date), cache_dir / version / "cube")
+                current = {"sha256": version, "source": stat, "dir": f"{version}/cube"}
+                _write_json_atomic(pointer, current)
+    return current["sha256"], load_cube(cache_dir / current["dir"], split_date)
+
+
+class FileWatcher:
+    """Calls ``on_change()`` from a daemon thread when ``path`` changes.
+
+    A change is only reported once the file's size and mtime have held
+    still for one polling interval, so a merge that is still writing is
+    not picked up half-way. ``on_change`` returning normally marks the
+    current signature as seen; raising keeps the old one so the next
+    change is retried.
+    """
+
+    def __init__(self, path, on_change, name="file-watcher"):
+        self.path = path
+        self.on_change = on_change
+        self.name = name
+        self.seen = file_signature(path)
+        self._thread = None
+        self._stop = threading.Event()
+
+    def _run(self, interval):
+        pending = None
+        while not self._stop.wait(interval):
+            signature = file_signature(self.path)
+            if signature is None or signature == self.seen:
+                pending = None
+                continue
+            if signature != pending:
+                pending = signature
+                continue
+            pending = None
+            try:
+                self.on_change()
+            except Exception as exc:
+                # Keep serving the previous data; retry on the next change.
+                metrics.DATASET_RELOAD_ERRORS.inc()
+                perf_log.log_event("dataset_reload_failed", error=repr(exc))
+            else:
+                self.seen = signature
+
+    def start(self, interval):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(interval,), name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+class DatasetStore:
+    """Holds the current dataset snapshot and swaps in new versions.
+
+    Callbacks take one snapshot per call (see backends.CubeBackend.snapshot)
+    and use it throughout, so they always see one version. Snapshots hold only the cube: the
+    row-level frame is dropped once the cube is built, since callbacks never
+    read it. Reloads happen on a background thread and replace the snapshot
+    reference in a single assignment; no request ever waits on a reload.
+    With ``shared`` the cube is mapped from disk (see open_shared_cube).
+    """
+
+    def __init__(self, csv_path, split_date, shared=False):
+        self.csv_path = csv_path
+        self.split_date = split_date
+        self.shared = shared
+        self._listeners = []
+        self._lock = threading.Lock()
+        self._watcher = FileWatcher(csv_path, self.reload, name="dataset-watcher")
+        self._snapshot = self._load()
+
+    def current(self):
+        return self._snapshot
+
+    def on_swap(self, listener):
+        """Register ``listener(snapshot)`` to run after a new version is swapped in."""
+        self._listeners.append(listener)
+        return listener
+
+    def _load(self):
+        start = time.perf_counter()
+        if self.shared:
+            version, cube = open_shared_cube(self.csv_path, self.split_date)
+            metrics.DATASET_LOAD_SECONDS.set(time.perf_counter() - start)
+            perf_log.log_event("dataset_loaded", version=version, shared=True, days=cube.n_days)
+            return Snapshot(version, cube, time.time(), None)
+        df = load_sales(self.csv_path)
+        cube = build_cube(df, self.split_date)
+        metrics.DATASET_LOAD_SECONDS.set(time.perf_counter() - start)
+        metrics.DATASET_ROWS.set(len(df))
+        metrics.record_cache("dataset", df.attrs["cache_hit"])
+        report = memory_report(df)
+        metrics.DATASET_BYTES.set(sum(report.values()))
+        perf_log.log_event("dataset_loaded", version=df.attrs["version"], rows=len(df), memory_bytes=report)
+        return Snapshot(df.attrs["version"], cube, time.time(), report)
+
+    def reload(self):
+        """Load the CSV and swap it in if its content changed. Returns True on swap."""
+        with self._lock:
+            snapshot = self._load()
+            if snapshot.version == self._snapshot.version:
+                return False
+            self._snapshot = snapshot
+        metrics.DATASET_RELOADS.inc()
+        perf_log.log_event("dataset_reload", version=snapshot.version, days=snapshot.cube.n_days)
+        for listener in self._listeners:
+            listener(snapshot)
+        return True
+
+    def start_watching(self, interval=30.0):
+        """Poll the CSV every ``interval`` seconds and reload it when it changes."""
+        self._watcher.start(interval)
+
+    def stop_watching(self):
+        self._watcher.stop()
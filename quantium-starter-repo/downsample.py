@@ -0,0 +1,78 @@
+"""Point reduction for long time series sent to the browser.
+
+Series with at most DETAIL_POINTS visible points are sent in full; longer
+ones are reduced to DOWNSAMPLE_POINTS with LTTB (the default) or min/max
+bucketing, picked with DASHBOARD_DOWNSAMPLE. Traces with more than
+WEBGL_THRESHOLD points are drawn with WebGL (``scattergl``).
+"""
+import os
+
+import numpy as np
+
+DETAIL_POINTS = int(os.environ.get("DASHBOARD_DETAIL_POINTS", "10000"))
+DOWNSAMPLE_POINTS = int(os.environ.get("DASHBOARD_DOWNSAMPLE_POINTS", "2000"))
+WEBGL_THRESHOLD = int(os.environ.get("DASHBOARD_WEBGL_THRESHOLD", "5000"))
+METHOD = os.environ.get("DASHBOARD_DOWNSAMPLE", "lttb")
+
+
+def lttb_indices(x, y, n_out):
+    """Indices of the ``n_out`` points kept by Largest-Triangle-Three-Buckets.
+
+    The first and last points are always kept; every bucket in between
+    contributes the point forming the largest triangle with the previously
+    kept point and the average of the next bucket.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_lo, next_hi = (edges[i + 1], edges[i + 2]) if i + 2 < len(edges) else (n - 1, n)
+        avg_x = x[next_lo:next_hi].mean()
+        avg_y = y[next_lo:next_hi].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def minmax_indices(y, n_out):
+    """Indices of the minimum and maximum of ``n_out // 2`` equal buckets, in order."""
+    n = len(y)
+    n_buckets = max(1, n_out // 2)
+    if n_out >= n:
+        return np.arange(n)
+    size = -(-n // n_buckets)
+    padded = np.full(n_buckets * size, np.nan)
+    padded[:n] = y
+    buckets = padded.reshape(n_buckets, size)
+    valid = ~np.isnan(buckets).all(axis=1)
+    offsets = np.arange(n_buckets)[valid] * size
+    lows = offsets + np.nanargmin(buckets[valid], axis=1)
+    highs = offsets + np.nanargmax(buckets[valid], axis=1)
+    return np.unique(np.concatenate([lows, highs]))
+
+
+def reduce_series(x, y, x_numeric=None):
+    """Return ``(x, y, trace_type)`` ready for a trace, reduced if too long.
+
+    ``x_numeric`` is the numeric form of ``x`` (e.g. date nanoseconds) used
+    for LTTB's triangle areas; it defaults to ``x``.
+    """
+    n = len(y)
+    if n > DETAIL_POINTS:
+        if METHOD == "minmax":
+            keep = minmax_indices(np.asarray(y, dtype=np.float64), DOWNSAMPLE_POINTS)
+        else:
+            keep = lttb_indices(x if x_numeric is None else x_numeric, y, DOWNSAMPLE_POINTS)
+        x, y = x[keep], y[keep]
+    trace_type = "scattergl" if len(y) > WEBGL_THRESHOLD else "scatter"
+    return x, y, trace_type
@@ -0,0 +1,205 @@
+"""Export every region view of the dashboard as a static HTML bundle.
+
+Each view (both figures as Plotly JSON plus the KPI strings) is computed
+once with the same code the Dash callbacks use. The bundle needs no Python
+to serve; any file server (or the file system) will do:
+
+    snapshot/index.html        page with every view embedded
+    snapshot/plotly.min.js     Plotly, copied from the installed package
+    snapshot/views/<region>.json
+
+Usage:
+
+    python export_snapshot.py --output snapshot
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from types import SimpleNamespace
+
+import plotly
+
+# A one-off export has nothing to watch for.
+os.environ.setdefault("DASHBOARD_RELOAD_INTERVAL", "0")
+
+import sales_visulaizers as sv  # noqa: E402
+
+OUTPUT_DIR = "snapshot"
+KPI_IDS = ["total-quantity", "before-qty", "after-qty", "total-sales", "before-sales", "after-sales"]
+PLOTLY_JS = Path(plotly.__file__).parent / "package_data" / "plotly.min.js"
+
+
+def render_view(region, backend):
+    """Figures (Plotly JSON) and KPI strings for ``region``'s unzoomed view of ``backend`` at full daily detail."""
+    data = backend.snapshot()
+    dates, sales, quantity = data.daily_series(region)
+    days = dates.strftime("%Y-%m-%d").tolist()
+    fig_sales, fig_quantity = sv._build_figures(SimpleNamespace(dates=days, sales=sales, quantity=quantity))
+    return {
+        "region": region,
+        "version": data.version,
+        "kpis": dict(zip(KPI_IDS, sv._dashboard_outputs(data, region))),
+        "figures": {"sales": json.loads(fig_sales.to_json()), "quantity": json.loads(fig_quantity.to_json())},
+    }
+
+
+_worker_backend = None
+
+
+def _init_worker(backend):
+    global _worker_backend
+    _worker_backend = backend
+
+
+def _render_in_worker(region):
+    return render_view(region, _worker_backend)
+
+
+def render_views(regions, backend, workers=1):
+    """Render ``regions`` of ``backend``; return views in order.
+
+    Rendering one view from the cube is cheap, so this runs serially by
+    default. With ``workers`` > 1 the views are rendered in forked
+    processes that share this process's already loaded backend; where fork
+    is unavailable they are rendered serially.
+    """
+    workers = min(workers or 1, len(regions))
+    if workers <= 1 or "fork" not in multiprocessing.get_all_start_methods():
+        return [render_view(region, backend) for region in regions]
+    context = multiprocessing.get_context("fork")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker,
+                             initargs=(backend,)) as pool:
+        return list(pool.map(_render_in_worker, regions))
+
+
+def _script_json(value):
+    # Keep "</script>" inside strings from closing the embedding tag.
+    return json.dumps(value, separators=(",", ":")).replace("</", "<\\/")
+
+
+def render_html(views, inline_plotly=False):
+    """The bundle's index.html for ``views``; ``inline_plotly`` embeds Plotly instead of linking it."""
+    plotly_tag = (
+        f"<script>{PLOTLY_JS.read_text(encoding='utf-8')}</script>" if inline_plotly
+        else '<script src="plotly.min.js"></script>'
+    )
+    kpi_cards = "\n".join(
+        f'<div class="kpi"><div class="value" id="{kpi_id}"></div><div class="label">{label}</div></div>'
+        for kpi_id, label in zip(KPI_IDS, ["Total Quantity", "Qty Pre–Price Increase", "Qty Post–Price Increase",
+                                           "Total Sales", "Pre–Price Increase", "Post–Price Increase"])
+    )
+    snapshot = {"regions": [v["region"] for v in views], "views": {v["region"]: v for v in views}}
+    return _HTML_TEMPLATE.format(
+        plotly_tag=plotly_tag, kpi_cards=kpi_cards, version=views[0]["version"] if views else "",
+        snapshot=_script_json(snapshot),
+    )
+
+
+def export_snapshot(output=OUTPUT_DIR, workers=1, inline_plotly=False, backend=None):
+    """Write the bundle for ``backend`` (default: the configured dataset) to ``output``.
+
+    Any previous export is replaced. Returns the regions written.
+    """
+    backend = backend if backend is not None else sv.get_backend()
+    regions = [sv.ALL_REGIONS, *backend.regions()]
+    views = render_views(regions, backend, workers)
+
+    output = Path(output)
+    staging = output.with_name(f".{output.name}.tmp")
+    shutil.rmtree(staging, ignore_errors=True)
+    (staging / "views").mkdir(parents=True)
+    for view in views:
+        (staging / "views" / f"{view['region']}.json").write_text(json.dumps(view), encoding="utf-8")
+    if not inline_plotly:
+        shutil.copyfile(PLOTLY_JS, staging / "plotly.min.js")
+    (staging / "index.html").write_text(render_html(views, inline_plotly), encoding="utf-8")
+    shutil.rmtree(output, ignore_errors=True)
+    staging.rename(output)
+    return regions
+
+
+_HTML_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>Soul Foods · Pink Morsels</title>
+{plotly_tag}
+<style>
+body {{ font-family: Inter, -apple-system, BlinkMacSystemFont, sans-serif; background: #f8fafc; margin: 0; padding: 48px 24px; color: #334155; }}
+main {{ max-width: 1200px; margin: 0 auto; }}
+h1 {{ font-size: 28px; font-weight: 700; color: #0f172a; letter-spacing: -0.02em; margin: 0 0 8px; }}
+header {{ margin-bottom: 32px; padding-bottom: 24px; border-bottom: 1px solid #e2e8f0; }}
+header p {{ font-size: 15px; color: #64748b; }}
+#regions label {{ margin-right: 16px; font-size: 14px; cursor: pointer; }}
+.kpis {{ display: flex; gap: 20px; margin: 24px 0 32px; flex-wrap: wrap; }}
+.kpi {{ flex: 1; min-width: 160px; padding: 24px; background: white; border-radius: 12px; border: 1px solid #f1f5f9; box-shadow: 0 1px 3px rgba(0,0,0,0.06); }}
+.kpi .value {{ font-size: 24px; font-weight: 700; color: #0f172a; margin-bottom: 4px; }}
+.kpi .label {{ font-size: 13px; color: #64748b; font-weight: 500; }}
+.chart {{ background: white; border-radius: 16px; padding: 28px; border: 1px solid #f1f5f9; box-shadow: 0 1px 3px rgba(0,0,0,0.06); margin-bottom: 32px; }}
+</style>
+</head>
+<body>
+<main>
+<header>
+<h1>Soul Foods · Pink Morsels</h1>
+<p>Sales performance before and after the January 15th, 2021 price increase. Dataset version {version}.</p>
+</header>
+<div id="regions"></div>
+<div class="kpis">
+{kpi_cards}
+</div>
+<div class="chart"><div id="sales-graph"></div></div>
+<div class="chart"><div id="quantity-graph"></div></div>
+</main>
+<script>
+const SNAPSHOT = {snapshot};
+const CONFIG = {{displaylogo: false, responsive: true}};
+
+function show(region) {{
+    const view = SNAPSHOT.views[region] || SNAPSHOT.views[SNAPSHOT.regions[0]];
+    for (const [id, text] of Object.entries(view.kpis)) {{
+        document.getElementById(id).textContent = text;
+    }}
+    Plotly.react("sales-graph", view.figures.sales.data, view.figures.sales.layout, CONFIG);
+    Plotly.react("quantity-graph", view.figures.quantity.data, view.figures.quantity.layout, CONFIG);
+    document.getElementById("region-" + view.region).checked = true;
+    history.replaceState(null, "", "#" + view.region);
+}}
+
+const picker = document.getElementById("regions");
+for (const region of SNAPSHOT.regions) {{
+    const label = document.createElement("label");
+    const input = document.createElement("input");
+    input.type = "radio";
+    input.name = "region";
+    input.id = "region-" + region;
+    input.addEventListener("change", () => show(region));
+    label.append(input, " " + region[0].toUpperCase() + region.slice(1));
+    picker.append(label);
+}}
+show(location.hash.slice(1));
+</script>
+</body>
+</html>
+"""
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export every dashboard region view as a static HTML bundle.")
+    parser.add_argument("--output", default=OUTPUT_DIR, help=f"bundle directory (default: {OUTPUT_DIR})")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="forked processes rendering views (default: 1, render serially)")
+    parser.add_argument("--inline-plotly", action="store_true",
+                        help="embed Plotly in index.html so the page is a single file")
+    args = parser.parse_args(argv)
+
+    regions = export_snapshot(args.output, args.workers, args.inline_plotly)
+    print(f"Snapshot written to {args.output} ({len(regions)} views: {', '.join(regions)})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+"""gunicorn settings for ``gunicorn -c gunicorn.conf.py wsgi:server``.
+
+The master prepares the dataset once before forking; workers then map the
+prepared files, so they start quickly and share one copy of the data.
+"""
+import multiprocessing
+import os
+
+os.environ.setdefault("DASHBOARD_BACKEND", "mmap")
+
+bind = os.environ.get("DASHBOARD_BIND", "0.0.0.0:8050")
+workers = int(os.environ.get("DASHBOARD_WORKERS", multiprocessing.cpu_count()))
+threads = int(os.environ.get("DASHBOARD_THREADS", "4"))
+timeout = 60
+
+
+def on_starting(server):
+    import sales_visulaizers
+
+    sales_visulaizers.prepare_dataset()
+
+
+def post_worker_init(worker):
+    import sales_visulaizers
+
+    sales_visulaizers.warm_up()
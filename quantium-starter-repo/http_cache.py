@@ -0,0 +1,121 @@
+"""Compression and ETags for Dash callback responses.
+
+``install`` hooks a Dash app's Flask server so ``/_dash-update-component``
+responses are:
+
+* compressed with brotli (when the ``brotli`` package is installed) or gzip,
+  whichever the client prefers, once the body reaches
+  DASHBOARD_COMPRESS_MIN_BYTES (default 1024; DASHBOARD_COMPRESS=0 turns
+  compression off);
+* tagged with a strong ETag derived from the dataset version and the
+  request body (inputs, outputs and the triggering input), with a suffix
+  per content encoding.
+
+A request carrying a matching ``If-None-Match`` gets ``304 Not Modified``
+before the callback runs, so a reverse proxy that caches callback POSTs
+(keyed on the body) can revalidate without the server redoing any work.
+Background-callback requests are left alone: their bodies carry job handles
+rather than outputs.
+"""
+import gzip
+import hashlib
+import json
+import os
+
+try:
+    import brotli
+except ImportError:  # gzip only.
+    brotli = None
+
+COMPRESS = os.environ.get("DASHBOARD_COMPRESS", "1") != "0"
+MIN_BYTES = int(os.environ.get("DASHBOARD_COMPRESS_MIN_BYTES", "1024"))
+GZIP_LEVEL = 6
+# Dynamic responses favour speed over the last few percent of ratio.
+BROTLI_QUALITY = 5
+
+_ENCODINGS = {"gzip": "gz", "br": "br"}
+_BACKGROUND_ARGS = ("cacheKey", "job", "oldJob", "cancelJob")
+
+
+def compress(data, encoding):
+    """Compress ``data`` with ``"gzip"`` or ``"br"``."""
+    if encoding == "br":
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def choose_encoding(accept_encodings):
+    """The encoding to send given a werkzeug ``Accept-Encoding`` header, or None."""
+    offered = ["br", "gzip"] if brotli is not None else ["gzip"]
+    return accept_encodings.best_match(offered)
+
+
+def request_etag(version, body):
+    """Strong ETag (without quotes) for a callback request body against dataset ``version``."""
+    canonical = json.dumps(body, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(f"{version}\n{canonical}".encode("utf-8")).hexdigest()[:32]
+
+
+def _variants(etag):
+    return {etag, *(f"{etag}-{suffix}" for suffix in _ENCODINGS.values())}
+
+
+def install(app, version_fn, min_bytes=MIN_BYTES, compress_responses=COMPRESS):
+    """Add ETag/304 handling and compression to ``app``'s callback endpoint.
+
+    ``version_fn`` returns the current dataset version; a new version
+    changes every ETag.
+    """
+    from flask import g, request
+
+    server = app.server
+
+    def _cacheable():
+        if request.method != "POST" or not request.path.endswith("/_dash-update-component"):
+            return None
+        if any(arg in request.args for arg in _BACKGROUND_ARGS):
+            return None
+        body = request.get_json(silent=True)
+        if not isinstance(body, dict):
+            return None
+        callback = app.callback_map.get(body.get("output"), {})
+        if callback.get("background"):
+            return None
+        return body
+
+    @server.before_request
+    def _check_etag():
+        body = _cacheable()
+        if body is None:
+            return None
+        etag = request_etag(version_fn(), body)
+        g.callback_etag = etag
+        matched = set(request.if_none_match.as_set()) & _variants(etag)
+        if matched:
+            response = server.response_class(status=304)
+            response.set_etag(matched.pop())
+            response.headers["Cache-Control"] = "no-cache"
+            response.vary.add("Accept-Encoding")
+            return response
+        return None
+
+    @server.after_request
+    def _encode(response):
+        if not request.path.endswith("/_dash-update-component") or response.status_code != 200:
+            return response
+        if response.direct_passthrough or response.is_streamed or "Content-Encoding" in response.headers:
+            return response
+        etag = g.pop("callback_etag", None)
+        encoding = choose_encoding(request.accept_encodings) if compress_responses else None
+        if encoding is not None:
+            data = response.get_data()
+            if len(data) >= min_bytes:
+                response.set_data(compress(data, encoding))
+                response.headers["Content-Encoding"] = encoding
+            else:
+                encoding = None
+            response.vary.add("Accept-Encoding")
+        if etag is not None:
+            response.set_etag(f"{etag}-{_ENCODINGS[encoding]}" if encoding else etag)
+            response.headers["Cache-Control"] = "no-cache"
+        return response
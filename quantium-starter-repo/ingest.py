@@ -0,0 +1,159 @@
+"""Schema-checked parsing of raw daily sales files.
+
+Only the columns in ``RAW_SCHEMA`` are read, whatever else a file holds.
+Chunks are first parsed on a fast path with declared dtypes (quantity
+read straight into int64). Prices are converted from ``$1.23`` strings and
+dates are checked against ``YYYY-MM-DD``, each as one vectorised step per
+column. A chunk that fails anywhere takes a slow path: lines of the wrong
+width are set aside, the rest is re-read as text and every value is
+checked. Rows that cannot be used are returned as quarantine records
+rather than raising or turning into NaN:
+
+    (line index within the chunk, reason, raw line)
+
+Chunks are parsed with pyarrow's CSV reader when pyarrow is installed,
+otherwise (or with ``engine="c"``) with pandas' C parser.
+"""
+import csv
+import io
+import warnings
+from collections import namedtuple
+
+import pandas as pd
+
+try:
+    import pyarrow
+    import pyarrow.csv
+except ImportError:  # engine="c" only.
+    pyarrow = None
+
+# Column -> kind. Every kind but "str" is converted, and its values checked.
+RAW_SCHEMA = {"product": "str", "price": "currency", "quantity": "int64", "date": "date", "region": "str"}
+ENGINES = ("c", "pyarrow")
+DEFAULT_ENGINE = "pyarrow" if pyarrow is not None else "c"
+QUARANTINE_COLUMNS = ["file", "line", "reason", "row"]
+
+ParsedChunk = namedtuple("ParsedChunk", ["frame", "quarantine"])
+
+
+def check_header(header, path=""):
+    """Raise ValueError if ``header`` lacks a column of RAW_SCHEMA."""
+    missing = [column for column in RAW_SCHEMA if column not in header]
+    if missing:
+        raise ValueError(f"{path or 'raw file'} has no {', '.join(missing)} column(s); header is {header}")
+
+
+def _read(data, header, dtypes, engine, strict=True):
+    """Read the RAW_SCHEMA columns of headerless CSV ``data``.
+
+    With ``strict`` a row of the wrong width raises instead of being padded.
+    """
+    columns = list(RAW_SCHEMA)
+    if engine == "pyarrow":
+        if pyarrow is None:
+            raise RuntimeError("engine='pyarrow' needs the pyarrow package")
+        types = {c: (pyarrow.int64() if dtypes[c] == "int64" else pyarrow.string()) for c in columns}
+        table = pyarrow.csv.read_csv(
+            io.BytesIO(data),
+            read_options=pyarrow.csv.ReadOptions(column_names=header, use_threads=False),
+            convert_options=pyarrow.csv.ConvertOptions(column_types=types, include_columns=columns,
+                                                       strings_can_be_null=True),
+        )
+        return table.to_pandas()
+    # Reading every column lets short rows show up as a missing last field;
+    # usecols would hide them. Long rows raise, or warn if all are long.
+    with warnings.catch_warnings():
+        warnings.simplefilter("error" if strict else "ignore", pd.errors.ParserWarning)
+        try:
+            frame = pd.read_csv(io.BytesIO(data), header=None, names=header, dtype=dtypes, index_col=False,
+                                on_bad_lines="error")
+        except pd.errors.ParserWarning as warning:
+            raise ValueError(str(warning)) from None
+    if strict and frame[header[-1]].isna().any():
+        raise ValueError("row with missing fields")
+    return frame[columns]
+
+
+def _valid_dates(date):
+    """Mask of ``date`` values that are real days written as YYYY-MM-DD."""
+    # Sales files repeat each day many times; check every distinct value once.
+    days = date.drop_duplicates()
+    parsed = pd.to_datetime(days, format="%Y-%m-%d", errors="coerce")
+    valid = days[parsed.notna().to_numpy() & (days.str.len() == 10).to_numpy()]
+    return date.isin(valid)
+
+
+def _missing(values):
+    return values.isna() | (values == "")
+
+
+def _convert(frame):
+    """Typed columns plus a Series of reasons (None where the row is valid)."""
+    price = pd.to_numeric(frame["price"].str.removeprefix("$"), errors="coerce")
+    quantity = pd.to_numeric(frame["quantity"], errors="coerce")
+    reason = pd.Series(None, index=frame.index, dtype=object)
+    checks = [
+        ("missing product", _missing(frame["product"])),
+        ("bad price", price.isna()),
+        ("bad quantity", quantity.isna() | (quantity % 1 != 0)),
+        ("bad date", ~_valid_dates(frame["date"])),
+        ("missing region", _missing(frame["region"])),
+    ]
+    # Report the first failing column of each row.
+    for label, failed in reversed(checks):
+        reason[failed.fillna(True).to_numpy()] = label
+    return frame.assign(price=price, quantity=quantity), reason
+
+
+def parse_chunk(data, header, engine=DEFAULT_ENGINE):
+    """Parse headerless raw CSV bytes laid out as ``header`` into RAW_SCHEMA columns.
+
+    Returns a ParsedChunk of the valid rows (``price`` float, ``quantity``
+    int64, ``date`` an ISO string) and quarantine records for the rest.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"unknown parser engine {engine!r}; expected one of {ENGINES}")
+    declared = {c: ("int64" if kind == "int64" else "str") for c, kind in RAW_SCHEMA.items()}
+    try:
+        with warnings.catch_warnings():
+            # A non-integer quantity fails the int64 read; the slow path reports it.
+            warnings.simplefilter("ignore", RuntimeWarning)
+            frame = _read(data, header, declared, engine)
+        price = frame["price"].str.removeprefix("$").astype(float)
+        # pyarrow reads an empty quantity as null and the column as float.
+        if not (frame["quantity"].dtype != "int64" or price.isna().any() or _missing(frame["product"]).any()
+                or _missing(frame["region"]).any() or not _valid_dates(frame["date"]).all()):
+            return ParsedChunk(frame.assign(price=price), [])
+    except (ValueError, pd.errors.ParserError):
+        pass
+    return _parse_checked(data, header, engine)
+
+
+def _parse_checked(data, header, engine):
+    """Slow path: read everything as text and quarantine what does not fit RAW_SCHEMA."""
+    lines = data.decode("utf-8").split("\n")
+    if lines and lines[-1] == "":
+        lines.pop()
+    lines = [line.rstrip("\r") for line in lines]
+
+    quarantine, row_lines = [], []
+    for i, line in enumerate(lines):
+        if not line.strip():
+            continue
+        width = len(next(csv.reader([line])))
+        if width == len(header):
+            row_lines.append(i)
+        else:
+            quarantine.append((i, f"expected {len(header)} fields, saw {width}", line))
+
+    kept = "".join(lines[i] + "\n" for i in row_lines).encode("utf-8")
+    if kept:
+        frame = _read(kept, header, dict.fromkeys(header, "str"), engine, strict=False)
+    else:
+        frame = pd.DataFrame({c: pd.Series(dtype="str") for c in RAW_SCHEMA})
+    typed, reason = _convert(frame)
+    invalid = reason.notna().to_numpy()
+    quarantine += [(row_lines[pos], reason.iat[pos], lines[row_lines[pos]]) for pos in invalid.nonzero()[0]]
+    quarantine.sort()
+    clean = typed[~invalid].reset_index(drop=True)
+    return ParsedChunk(clean.assign(quantity=clean["quantity"].astype("int64")), quarantine)
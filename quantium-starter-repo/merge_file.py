@@ -1,31 +1,434 @@
+import argparse
+import glob
+import json
+import os
+import re
+import shutil
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
 import pandas as pd
 
-files = [
-    "data/daily_sales_data_0.csv",
-    "data/daily_sales_data_1.csv",
-    "data/daily_sales_data_2.csv"
-]
+import ingest
+import rollups
+from data_cache import file_sha256, file_stat
+from partitions import PARTITIONS_DIR, partition_path, product_slug, read_source
+
+INPUT_PATTERN = "data/daily_sales_data_*.csv"
+OUTPUT_FILE = "pink_morsels_sales.csv"
+MANIFEST_FORMAT = 1
+OUTPUT_COLUMNS = ["Sales", "Quantity", "Price", "Date", "Region"]
+DEFAULT_CHUNK_SIZE_MB = 64
 
-processed_dfs = []
+# One processed byte range of a source file; ``quarantine`` holds
+# ingest.parse_chunk records and ``lines`` the range's line count.
+ChunkResult = namedtuple("ChunkResult", ["path", "text", "rows", "totals", "quarantine", "lines"])
 
-for file in files:
-    df = pd.read_csv(file)
 
-    # Keep only Pink Morsels
-    df = df[df["product"] == "pink morsel"]
+def process_frame(df, product="pink morsel"):
+    """Turn raw daily sales rows into the merged format.
 
+    ``price`` may still be "$1.23" text or already parsed (see ingest.py).
+    Only ``product`` rows are kept; with ``product=None`` every row is kept
+    and a ``Product`` column is added in front.
+    """
+    if product is not None:
+        df = df[df["product"] == product].copy()
+    else:
+        df = df.copy()
 
-    df["price"] = df["price"].str.replace("$", "", regex=False).astype(float)
+    if not pd.api.types.is_numeric_dtype(df["price"]):
+        df["price"] = df["price"].str.replace("$", "", regex=False).astype(float)
     df["Sales"] = df["quantity"] * df["price"]
 
-    df = df[["Sales", "quantity", "price", "date", "region"]]
-    df.rename(columns={"date": "Date", "region": "Region", "quantity": "Quantity", "price": "Price"}, inplace=True)
+    columns = ["Sales", "quantity", "price", "date", "region"]
+    if product is None:
+        columns.insert(0, "product")
+    df = df[columns]
+    return df.rename(columns={"date": "Date", "region": "Region", "quantity": "Quantity", "price": "Price",
+                              "product": "Product"})
+
+
+def _has_quotes(f, start, block_size=1 << 20):
+    f.seek(start)
+    while True:
+        block = f.read(block_size)
+        if not block:
+            return False
+        if b'"' in block:
+            return True
+
+
+def split_file(path, chunk_size):
+    """Return the header columns and (start, end) byte ranges covering the data rows.
+
+    Each range is about ``chunk_size`` bytes and ends on a line boundary, so
+    it can be parsed on its own without reading the rest of the file.
+    Boundaries assume one row per line; a file with any quote character
+    (whose quoted fields may hold newlines) is returned as a single range.
+    A UTF-8 byte order mark before the header is dropped.
+    """
+    ranges = []
+    with open(path, "rb") as f:
+        header = f.readline().decode("utf-8-sig").strip().split(",")
+        start = f.tell()
+        size = os.fstat(f.fileno()).st_size
+        if start < size and _has_quotes(f, start):
+            return header, [(start, size)]
+        while start < size:
+            f.seek(min(start + chunk_size, size))
+            f.readline()
+            end = f.tell()
+            ranges.append((start, end))
+            start = end
+    return header, ranges
+
+
+def _partition_texts(df):
+    """Split a processed all-products chunk into ``{(product, month): csv_text}``."""
+    months = df["Date"].astype(str).str.slice(0, 7)
+    texts = {}
+    for (product, month), group in df.groupby([df["Product"], months], sort=False):
+        texts[product, month] = group[OUTPUT_COLUMNS].to_csv(index=False, header=False, lineterminator="\n")
+    return texts
+
+
+def _process_range(path, header, start, end, partitioned=False, engine=ingest.DEFAULT_ENGINE):
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    raw, quarantine = ingest.parse_chunk(data, header, engine)
+    lines = data.count(b"\n") + (0 if data.endswith(b"\n") else 1)
+    if partitioned:
+        df = process_frame(raw, product=None)
+        text = _partition_texts(df)
+    else:
+        df = process_frame(raw)
+        text = df.to_csv(index=False, header=False, lineterminator="\n")
+    return ChunkResult(path, text, len(df), rollups.daily_totals(df), quarantine, lines)
+
+
+def _ordered_results(tasks, workers):
+    """Run tasks on a process pool and yield results in submission order.
+
+    At most ``2 * workers`` chunks are in flight, which bounds memory by the
+    chunk size rather than by the input volume.
+    """
+    if workers <= 1:
+        for task in tasks:
+            yield _process_range(*task)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for task in tasks:
+            pending.append(pool.submit(_process_range, *task))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _write_chunks(write, paths, chunk_size_mb, workers, partitioned=False, totals=None,
+                  engine=ingest.DEFAULT_ENGINE, quarantine=None):
+    """Pass every processed chunk of ``paths`` to ``write``; return rows written per path.
+
+    Each chunk's daily totals (see rollups.daily_totals) are appended to
+    ``totals`` when a list is given, and its malformed rows to
+    ``quarantine`` as (path, line number in the file, reason, raw row).
+    """
+    workers = workers or os.cpu_count() or 1
+    chunk_size = max(1, int(chunk_size_mb * 1024 * 1024))
+
+    def tasks():
+        for path in paths:
+            header, ranges = split_file(path, chunk_size)
+            ingest.check_header(header, path)
+            for start, end in ranges:
+                yield path, header, start, end, partitioned, engine
+
+    rows = dict.fromkeys(paths, 0)
+    # Line number of each path's next chunk; line 1 is the header.
+    next_line = dict.fromkeys(paths, 2)
+    for chunk in _ordered_results(tasks(), workers):
+        write(chunk.text)
+        rows[chunk.path] += chunk.rows
+        if totals is not None:
+            totals.append(chunk.totals)
+        if quarantine is not None:
+            first = next_line[chunk.path]
+            quarantine.extend((chunk.path, first + line, reason, row) for line, reason, row in chunk.quarantine)
+        next_line[chunk.path] += chunk.lines
+    return rows
+
+
+class _PartitionWriter:
+    """Appends chunk texts to ``root``'s partition files, writing headers for new ones."""
+
+    def __init__(self, root):
+        self.root = Path(root)
+
+    def write(self, texts):
+        for (product, month), text in texts.items():
+            path = partition_path(self.root, product, month)
+            if not path.exists():
+                path.parent.mkdir(parents=True, exist_ok=True)
+                text = ",".join(OUTPUT_COLUMNS) + "\n" + text
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(text)
+
+
+def merge_files(paths, output=OUTPUT_FILE, chunk_size_mb=DEFAULT_CHUNK_SIZE_MB, workers=None, totals=None,
+                engine=ingest.DEFAULT_ENGINE, quarantine=None):
+    """Stream ``paths`` through process_frame into ``output``, chunk by chunk.
+
+    The output is written to a temporary file and moved into place once
+    complete, so readers never see a half-written merge.
+    """
+    tmp_output = str(output) + ".tmp"
+    with open(tmp_output, "w", encoding="utf-8") as out:
+        out.write(",".join(OUTPUT_COLUMNS) + "\n")
+        rows = _write_chunks(out.write, paths, chunk_size_mb, workers, totals=totals, engine=engine,
+                             quarantine=quarantine)
+    os.replace(tmp_output, output)
+    return rows
+
+
+def append_files(paths, output=OUTPUT_FILE, chunk_size_mb=DEFAULT_CHUNK_SIZE_MB, workers=None, totals=None,
+                 engine=ingest.DEFAULT_ENGINE, quarantine=None):
+    """Stream ``paths`` onto the end of an existing merged ``output``."""
+    with open(output, "a", encoding="utf-8") as out:
+        return _write_chunks(out.write, paths, chunk_size_mb, workers, totals=totals, engine=engine,
+                             quarantine=quarantine)
+
+
+def merge_partitioned(paths, root=PARTITIONS_DIR, chunk_size_mb=DEFAULT_CHUNK_SIZE_MB, workers=None, totals=None,
+                      engine=ingest.DEFAULT_ENGINE, quarantine=None):
+    """Write every product of ``paths`` into ``root/product=<slug>/month=<YYYY-MM>/`` in one pass.
+
+    The tree is built in a staging directory and each product directory is
+    then swapped in, so readers see either the old or the new partitions of
+    a product. Caches written next to the partitions are left alone.
+    """
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    staging = root / f".staging-{os.getpid()}"
+    shutil.rmtree(staging, ignore_errors=True)
+    try:
+        rows = _write_chunks(_PartitionWriter(staging).write, paths, chunk_size_mb, workers, partitioned=True,
+                             totals=totals, engine=engine, quarantine=quarantine)
+        built = {p.name for p in staging.glob("product=*")}
+        for old in root.glob("product=*"):
+            if old.is_dir() and not old.name.endswith(".cache") and old.name not in built:
+                shutil.rmtree(old)
+        for name in sorted(built):
+            target = root / name
+            if target.exists():
+                retired = root / f".retired-{os.getpid()}-{name}"
+                os.replace(target, retired)
+                os.replace(staging / name, target)
+                shutil.rmtree(retired)
+            else:
+                os.replace(staging / name, target)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+    return rows
+
+
+def append_partitioned(paths, root=PARTITIONS_DIR, chunk_size_mb=DEFAULT_CHUNK_SIZE_MB, workers=None, totals=None,
+                       engine=ingest.DEFAULT_ENGINE, quarantine=None):
+    """Append the rows of ``paths`` to the matching partitions under ``root``."""
+    return _write_chunks(_PartitionWriter(root).write, paths, chunk_size_mb, workers, partitioned=True,
+                         totals=totals, engine=engine, quarantine=quarantine)
+
+
+def update_rollups(output, chunk_totals=(), partitioned=False, rebuild=False):
+    """Bring the rollups next to ``output`` up to date with newly merged rows.
+
+    ``chunk_totals`` are the daily totals of the merged chunks. With
+    ``rebuild`` they cover the whole output and the rollups are rebuilt
+    from them; otherwise they are folded into the existing rollups. A
+    missing rollup file is built from the output itself. Partitioned
+    outputs get one rollup file per product.
+    """
+    new = rollups.combine_totals(chunk_totals)
+    if partitioned:
+        root = Path(output)
+        new = {product_slug(p): g.drop(columns="Product") for p, g in new.groupby("Product")} if len(new) else {}
+        sources = {d.name.split("=", 1)[1]: d for d in root.glob("product=*")
+                   if d.is_dir() and not d.name.endswith(".cache")}
+        for stale in root.glob("product=*.rollups.csv"):
+            if stale.name[: -len(".rollups.csv")].split("=", 1)[1] not in sources:
+                stale.unlink()
+    else:
+        new, sources = {None: new}, {None: Path(output)}
+
+    for key, source in sources.items():
+        path = rollups.rollups_path(source)
+        previous = None if rebuild else rollups.read_levels(path)
+        if rebuild:
+            levels = rollups.build_levels(new.get(key, rollups.combine_totals([])))
+        elif previous is None:
+            levels = rollups.build_levels(rollups.daily_totals(read_source(source)))
+        elif key in new:
+            levels = rollups.update_levels(previous, new[key])
+        else:
+            continue
+        rollups.write_levels(levels, path)
+
+
+def discover_files(pattern=INPUT_PATTERN):
+    """Return files matching ``pattern`` in natural order (``_2`` before ``_10``)."""
+    def natural_key(path):
+        return [int(part) if part.isdigit() else part for part in re.split(r"(\d+)", path)]
+
+    return sorted((Path(p).as_posix() for p in glob.glob(pattern)), key=natural_key)
+
+
+def manifest_path_for(output):
+    output = Path(output)
+    return output.with_name(output.stem + ".manifest.json")
+
+
+def quarantine_path_for(output):
+    output = Path(output)
+    return output.with_name(output.stem + ".quarantine.csv")
+
+
+def _write_quarantine(output, records, append=False):
+    """Write quarantined rows next to ``output``; in ``append`` mode add to the existing file."""
+    path = quarantine_path_for(output)
+    frame = pd.DataFrame(records, columns=ingest.QUARANTINE_COLUMNS)
+    if append and path.exists():
+        frame.to_csv(path, mode="a", index=False, header=False, lineterminator="\n")
+    elif records or path.exists():
+        frame.to_csv(path, index=False, lineterminator="\n")
+
+
+def load_manifest(output):
+    try:
+        with open(manifest_path_for(output), encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return manifest if manifest.get("format") == MANIFEST_FORMAT else None
+
+
+def _save_manifest(output, entries):
+    manifest = {
+        "format": MANIFEST_FORMAT,
+        "output": file_stat(output),
+        "files": entries,
+    }
+    path = manifest_path_for(output)
+    tmp = str(path) + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, path)
+
+
+def _fingerprint(path, previous=None):
+    """Return the manifest entry for ``path``, hashing it only when its stat changed."""
+    stat = file_stat(path)
+    if previous and previous["size"] == stat["size"] and previous["mtime_ns"] == stat["mtime_ns"]:
+        return dict(previous)
+    sha = file_sha256(path)
+    if previous and previous["sha256"] == sha:
+        return {**previous, **stat}
+    return {**stat, "sha256": sha}
+
+
+def merge_incremental(pattern=INPUT_PATTERN, output=OUTPUT_FILE, chunk_size_mb=DEFAULT_CHUNK_SIZE_MB,
+                      workers=None, full=False, partitioned=False, engine=ingest.DEFAULT_ENGINE):
+    """Merge only source files that are not yet in the manifest.
+
+    New files are appended to ``output``. If an already merged file changed
+    or disappeared, or ``output`` no longer matches the manifest (e.g. an
+    interrupted append), the output is rebuilt from every source file.
+    With ``partitioned`` the output is a partition directory holding every
+    product instead of one Pink Morsels CSV. The rollups next to the output
+    (see rollups.py) are kept in step. Source rows that do not fit the raw
+    schema (see ingest.py) are skipped and listed in the quarantine file
+    next to the output, with a count per file in the manifest. Returns ``(mode, merged_paths)``
+    where mode is "full", "append" or "up-to-date".
+    """
+    merge, append = (merge_partitioned, append_partitioned) if partitioned else (merge_files, append_files)
+    paths = discover_files(pattern)
+    manifest = None if full else load_manifest(output)
+
+    previous = {}
+    if manifest is not None and os.path.exists(output) and file_stat(output) == manifest["output"]:
+        previous = manifest["files"]
+    else:
+        full = True
+
+    entries = {}
+    for path in paths:
+        entry = _fingerprint(path, previous.get(path))
+        if path in previous and entry["sha256"] != previous[path]["sha256"]:
+            full = True
+        entries[path] = entry
+    if set(previous) - set(entries):
+        full = True
+
+    totals, quarantine = [], []
+    if full:
+        rows = merge(paths, output, chunk_size_mb, workers, totals, engine, quarantine)
+        merged = paths
+        mode = "full"
+    else:
+        merged = [path for path in paths if path not in previous]
+        if not merged:
+            if entries != previous:
+                _save_manifest(output, entries)
+            update_rollups(output, partitioned=partitioned)
+            return "up-to-date", []
+        rows = append(merged, output, chunk_size_mb, workers, totals, engine, quarantine)
+        mode = "append"
+
+    update_rollups(output, totals, partitioned, rebuild=mode == "full")
+    _write_quarantine(output, quarantine, append=mode == "append")
+    quarantined = {}
+    for record in quarantine:
+        quarantined[record[0]] = quarantined.get(record[0], 0) + 1
+    for path in paths:
+        if path in rows:
+            entries[path]["rows"] = rows[path]
+            entries[path]["quarantined"] = quarantined.get(path, 0)
+        else:
+            entries[path]["rows"] = previous[path]["rows"]
+            entries[path]["quarantined"] = previous[path].get("quarantined", 0)
+    _save_manifest(output, entries)
+    return mode, merged
 
-    processed_dfs.append(df)
 
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Merge raw daily sales files into the Pink Morsels dataset.")
+    parser.add_argument("--pattern", default=INPUT_PATTERN, help="glob matching raw daily sales CSV files")
+    parser.add_argument("--output", help=f"merged CSV, or partition directory with --partitioned "
+                                         f"(default: {OUTPUT_FILE} / {PARTITIONS_DIR})")
+    parser.add_argument("--chunk-size-mb", type=float, default=DEFAULT_CHUNK_SIZE_MB,
+                        help="approximate bytes of input parsed per chunk")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--full", action="store_true", help="ignore the manifest and rebuild the output")
+    parser.add_argument("--partitioned", action="store_true",
+                        help="write every product, partitioned by product and month")
+    parser.add_argument("--engine", choices=ingest.ENGINES, default=ingest.DEFAULT_ENGINE,
+                        help=f"CSV parser for raw files (default: {ingest.DEFAULT_ENGINE})")
+    args = parser.parse_args(argv)
 
-final_df = pd.concat(processed_dfs, ignore_index=True)
+    output = args.output or (PARTITIONS_DIR if args.partitioned else OUTPUT_FILE)
+    mode, merged = merge_incremental(args.pattern, output, args.chunk_size_mb, args.workers, args.full,
+                                     args.partitioned, args.engine)
+    if mode == "up-to-date":
+        print("Output is up to date, no new files to merge.")
+    else:
+        print(f"Formated output file created!!! ({mode}: {len(merged)} file(s) merged)")
+        skipped = sum(load_manifest(output)["files"][path].get("quarantined", 0) for path in merged)
+        if skipped:
+            print(f"{skipped} malformed row(s) skipped, see {quarantine_path_for(output)}")
 
-final_df.to_csv('pink_morsels_sales.csv', index=False)
 
-print("Formated output file created!!!")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
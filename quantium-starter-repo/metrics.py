@@ -0,0 +1,202 @@
+"""Minimal in-process metrics exposed in the Prometheus text format.
+
+Only what the dashboard needs: counters, gauges and fixed-bucket
+histograms with labels, plus a ``/metrics`` route for the Flask server
+behind Dash. Values are per process; with several workers, scrape each one
+or aggregate in Prometheus.
+"""
+import bisect
+import ipaddress
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+BYTES_BUCKETS = (1_000, 5_000, 10_000, 50_000, 100_000, 250_000, 500_000, 1_000_000, 5_000_000)
+
+
+def _label_key(labelnames, labels):
+    return tuple(str(labels.get(name, "")) for name in labelnames)
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labelnames, key, extra=()):
+    pairs = list(zip(labelnames, key)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _header(self):
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return self._header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items
+        ]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = _label_key(self.labelnames, labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * (len(self.buckets) + 1), 0.0))
+            counts[index] += 1
+            self._values[key] = (counts, total + value)
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self):
+        with self._lock:
+            items = sorted((key, (list(counts), total)) for key, (counts, total) in self._values.items())
+        lines = self._header()
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = _format_labels(self.labelnames, key, [("le", _format_value(float(bound)))])
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+CALLBACK_LATENCY = REGISTRY.register(Histogram(
+    "dashboard_callback_latency_seconds", "Callback wall-clock latency.", ["callback", "input"],
+))
+ROWS_SCANNED = REGISTRY.register(Counter(
+    "dashboard_rows_scanned_total", "Rows (daily aggregate points) read by callbacks.", ["callback"],
+))
+RESPONSE_BYTES = REGISTRY.register(Histogram(
+    "dashboard_callback_payload_bytes", "Uncompressed size of /_dash-update-component response bodies.",
+    buckets=BYTES_BUCKETS,
+))
+CACHE_REQUESTS = REGISTRY.register(Counter(
+    "dashboard_cache_requests_total", "Cache lookups by cache and result (hit/miss).", ["cache", "result"],
+))
+DATASET_LOAD_SECONDS = REGISTRY.register(Gauge(
+    "dashboard_dataset_load_seconds", "Time taken by the last dataset load.",
+))
+DATASET_ROWS = REGISTRY.register(Gauge(
+    "dashboard_dataset_rows", "Rows in the loaded dataset.",
+))
+DATASET_BYTES = REGISTRY.register(Gauge(
+    "dashboard_dataset_bytes", "In-memory size of the loaded dataset, including the index.",
+))
+DATASET_RELOADS = REGISTRY.register(Counter(
+    "dashboard_dataset_reloads_total", "New dataset versions swapped in without a restart.",
+))
+DATASET_RELOAD_ERRORS = REGISTRY.register(Counter(
+    "dashboard_dataset_reload_errors_total", "Background dataset reloads that failed.",
+))
+BACKGROUND_JOBS = REGISTRY.register(Counter(
+    "dashboard_background_jobs_total", "Background callback jobs by event (submitted/cached/cancelled).", ["event"],
+))
+
+
+def record_cache(cache, hit):
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def _is_local(address):
+    try:
+        return ipaddress.ip_address(address or "").is_loopback
+    except ValueError:
+        return False
+
+
+def install(server, registry=REGISTRY):
+    """Add ``/metrics`` and response-size tracking to a Flask ``server``.
+
+    The endpoint only answers loopback clients unless
+    DASHBOARD_METRICS_PUBLIC=1 is set. Install it after any hook that
+    compresses responses so payload sizes are the uncompressed bodies;
+    304 responses carry no body and are not counted.
+    """
+    from flask import Response, abort, request
+
+    allow_remote = os.environ.get("DASHBOARD_METRICS_PUBLIC") == "1"
+
+    @server.route("/metrics")
+    def _metrics():
+        if not allow_remote and not _is_local(request.remote_addr):
+            abort(403)
+        return Response(registry.render(), mimetype="text/plain; version=0.0.4")
+
+    @server.after_request
+    def _observe_payload(response):
+        if (request.path.endswith("/_dash-update-component") and response.status_code != 304
+                and not response.direct_passthrough):
+            RESPONSE_BYTES.observe(response.calculate_content_length() or 0)
+        return response
@@ -0,0 +1,100 @@
+"""Product/month partitioned layout written by ``merge_file.py --partitioned``.
+
+Every product gets a directory and every month a sub-directory:
+
+    sales_partitions/product=pink-morsel/month=2021-01/part.csv
+
+Each ``part.csv`` has the merged columns (Sales, Quantity, Price, Date,
+Region). Readers pick partitions from the directory names alone, so a view
+over one product never opens another product's files. Pruning is by
+product only; a product's months are always read together. A product directory
+can be passed anywhere a merged CSV path is accepted (see data_cache).
+"""
+import re
+from pathlib import Path
+
+import pandas as pd
+
+PARTITIONS_DIR = "sales_partitions"
+PART_FILE = "part.csv"
+COLUMNS = ["Sales", "Quantity", "Price", "Date", "Region"]
+
+
+def product_slug(product):
+    """``"pink morsel"`` -> ``"pink-morsel"``."""
+    return re.sub(r"[^a-z0-9]+", "-", str(product).strip().lower()).strip("-")
+
+
+def product_dir(root, product):
+    return Path(root) / f"product={product_slug(product)}"
+
+
+def partition_path(root, product, month):
+    """Path of the ``part.csv`` holding ``product``'s rows for ``month`` (``YYYY-MM``)."""
+    return product_dir(root, product) / f"month={month}" / PART_FILE
+
+
+def _is_data_path(parts):
+    # Staging directories, caches and rollups written next to partitions are not data.
+    return not any(part.startswith(".") or part.endswith((".cache", ".rollups.csv")) for part in parts)
+
+
+def source_files(path):
+    """The CSV files making up a data source: the file itself, or a directory's partitions in order."""
+    path = Path(path)
+    if not path.is_dir():
+        return [path]
+    return sorted(p for p in path.rglob("*.csv") if _is_data_path(p.relative_to(path).parts))
+
+
+def list_partitions(root, products=None):
+    """Return the partition files under ``root`` for ``products``, month by month.
+
+    Only directory names are inspected. ``products`` defaults to every
+    product. Months are not pruned: the dashboard loads a whole product
+    once and windows its views in memory.
+    """
+    if products is None:
+        product_dirs = sorted(p for p in Path(root).glob("product=*") if p.is_dir() and _is_data_path([p.name]))
+    else:
+        product_dirs = [product_dir(root, product) for product in products]
+
+    selected = []
+    for directory in product_dirs:
+        for month_dir in sorted(directory.glob("month=*")):
+            part = month_dir / PART_FILE
+            if part.exists():
+                selected.append(part)
+    return selected
+
+
+def read_partitions(root, products=None, **read_csv_kwargs):
+    """Read the partitions ``list_partitions`` selects into one frame.
+
+    With more than one product a ``Product`` column (the slug) is added.
+    """
+    paths = list_partitions(root, products)
+    frames = []
+    for path in paths:
+        frame = pd.read_csv(path, **read_csv_kwargs)
+        if products is None or len(products) > 1:
+            frame["Product"] = path.parent.parent.name.split("=", 1)[1]
+        frames.append(frame)
+    if not frames:
+        return pd.DataFrame(columns=COLUMNS)
+    return pd.concat(frames, ignore_index=True)
+
+
+def read_source(path, **read_csv_kwargs):
+    """Read a merged CSV or a product partition directory into one frame."""
+    path = Path(path)
+    if not path.is_dir():
+        return pd.read_csv(path, **read_csv_kwargs)
+    frames = [pd.read_csv(p, **read_csv_kwargs) for p in source_files(path)]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=COLUMNS)
+
+
+def iter_source_chunks(path, chunksize, **read_csv_kwargs):
+    """Yield frames of at most ``chunksize`` rows from a merged CSV or partition directory."""
+    for part in source_files(path):
+        yield from pd.read_csv(part, chunksize=chunksize, **read_csv_kwargs)
@@ -0,0 +1,127 @@
+"""Structured performance logging for the dashboard callbacks.
+
+Records are handed to a queue and written as JSON lines by a background
+thread in batches, so a callback never opens or writes a file itself.
+Configuration comes from the environment:
+
+    DASHBOARD_LOG_LEVEL           off (default), info or debug
+    DASHBOARD_LOG_PATH            output file (default: dashboard_perf.log)
+    DASHBOARD_LOG_SAMPLE_RATE     fraction of records kept, 0.0-1.0 (default: 1.0)
+    DASHBOARD_LOG_FLUSH_INTERVAL  seconds between batch writes (default: 1.0)
+
+With the level at ``off`` no thread or file is created and ``ENABLED`` is
+False, so callers can skip building records entirely.
+"""
+import atexit
+import json
+import os
+import queue
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+LEVELS = {"off": 0, "info": 1, "debug": 2}
+
+LEVEL = LEVELS.get(os.environ.get("DASHBOARD_LOG_LEVEL", "off").lower(), 0)
+ENABLED = LEVEL > 0
+DEBUG = LEVEL >= LEVELS["debug"]
+
+
+class LogSink:
+    """Queue-backed JSON-lines writer running on a daemon thread."""
+
+    def __init__(self, path, flush_interval=1.0, batch_size=512, sample_rate=1.0, max_queue=10000):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.sample_rate = sample_rate
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="perf-log-sink", daemon=True)
+        self._thread.start()
+
+    def emit(self, record):
+        """Queue a record without blocking; records are dropped when the queue is full."""
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def _drain(self, first):
+        batch = [first]
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch):
+        lines = "".join(json.dumps(record, default=str) + "\n" for record in batch)
+        try:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(lines)
+        except OSError:
+            # Logging must never break the app
+            self.dropped += len(batch)
+
+    def _run(self):
+        while not (self._stop.is_set() and self._queue.empty()):
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            self._write(self._drain(first))
+            # Let records accumulate so each file open writes a whole batch.
+            self._stop.wait(self.flush_interval)
+
+    def close(self, timeout=5.0):
+        self._stop.set()
+        self._thread.join(timeout)
+
+
+class StageTimer:
+    """Collects wall-clock durations of named stages as ``<name>_ms`` fields."""
+
+    def __init__(self):
+        self.timings = {}
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[f"{name}_ms"] = round((time.perf_counter() - start) * 1000, 3)
+
+    def total_ms(self):
+        return round((time.perf_counter() - self._start) * 1000, 3)
+
+
+_sink = None
+_sink_lock = threading.Lock()
+
+
+def _get_sink():
+    global _sink
+    with _sink_lock:
+        if _sink is None:
+            _sink = LogSink(
+                os.environ.get("DASHBOARD_LOG_PATH", "dashboard_perf.log"),
+                flush_interval=float(os.environ.get("DASHBOARD_LOG_FLUSH_INTERVAL", "1.0")),
+                sample_rate=float(os.environ.get("DASHBOARD_LOG_SAMPLE_RATE", "1.0")),
+            )
+            atexit.register(_sink.close)
+    return _sink
+
+
+def log_event(event, **fields):
+    """Queue one structured record; a no-op when logging is off."""
+    if not ENABLED:
+        return
+    _get_sink().emit({"event": event, "timestamp": int(time.time() * 1000), "pid": os.getpid(), **fields})
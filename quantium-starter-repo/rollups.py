@@ -0,0 +1,170 @@
+"""Precomputed rollups of daily sales at several resolutions.
+
+``merge_file.py`` writes a rollup file next to its output (see
+``rollups_path``) holding, for every region and for "all", one row per
+period of each level:
+
+    daily       totals per traded day
+    weekly      totals per calendar week, labelled with its Monday
+    monthly     totals per calendar month, labelled with its first day
+    rolling7    mean daily totals over the trailing 7 calendar days
+    rolling28   mean daily totals over the trailing 28 calendar days
+
+Days without trades count as zero in the weekly, monthly and rolling
+levels. When new days are appended only the periods they touch are
+recomputed (see ``update_levels``), so keeping the rollups current costs
+no more than reading the new rows.
+"""
+import os
+from pathlib import Path
+
+import pandas as pd
+
+from sales_cube import ALL_REGIONS
+
+LEVELS = ("daily", "weekly", "monthly", "rolling7", "rolling28")
+COLUMNS = ["Level", "Region", "Date", "Sales", "Quantity"]
+_WINDOWS = {"rolling7": 7, "rolling28": 28}
+
+
+def rollups_path(source):
+    """Rollup file of a merged CSV or a product partition directory."""
+    source = Path(source)
+    name = source.stem if source.suffix == ".csv" else source.name
+    return source.with_name(name + ".rollups.csv")
+
+
+def daily_totals(df):
+    """Sales and quantity per (region, day) of merged rows, plus an "all" region.
+
+    A ``Product`` column, if present, is kept as an extra grouping key.
+    """
+    keys = ["Product"] if "Product" in df.columns else []
+    rows = df[keys + ["Region", "Date", "Sales", "Quantity"]].assign(Region=df["Region"].str.lower())
+    by_region = rows.groupby(keys + ["Region", "Date"], as_index=False)[["Sales", "Quantity"]].sum()
+    overall = rows.groupby(keys + ["Date"], as_index=False)[["Sales", "Quantity"]].sum().assign(Region=ALL_REGIONS)
+    return combine_totals([by_region, overall])
+
+
+def combine_totals(frames):
+    """Add up daily totals (e.g. of separately processed chunks) per key."""
+    frames = [f for f in frames if f is not None and len(f)]
+    if not frames:
+        return pd.DataFrame(columns=["Region", "Date", "Sales", "Quantity"])
+    combined = pd.concat(frames, ignore_index=True)
+    keys = [c for c in ("Product", "Region", "Date") if c in combined.columns]
+    return combined.groupby(keys, as_index=False)[["Sales", "Quantity"]].sum()
+
+
+def _period_start(level, day):
+    if level == "weekly":
+        return day - pd.Timedelta(days=day.weekday())
+    if level == "monthly":
+        return day.replace(day=1)
+    return day
+
+
+def _derive(calendar, level):
+    if level == "weekly":
+        return calendar.resample("W-MON", label="left", closed="left").sum()
+    if level == "monthly":
+        return calendar.resample("MS").sum()
+    window = _WINDOWS[level]
+    return calendar.rolling(window, min_periods=window).mean().dropna(how="all")
+
+
+def _long(wide, level):
+    rows = wide.stack(level="Region", future_stack=True).reset_index()
+    rows["Date"] = rows["Date"].dt.strftime("%Y-%m-%d")
+    if level not in _WINDOWS:
+        rows["Quantity"] = rows["Quantity"].astype("int64")
+    return rows.assign(Level=level)[COLUMNS]
+
+
+def build_levels(daily, since=None):
+    """Every level derived from one product's ``daily`` totals.
+
+    With ``since`` (a date) only periods on or after the one containing it
+    are returned, and only the daily rows those periods need are read.
+    """
+    daily = daily[["Region", "Date", "Sales", "Quantity"]]
+    since = pd.Timestamp(since) if since is not None else None
+    frames = [daily.assign(Level="daily")[COLUMNS]]
+    if since is not None:
+        frames[0] = frames[0][frames[0]["Date"] >= since.strftime("%Y-%m-%d")]
+    if len(daily):
+        calendar = daily.assign(Date=pd.to_datetime(daily["Date"])).pivot_table(
+            index="Date", columns="Region", values=["Sales", "Quantity"], aggfunc="sum", fill_value=0,
+        ).asfreq("D", fill_value=0)
+        for level in LEVELS[1:]:
+            part = calendar
+            if since is not None:
+                start = _period_start(level, since)
+                lookback = start - pd.Timedelta(days=_WINDOWS.get(level, 1) - 1)
+                part = calendar[calendar.index >= lookback]
+            derived = _derive(part, level)
+            if since is not None:
+                derived = derived[derived.index >= start]
+            frames.append(_long(derived, level))
+    return _sorted(pd.concat(frames, ignore_index=True))
+
+
+def update_levels(previous, new_daily):
+    """Fold ``new_daily`` totals (of newly merged rows) into ``previous`` levels.
+
+    Only periods at or after the earliest new day are recomputed; earlier
+    rows are kept as they are.
+    """
+    if not len(new_daily):
+        return previous
+    since = pd.Timestamp(new_daily["Date"].min())
+    daily = combine_totals([previous.loc[previous["Level"] == "daily", ["Region", "Date", "Sales", "Quantity"]], new_daily])
+    cutoffs = {level: _period_start(level, since).strftime("%Y-%m-%d") for level in LEVELS}
+    kept = previous[previous["Date"] < previous["Level"].map(cutoffs)]
+    return _sorted(pd.concat([kept, build_levels(daily, since)], ignore_index=True))
+
+
+def _sorted(levels):
+    order = levels["Level"].map({level: i for i, level in enumerate(LEVELS)})
+    return levels.assign(_order=order).sort_values(["_order", "Region", "Date"]).drop(columns="_order").reset_index(drop=True)
+
+
+def read_levels(path):
+    """Rollups written by ``write_levels``, or None if there are none."""
+    try:
+        return pd.read_csv(path, dtype={"Level": str, "Region": str, "Date": str})
+    except FileNotFoundError:
+        return None
+
+
+def write_levels(levels, path):
+    """Write ``levels`` to ``path`` atomically."""
+    tmp = str(path) + ".tmp"
+    levels[COLUMNS].to_csv(tmp, index=False, lineterminator="\n")
+    os.replace(tmp, path)
+
+
+def levels_from_series(series):
+    """Build every level from ``{region: (dates, sales, quantity)}`` daily series (e.g. a backend's)."""
+    frames = [
+        pd.DataFrame({"Region": region, "Date": pd.DatetimeIndex(dates).strftime("%Y-%m-%d"),
+                      "Sales": sales, "Quantity": quantity})
+        for region, (dates, sales, quantity) in series.items()
+    ]
+    return build_levels(combine_totals(frames))
+
+
+def level_series(levels, level, region, start=None, end=None):
+    """(dates, sales, quantity) of ``region`` at ``level`` from a rollup frame.
+
+    As with the backends' daily series, the nearest period outside each
+    bound is included so lines run to the plot border.
+    """
+    rows = levels[(levels["Level"] == level) & (levels["Region"] == str(region).lower())]
+    dates = pd.DatetimeIndex(pd.to_datetime(rows["Date"]))
+    lo, hi = 0, len(dates)
+    if start is not None:
+        lo = max(int(dates.searchsorted(pd.Timestamp(start))) - 1, 0)
+    if end is not None:
+        hi = min(int(dates.searchsorted(pd.Timestamp(end), side="right")) + 1, len(dates))
+    return dates[lo:hi], rows["Sales"].to_numpy()[lo:hi], rows["Quantity"].to_numpy()[lo:hi]
@@ -0,0 +1,254 @@
+import json
+import os
+import shutil
+import tempfile
+from collections import namedtuple
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ALL_REGIONS = "all"
+
+WindowTotals = namedtuple("WindowTotals", ["sales", "quantity", "days"])
+
+RegionView = namedtuple(
+    "RegionView",
+    [
+        "dates",
+        "sales",
+        "quantity",
+        "total_sales",
+        "before_sales",
+        "after_sales",
+        "total_quantity",
+        "before_quantity",
+        "after_quantity",
+    ],
+)
+
+
+class SalesCube:
+    """Dense date × region totals of sales and quantity.
+
+    The raw rows are reduced once when the dataset is loaded. Column 0 holds
+    the "all" view and the remaining columns one region each, so a callback
+    only has to slice precomputed arrays instead of filtering and grouping
+    the full row set. Cumulative sums along the date axis answer any date
+    window total with two ``searchsorted`` lookups.
+    """
+
+    def __init__(self, dates, regions, sales, quantity, present, split_date, prefix_sums=None):
+        self.dates = dates
+        self.regions = list(regions)
+        self.sales = sales
+        self.quantity = quantity
+        self.present = present
+        self.split_date = split_date
+        self.split_index = int(dates.searchsorted(split_date))
+
+        self._columns = {ALL_REGIONS: 0}
+        self._columns.update({region: i + 1 for i, region in enumerate(self.regions)})
+
+        # Days on which a region has no rows are left out of its series,
+        # matching what a groupby over the filtered rows would produce.
+        self._rows = [
+            slice(None) if present[:, col].all() else np.flatnonzero(present[:, col])
+            for col in range(present.shape[1])
+        ]
+
+        # Row i holds the totals of the first i days, so row 0 is all zeros.
+        # Prefix sums loaded from disk (see load_cube) are used as they are.
+        if prefix_sums is None:
+            n_cols = sales.shape[1]
+            prefix_sums = (
+                np.vstack([np.zeros((1, n_cols)), np.cumsum(sales, axis=0)]),
+                np.vstack([np.zeros((1, n_cols), dtype=np.int64), np.cumsum(quantity, axis=0)]),
+                np.vstack([np.zeros((1, n_cols), dtype=np.int64), np.cumsum(present, axis=0)]),
+            )
+        self._cum_sales, self._cum_quantity, self._cum_days = prefix_sums
+
+    @property
+    def n_days(self):
+        return len(self.dates)
+
+    def view(self, region):
+        """Return the daily series and pre/post split totals for ``region``."""
+        col = self._columns.get(str(region).lower())
+        if col is None:
+            return RegionView(self.dates[:0], np.zeros(0), np.zeros(0, dtype=np.int64), 0.0, 0.0, 0.0, 0, 0, 0)
+
+        rows = self._rows[col]
+        before, after = self._split(col, 0, self.split_index, self.n_days)
+        before_sales, before_quantity = before.sales, before.quantity
+        after_sales, after_quantity = after.sales, after.quantity
+        return RegionView(
+            dates=self.dates[rows],
+            sales=self.sales[rows, col],
+            quantity=self.quantity[rows, col],
+            total_sales=before_sales + after_sales,
+            before_sales=before_sales,
+            after_sales=after_sales,
+            total_quantity=before_quantity + after_quantity,
+            before_quantity=before_quantity,
+            after_quantity=after_quantity,
+        )
+
+    def _bound(self, date, side, default):
+        if date is None:
+            return default
+        return int(self.dates.searchsorted(pd.Timestamp(date), side=side))
+
+    def _totals(self, col, lo, hi):
+        hi = max(hi, lo)
+        return WindowTotals(
+            sales=float(self._cum_sales[hi, col] - self._cum_sales[lo, col]),
+            quantity=int(self._cum_quantity[hi, col] - self._cum_quantity[lo, col]),
+            days=int(self._cum_days[hi, col] - self._cum_days[lo, col]),
+        )
+
+    def _split(self, col, lo, split, hi):
+        split = min(max(split, lo), hi)
+        return self._totals(col, lo, split), self._totals(col, split, hi)
+
+    def window_totals(self, region, start=None, end=None):
+        """Totals for ``region`` over days from ``start`` to ``end``, both inclusive.
+
+        Either bound may be None for an open-ended window. Unknown regions
+        give zero totals.
+        """
+        col = self._columns.get(str(region).lower())
+        if col is None:
+            return WindowTotals(0.0, 0, 0)
+        return self._totals(col, self._bound(start, "left", 0), self._bound(end, "right", self.n_days))
+
+    def split_totals(self, region, split, start=None, end=None):
+        """Return (before, after) WindowTotals of the window split at ``split``.
+
+        Days before ``split`` count as before; ``split`` itself starts the
+        after period, matching the price-increase comparison.
+        """
+        col = self._columns.get(str(region).lower())
+        if col is None:
+            return WindowTotals(0.0, 0, 0), WindowTotals(0.0, 0, 0)
+        lo = self._bound(start, "left", 0)
+        hi = self._bound(end, "right", self.n_days)
+        return self._split(col, lo, self._bound(split, "left", 0), hi)
+
+    def period_over_period(self, region, start, end):
+        """Return (current, previous) totals, previous being the equally long window just before."""
+        start, end = pd.Timestamp(start), pd.Timestamp(end)
+        length = end - start + pd.Timedelta(days=1)
+        previous_end = start - pd.Timedelta(days=1)
+        return (
+            self.window_totals(region, start, end),
+            self.window_totals(region, previous_end - length + pd.Timedelta(days=1), previous_end),
+        )
+
+    def to_payload(self):
+        """Return every region's daily series as plain JSON-serialisable data.
+
+        ``index`` lists the positions in ``dates`` a region traded on, or is
+        None when it traded every day.
+        """
+        regions = {}
+        for region, col in self._columns.items():
+            rows = self._rows[col]
+            regions[region] = {
+                "index": None if isinstance(rows, slice) else rows.tolist(),
+                "sales": np.round(self.sales[rows, col], 2).tolist(),
+                "quantity": self.quantity[rows, col].tolist(),
+            }
+        return {
+            "dates": self.dates.strftime("%Y-%m-%d").tolist(),
+            "split_date": self.split_date.strftime("%Y-%m-%d"),
+            "regions": regions,
+        }
+
+
+def build_cube(df, split_date):
+    """Reduce a merged sales frame (Date, Region, Sales, Quantity) to a SalesCube.
+
+    ``Date`` may be a column or the index. A categorical ``Region`` whose
+    categories are already lower-case (see data_cache.compact_frame) is
+    used through its integer codes without touching the strings.
+    """
+    date_values = df.index if df.index.name == "Date" else df["Date"]
+    date_codes, dates = pd.factorize(date_values, sort=True)
+    dates = pd.DatetimeIndex(dates)
+
+    region = df["Region"]
+    if isinstance(region.dtype, pd.CategoricalDtype) and all(c == str(c).lower() for c in region.cat.categories):
+        region_codes = region.cat.codes.to_numpy().astype(np.int64)
+        regions = region.cat.categories
+    else:
+        region_codes, regions = pd.factorize(region.astype("string").str.lower(), sort=True)
+
+    n_days = len(dates)
+    n_cols = len(regions) + 1
+
+    has_date = date_codes >= 0
+    has_region = has_date & (region_codes >= 0)
+    sales_values = df["Sales"].to_numpy(dtype=np.float64, na_value=0.0)
+    quantity_values = df["Quantity"].to_numpy(dtype=np.float64, na_value=0.0)
+
+    # Column 0 ("all") keeps rows without a region, like the unfiltered view did.
+    cells = (date_codes * n_cols + region_codes + 1)[has_region]
+    all_cells = date_codes[has_date] * n_cols
+
+    def _reduce(weights):
+        out = np.bincount(cells, weights=weights[has_region], minlength=n_days * n_cols)
+        out += np.bincount(all_cells, weights=weights[has_date], minlength=n_days * n_cols)
+        return out.reshape(n_days, n_cols)
+
+    sales = _reduce(sales_values)
+    quantity = np.rint(_reduce(quantity_values)).astype(np.int64)
+    present = _reduce(np.ones(len(df))) > 0
+
+    return SalesCube(dates, [str(r) for r in regions], sales, quantity, present, pd.Timestamp(split_date))
+
+
+def save_cube(cube, directory):
+    """Write ``cube`` as .npy files under ``directory`` so processes can map it with load_cube.
+
+    The files are written to a staging directory and renamed into place; if
+    ``directory`` already exists it is left as it is.
+    """
+    directory = Path(directory)
+    directory.parent.mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(dir=directory.parent, prefix=".cube-"))
+    os.chmod(staging, 0o755)
+    arrays = {
+        "dates": cube.dates.to_numpy(),
+        "sales": cube.sales,
+        "quantity": cube.quantity,
+        "present": cube.present,
+        "cum_sales": cube._cum_sales,
+        "cum_quantity": cube._cum_quantity,
+        "cum_days": cube._cum_days,
+    }
+    try:
+        for name, array in arrays.items():
+            np.save(staging / f"{name}.npy", np.ascontiguousarray(array))
+        (staging / "regions.json").write_text(json.dumps(cube.regions), encoding="utf-8")
+        if directory.exists():
+            shutil.rmtree(staging, ignore_errors=True)
+        else:
+            os.replace(staging, directory)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+
+def load_cube(directory, split_date, mmap_mode="r"):
+    """Open a cube written by save_cube; with ``mmap_mode="r"`` its arrays stay on disk, shared between processes."""
+    directory = Path(directory)
+
+    def _array(name):
+        return np.load(directory / f"{name}.npy", mmap_mode=mmap_mode)
+
+    regions = json.loads((directory / "regions.json").read_text(encoding="utf-8"))
+    dates = pd.DatetimeIndex(np.load(directory / "dates.npy"))
+    prefix_sums = (_array("cum_sales"), _array("cum_quantity"), _array("cum_days"))
+    return SalesCube(dates, regions, _array("sales"), _array("quantity"), _array("present"),
+                     pd.Timestamp(split_date), prefix_sums=prefix_sums)
@@ -1,40 +1,119 @@
 import pandas as pd
-from dash import Dash, dcc, html, Input, Output
+from dash import ClientsideFunction, Dash, ctx, dcc, html, Input, Output, Patch, no_update
+from flask import current_app, has_app_context
 import plotly.graph_objects as go
-import json
+
+import math
+import os
+import threading
 import time
 
-df = pd.read_csv("pink_morsels_sales.csv")
-df["Date"] = pd.to_datetime(df["Date"])
+import background_jobs
+import backends
+import callback_cache
+import downsample
+import http_cache
+import metrics
+import partitions
+import perf_log
+import price_stats
+import rollups
+from sales_cube import ALL_REGIONS
 
+price_increase_date = pd.to_datetime("2021-01-15")
+price_increase_str = "2021-01-15"
 
-# #region agent log helper
-def _agent_log(hypothesis_id, location, message, data=None, run_id="pre-fix"):
-    entry = {
-        "sessionId": "debug-session",
-        "runId": run_id,
-        "hypothesisId": hypothesis_id,
-        "location": location,
-        "message": message,
-        "data": data or {},
-        "timestamp": int(time.time() * 1000),
-    }
-    try:
-        with open(r"d:\projects\Quantium_soul_foods_dashboard\.cursor\debug.log", "a", encoding="utf-8") as f:
-            f.write(json.dumps(entry) + "\n")
-    except Exception:
-        # Logging must never break the app
-        pass
+# With DASHBOARD_CLIENTSIDE=1 the per-region daily series is shipped to the
+# browser once and region switching runs entirely in assets/dashboard.js.
+CLIENTSIDE = os.environ.get("DASHBOARD_CLIENTSIDE") == "1"
 
+# Pick up a freshly merged CSV without restarting; 0 disables the watcher.
+RELOAD_INTERVAL = float(os.environ.get("DASHBOARD_RELOAD_INTERVAL", "30"))
 
-# #endregion
+# DASHBOARD_BACKGROUND runs the listed callbacks ("dashboard", "price_stats",
+# or "all") as jobs on a local process pool; see background_jobs.py.
+_background = {n.strip() for n in os.environ.get("DASHBOARD_BACKGROUND", "").split(",") if n.strip()}
+BACKGROUND = {"dashboard", "price_stats"} if _background & {"1", "all"} else _background
+# How often the browser polls for a background job's progress and result.
+BACKGROUND_POLL_MS = 250
 
-price_increase_date = pd.to_datetime("2021-01-15")
-price_increase_str = "2021-01-15"
+# The process-wide backend is created on the first callback (or by
+# warm_up), so importing this module and building the layout never touch
+# the data. An app built with create_app(backend=...) keeps its own
+# backend in its server config instead.
+BACKEND_CONFIG_KEY = "DASHBOARD_BACKEND"
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def _data_source():
+    # After a partitioned merge (merge_file.py --partitioned) only the Pink
+    # Morsels partitions are read; DASHBOARD_DATA overrides the source.
+    pink_partitions = partitions.product_dir(partitions.PARTITIONS_DIR, "pink morsel")
+    return os.environ.get("DASHBOARD_DATA") or (
+        str(pink_partitions) if pink_partitions.is_dir() else "pink_morsels_sales.csv"
+    )
+
+
+def get_backend():
+    """Return the dataset backend, loading it on first use.
+
+    Inside a request (or app context) of an app given its own backend, that
+    backend is returned. Otherwise the process-wide one is: the default
+    reduces the rows to a cube once per dataset version, so callbacks only
+    slice precomputed arrays; DASHBOARD_BACKEND=sqlite or duckdb answers
+    them from an on-disk database instead.
+    """
+    global _backend
+    if has_app_context():
+        bound = current_app.config.get(BACKEND_CONFIG_KEY)
+        if bound is not None:
+            return bound
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                backend = backends.from_env(_data_source(), price_increase_date)
+                backend.on_swap(outputs_cache.invalidate)
+                if RELOAD_INTERVAL > 0:
+                    backend.start_watching(RELOAD_INTERVAL)
+                _backend = backend
+    return _backend
+
+
+def use_backend(backend):
+    """Make ``backend`` the process-wide dataset (e.g. a fixture); None goes back to lazy loading.
+
+    Apps built with create_app(backend=...) are not affected.
+    """
+    global _backend
+    with _backend_lock:
+        if backend is not None:
+            backend.on_swap(outputs_cache.invalidate)
+        _backend = backend
+    outputs_cache.invalidate()
+
+
+def prepare_dataset():
+    """Build the configured backend's files on disk (cache, shared cube or database) without serving.
+
+    Run once before worker processes start (see gunicorn.conf.py) so each
+    worker only has to open files that are already prepared.
+    """
+    backends.from_env(_data_source(), price_increase_date)
 
-app = Dash(__name__, suppress_callback_exceptions=True)
 
-app.index_string = """<!DOCTYPE html>
+def warm_up():
+    """Load the dataset and precompute the default view before the first request."""
+    data = get_backend().snapshot()
+    _dashboard_outputs(data, "all")
+    _dashboard_series(data, "all", None, None, "daily")
+
+
+# Callback outputs only depend on the inputs and the dataset version; each
+# memoized helper takes the caller's snapshot (backend.snapshot()) first.
+outputs_cache = callback_cache.from_env(name="update_dashboard")
+
+INDEX_STRING = """<!DOCTYPE html>
 <html>
     <head>
         <link rel="preconnect" href="https://fonts.googleapis.com">
@@ -48,155 +127,6 @@ app.index_string = """<!DOCTYPE html>
 </html>
 """
 
-kpi_style = {"flex": 1,"minWidth": "180px","padding": "24px","backgroundColor": "white","borderRadius": "12px","boxShadow": "0 1px 3px rgba(0,0,0,0.06)","border": "1px solid #f1f5f9",}
-kpi_value_style = {"fontSize": "28px","fontWeight": "700","color": "#0f172a","marginBottom": "4px",}
-kpi_label_style = {"fontSize": "13px","color": "#64748b","fontWeight": "500",}
-
-app.layout = html.Div(
-    style={"fontFamily": "'Inter', -apple-system, BlinkMacSystemFont, sans-serif","backgroundColor": "#f8fafc","minHeight": "100vh","padding": "48px 24px",},
-    children=[
-        html.Div(
-            style={"maxWidth": "1200px", "margin": "0 auto"},
-            children=[
-
-                html.Header(
-                    style={"marginBottom": "40px","paddingBottom": "32px","borderBottom": "1px solid #e2e8f0",},
-                    children=[
-                        html.H1(
-                            "Soul Foods · Pink Morsels",
-                            id="main-header",
-                            style={"fontSize": "28px","fontWeight": "700","color": "#0f172a","letterSpacing": "-0.02em","marginBottom": "8px",},
-                        ),
-                        html.P(
-                            "Sales performance analysis to evaluate the impact of the January 15th, 2021 price increase.",
-                            style={"fontSize": "15px", "color": "#64748b", "lineHeight": 1.6},
-                        ),
-                    ],
-                ),
-
-                html.Div(
-                    style={"display": "flex","justifyContent": "space-between","alignItems": "center","marginBottom": "24px","flexWrap": "wrap","gap": "16px",},
-                    children=[
-                        html.Div(
-                            [
-                                html.Div(
-                                    "Filter by Region",
-                                    style={"fontSize": "13px","fontWeight": "600","color": "#475569","marginBottom": "8px",},
-                                ),
-                                dcc.RadioItems(
-                                    id="region-filter",
-                                    options=[
-                                        {"label": "All", "value": "all"},
-                                        {"label": "North", "value": "north"},
-                                        {"label": "East", "value": "east"},
-                                        {"label": "South", "value": "south"},
-                                        {"label": "West", "value": "west"},
-                                    ],
-                                    value="all",
-                                    inline=True,
-                                    inputStyle={"marginRight": "6px"},
-                                    labelStyle={"marginRight": "16px","fontSize": "14px","color": "#334155","cursor": "pointer",},
-                                ),
-                            ]
-                        )
-                    ],
-                ),
-
-                # KPI Cards
-                html.Div(
-                    style={"display": "flex","gap": "20px","marginBottom": "32px","flexWrap": "wrap",},
-                    children=[
-                        html.Div(
-                            [html.Div(id="total-quantity", style=kpi_value_style),
-                             html.Div("Total Quantity", style=kpi_label_style)],
-                            style=kpi_style,
-                        ),
-                        html.Div(
-                            [
-                                html.Div(
-                                    [
-                                        html.Div(id="before-qty", style={"fontSize": "20px", "fontWeight": "700", "color": "#0f172a"}),
-                                        html.Div("Qty Pre–Price Increase", style={"fontSize": "12px", "color": "#64748b", "marginBottom": "10px"}),
-                                        html.Div(id="after-qty", style={"fontSize": "20px", "fontWeight": "700", "color": "#0f172a"}),
-                                        html.Div("Qty Post–Price Increase", style={"fontSize": "12px", "color": "#64748b"}),
-                                    ]
-                                ),
-                                html.Div("Quantity Split", style={**kpi_label_style, "marginTop": "12px"}),
-                            ],
-                            style=kpi_style,
-                        ),
-                        html.Div(
-                            [html.Div(id="total-sales", style=kpi_value_style),
-                             html.Div("Total Sales", style=kpi_label_style)],
-                            style=kpi_style,
-                        ),
-                        html.Div(
-                            [
-                                html.Div(
-                                    [
-                                        html.Div(id="before-sales", style={"fontSize": "20px", "fontWeight": "700", "color": "#0f172a"}),
-                                        html.Div("Pre–Price Increase", style={"fontSize": "12px", "color": "#64748b", "marginBottom": "10px"}),
-                                        html.Div(id="after-sales", style={"fontSize": "20px", "fontWeight": "700", "color": "#0f172a"}),
-                                        html.Div("Post–Price Increase", style={"fontSize": "12px", "color": "#64748b"}),
-                                    ]
-                                ),
-                                html.Div("Sales Split", style={**kpi_label_style, "marginTop": "12px"}),
-                            ],
-                            style=kpi_style,
-                        ),
-                    ],
-                ),
-
-                # Sales Chart
-                html.Div(
-                    style={"backgroundColor": "white","borderRadius": "16px","padding": "28px","boxShadow": "0 1px 3px rgba(0,0,0,0.06)","border": "1px solid #f1f5f9","marginBottom": "32px",},
-                    children=[
-                        dcc.Graph(
-                            id="sales-graph",
-                            config={"displayModeBar": True, "displaylogo": False},
-                        )
-                    ],
-                ),
-
-                # Price & Quantity Charts row
-                html.Div(
-                    style={"display": "flex", "gap": "24px", "marginBottom": "32px", "flexWrap": "wrap"},
-                    children=[
-                        html.Div(
-                            style={"flex": 1, "minWidth": "360px", "backgroundColor": "white", "borderRadius": "16px", "padding": "28px", "boxShadow": "0 1px 3px rgba(0,0,0,0.06)", "border": "1px solid #f1f5f9"},
-                            children=[
-                                dcc.Graph(id="quantity-graph", config={"displayModeBar": True, "displaylogo": False}),
-                            ],
-                        ),
-                    ],
-                ),
-
-                # Insight
-                html.Div(
-                    style={"padding": "24px 28px","backgroundColor": "white","borderRadius": "16px","boxShadow": "0 1px 3px rgba(0,0,0,0.06)","border": "1px solid #f1f5f9","borderLeft": "4px solid #0ea5e9",},
-                    children=[
-                        html.H3(
-                            "Key Insight",
-                            style={"fontSize": "16px","fontWeight": "600","color": "#0f172a","marginBottom": "12px",},
-                        ),
-                        html.P(
-                            "The change in sales volume before and after the price increase is clearly visible. "
-                            "Filtering by region further highlights how different markets responded to the pricing decision.",
-                            style={
-                                "fontSize": "14px",
-                                "color": "#475569",
-                                "lineHeight": 1.7,
-                                "margin": 0,
-                            },
-                        ),
-                    ],
-                ),
-            ],
-        )
-    ],
-)
-
-
 def _chart_layout(yaxis_overrides=None):
     base_layout = dict(
         plot_bgcolor="rgba(0,0,0,0)",
@@ -212,91 +142,16 @@ def _chart_layout(yaxis_overrides=None):
     return base_layout
 
 
-@app.callback(
-    Output("sales-graph", "figure"),
-    Output("total-quantity", "children"),
-    Output("before-qty", "children"),
-    Output("after-qty", "children"),
-    Output("total-sales", "children"),
-    Output("before-sales", "children"),
-    Output("after-sales", "children"),
-    Output("quantity-graph", "figure"),
-    Input("region-filter", "value"),
-)
-def update_dashboard(region):
-    # #region agent log
-    _agent_log(
-        hypothesis_id="H1",
-        location="sales_visulaizers.update_dashboard:entry",
-        message="Callback entry",
-        data={"region": region},
-    )
-    # #endregion
-
-    if region == "all":
-        filtered_df = df.copy()
-        branch = "all"
-    else:
-        filtered_df = df[df["Region"].str.lower() == region]
-        branch = "filtered"
-
-    # #region agent log
-    _agent_log(
-        hypothesis_id="H1",
-        location="sales_visulaizers.update_dashboard:after_filter",
-        message="After region filter",
-        data={"branch": branch, "filtered_rows": int(len(filtered_df))},
-    )
-    # #endregion
-
-    daily_sales = (
-        filtered_df.groupby("Date", as_index=False)
-        .agg({"Sales": "sum", "Quantity": "sum"})
-        .sort_values("Date")
-    )
-
-    # #region agent log
-    _agent_log(
-        hypothesis_id="H2",
-        location="sales_visulaizers.update_dashboard:after_groupby",
-        message="After groupby",
-        data={
-            "daily_rows": int(len(daily_sales)),
-            "columns": list(daily_sales.columns),
-        },
-    )
-    # #endregion
-
-    before = daily_sales[daily_sales["Date"] < price_increase_date]["Sales"].sum()
-    after = daily_sales[daily_sales["Date"] >= price_increase_date]["Sales"].sum()
-    total_sales = daily_sales["Sales"].sum()
-    total_quantity = int(daily_sales["Quantity"].sum())
-
-    before_qty = int(filtered_df[filtered_df["Date"] < price_increase_date]["Quantity"].sum())
-    after_qty = int(filtered_df[filtered_df["Date"] >= price_increase_date]["Quantity"].sum())
-
-    # #region agent log
-    _agent_log(
-        hypothesis_id="H3",
-        location="sales_visulaizers.update_dashboard:before_return",
-        message="Computed aggregates",
-        data={
-            "total_sales": float(total_sales),
-            "before_sales": float(before),
-            "after_sales": float(after),
-            "total_quantity": total_quantity,
-            "before_qty": before_qty,
-            "after_qty": after_qty,
-        },
-    )
-    # #endregion
+def _build_figures(view=None):
+    """Build the sales and quantity figures; with no ``view`` the traces are empty skeletons."""
+    dates, sales, quantity = (view.dates, view.sales, view.quantity) if view is not None else ([], [], [])
 
     # Sales chart
     fig_sales = go.Figure()
     fig_sales.add_trace(
         go.Scatter(
-            x=daily_sales["Date"],
-            y=daily_sales["Sales"],
+            x=dates,
+            y=sales,
             mode="lines",
             line=dict(width=2.5, color="#0ea5e9"),
             fill="tozeroy",
@@ -317,8 +172,8 @@ def update_dashboard(region):
     fig_quantity = go.Figure()
     fig_quantity.add_trace(
         go.Scatter(
-            x=daily_sales["Date"],
-            y=daily_sales["Quantity"],
+            x=dates,
+            y=quantity,
             mode="lines",
             line=dict(width=2.5, color="#10b981"),
             fill="tozeroy",
@@ -328,16 +183,626 @@ def update_dashboard(region):
     fig_quantity.add_vline(x=price_increase_str, line_width=2, line_dash="dash", line_color="#94a3b8")
     fig_quantity.update_layout(**_chart_layout(yaxis_overrides=dict(title="Quantity", tickformat=",.0f")))
 
+    return fig_sales, fig_quantity
+
+
+# Layout, styling and the price-increase marker are sent once with the page;
+# callbacks only patch the trace data.
+sales_figure_skeleton, quantity_figure_skeleton = _build_figures()
+
+GRANULARITY_LABELS = {
+    "daily": "Daily", "weekly": "Weekly", "monthly": "Monthly",
+    "rolling7": "7-day avg", "rolling28": "28-day avg",
+}
+
+kpi_style = {"flex": 1,"minWidth": "180px","padding": "24px","backgroundColor": "white","borderRadius": "12px","boxShadow": "0 1px 3px rgba(0,0,0,0.06)","border": "1px solid #f1f5f9",}
+kpi_value_style = {"fontSize": "28px","fontWeight": "700","color": "#0f172a","marginBottom": "4px",}
+kpi_label_style = {"fontSize": "13px","color": "#64748b","fontWeight": "500",}
+
+def build_layout():
+    """The page layout; built from static options and empty figure skeletons only."""
+    return html.Div(
+        style={"fontFamily": "'Inter', -apple-system, BlinkMacSystemFont, sans-serif","backgroundColor": "#f8fafc","minHeight": "100vh","padding": "48px 24px",},
+        children=[
+            html.Div(
+                style={"maxWidth": "1200px", "margin": "0 auto"},
+                children=[
+
+                    *(
+                        [dcc.Location(id="url"), dcc.Store(id="region-series")]
+                        if CLIENTSIDE
+                        else []
+                    ),
+                    *(
+                        [html.Div(id="dashboard-status", role="status", style={"position": "fixed","top": "16px","right": "24px","fontSize": "13px","color": "#64748b",})]
+                        if "dashboard" in BACKGROUND and not CLIENTSIDE
+                        else []
+                    ),
+
+                    html.Header(
+                        style={"marginBottom": "40px","paddingBottom": "32px","borderBottom": "1px solid #e2e8f0",},
+                        children=[
+                            html.H1(
+                                "Soul Foods · Pink Morsels",
+                                id="main-header",
+                                style={"fontSize": "28px","fontWeight": "700","color": "#0f172a","letterSpacing": "-0.02em","marginBottom": "8px",},
+                            ),
+                            html.P(
+                                "Sales performance analysis to evaluate the impact of the January 15th, 2021 price increase.",
+                                style={"fontSize": "15px", "color": "#64748b", "lineHeight": 1.6},
+                            ),
+                        ],
+                    ),
+
+                    html.Div(
+                        style={"display": "flex","justifyContent": "space-between","alignItems": "center","marginBottom": "24px","flexWrap": "wrap","gap": "16px",},
+                        children=[
+                            html.Div(
+                                [
+                                    html.Div(
+                                        "Filter by Region",
+                                        style={"fontSize": "13px","fontWeight": "600","color": "#475569","marginBottom": "8px",},
+                                    ),
+                                    dcc.RadioItems(
+                                        id="region-filter",
+                                        options=[
+                                            {"label": "All", "value": "all"},
+                                            {"label": "North", "value": "north"},
+                                            {"label": "East", "value": "east"},
+                                            {"label": "South", "value": "south"},
+                                            {"label": "West", "value": "west"},
+                                        ],
+                                        value="all",
+                                        inline=True,
+                                        inputStyle={"marginRight": "6px"},
+                                        labelStyle={"marginRight": "16px","fontSize": "14px","color": "#334155","cursor": "pointer",},
+                                    ),
+                                ]
+                            ),
+                            *(
+                                [html.Div(
+                                    [
+                                        html.Div(
+                                            "Resolution",
+                                            style={"fontSize": "13px","fontWeight": "600","color": "#475569","marginBottom": "8px",},
+                                        ),
+                                        dcc.RadioItems(
+                                            id="granularity",
+                                            options=[{"label": label, "value": value} for value, label in GRANULARITY_LABELS.items()],
+                                            value="daily",
+                                            inline=True,
+                                            inputStyle={"marginRight": "6px"},
+                                            labelStyle={"marginRight": "16px","fontSize": "14px","color": "#334155","cursor": "pointer",},
+                                        ),
+                                    ]
+                                )]
+                                if not CLIENTSIDE
+                                else []
+                            ),
+                            html.Div(
+                                [
+                                    html.Div(
+                                        "Comparison Window",
+                                        style={"fontSize": "13px","fontWeight": "600","color": "#475569","marginBottom": "8px",},
+                                    ),
+                                    dcc.DatePickerRange(
+                                        id="kpi-window",
+                                        display_format="D MMM YYYY",
+                                        clearable=True,
+                                        start_date_placeholder_text="First day",
+                                        end_date_placeholder_text="Last day",
+                                    ),
+                                ]
+                            ),
+                            html.Div(
+                                [
+                                    html.Div(
+                                        "Split Date",
+                                        style={"fontSize": "13px","fontWeight": "600","color": "#475569","marginBottom": "8px",},
+                                    ),
+                                    dcc.DatePickerSingle(
+                                        id="split-date",
+                                        date=price_increase_str,
+                                        display_format="D MMM YYYY",
+                                    ),
+                                ]
+                            ),
+                        ],
+                    ),
+
+                    # KPI Cards
+                    html.Div(
+                        style={"display": "flex","gap": "20px","marginBottom": "32px","flexWrap": "wrap",},
+                        children=[
+                            html.Div(
+                                [html.Div(id="total-quantity", style=kpi_value_style),
+                                 html.Div("Total Quantity", style=kpi_label_style)],
+                                style=kpi_style,
+                            ),
+                            html.Div(
+                                [
+                                    html.Div(
+                                        [
+                                            html.Div(id="before-qty", style={"fontSize": "20px", "fontWeight": "700", "color": "#0f172a"}),
+                                            html.Div("Qty Pre–Price Increase", style={"fontSize": "12px", "color": "#64748b", "marginBottom": "10px"}),
+                                            html.Div(id="after-qty", style={"fontSize": "20px", "fontWeight": "700", "color": "#0f172a"}),
+                                            html.Div("Qty Post–Price Increase", style={"fontSize": "12px", "color": "#64748b"}),
+                                        ]
+                                    ),
+                                    html.Div("Quantity Split", style={**kpi_label_style, "marginTop": "12px"}),
+                                ],
+                                style=kpi_style,
+                            ),
+                            html.Div(
+                                [html.Div(id="total-sales", style=kpi_value_style),
+                                 html.Div("Total Sales", style=kpi_label_style)],
+                                style=kpi_style,
+                            ),
+                            html.Div(
+                                [
+                                    html.Div(
+                                        [
+                                            html.Div(id="before-sales", style={"fontSize": "20px", "fontWeight": "700", "color": "#0f172a"}),
+                                            html.Div("Pre–Price Increase", style={"fontSize": "12px", "color": "#64748b", "marginBottom": "10px"}),
+                                            html.Div(id="after-sales", style={"fontSize": "20px", "fontWeight": "700", "color": "#0f172a"}),
+                                            html.Div("Post–Price Increase", style={"fontSize": "12px", "color": "#64748b"}),
+                                        ]
+                                    ),
+                                    html.Div("Sales Split", style={**kpi_label_style, "marginTop": "12px"}),
+                                ],
+                                style=kpi_style,
+                            ),
+                        ],
+                    ),
+
+                    # Sales Chart
+                    html.Div(
+                        style={"backgroundColor": "white","borderRadius": "16px","padding": "28px","boxShadow": "0 1px 3px rgba(0,0,0,0.06)","border": "1px solid #f1f5f9","marginBottom": "32px",},
+                        children=[
+                            dcc.Graph(
+                                id="sales-graph",
+                                figure=sales_figure_skeleton,
+                                config={"displayModeBar": True, "displaylogo": False},
+                            )
+                        ],
+                    ),
+
+                    # Price & Quantity Charts row
+                    html.Div(
+                        style={"display": "flex", "gap": "24px", "marginBottom": "32px", "flexWrap": "wrap"},
+                        children=[
+                            html.Div(
+                                style={"flex": 1, "minWidth": "360px", "backgroundColor": "white", "borderRadius": "16px", "padding": "28px", "boxShadow": "0 1px 3px rgba(0,0,0,0.06)", "border": "1px solid #f1f5f9"},
+                                children=[
+                                    dcc.Graph(id="quantity-graph", figure=quantity_figure_skeleton, config={"displayModeBar": True, "displaylogo": False}),
+                                ],
+                            ),
+                        ],
+                    ),
+
+                    # Price change statistics
+                    html.Div(
+                        style={"backgroundColor": "white","borderRadius": "16px","padding": "28px","boxShadow": "0 1px 3px rgba(0,0,0,0.06)","border": "1px solid #f1f5f9","marginBottom": "32px","overflowX": "auto",},
+                        children=[
+                            html.H3(
+                                "Daily Averages Before and After the Split",
+                                style={"fontSize": "16px","fontWeight": "600","color": "#0f172a","marginBottom": "12px",},
+                            ),
+                            *(
+                                [html.Progress(id="price-stats-progress", value="0", max="3", style={"display": "none"})]
+                                if "price_stats" in BACKGROUND
+                                else []
+                            ),
+                            html.Div(id="price-stats"),
+                        ],
+                    ),
+
+                    # Insight
+                    html.Div(
+                        style={"padding": "24px 28px","backgroundColor": "white","borderRadius": "16px","boxShadow": "0 1px 3px rgba(0,0,0,0.06)","border": "1px solid #f1f5f9","borderLeft": "4px solid #0ea5e9",},
+                        children=[
+                            html.H3(
+                                "Key Insight",
+                                style={"fontSize": "16px","fontWeight": "600","color": "#0f172a","marginBottom": "12px",},
+                            ),
+                            html.P(
+                                "The change in sales volume before and after the price increase is clearly visible. "
+                                "Filtering by region further highlights how different markets responded to the pricing decision.",
+                                style={
+                                    "fontSize": "14px",
+                                    "color": "#475569",
+                                    "lineHeight": 1.7,
+                                    "margin": 0,
+                                },
+                            ),
+                        ],
+                    ),
+                ],
+            )
+        ],
+    )
+
+
+_dashboard_outputs_spec = [
+    Output("sales-graph", "figure"),
+    Output("total-quantity", "children"),
+    Output("before-qty", "children"),
+    Output("after-qty", "children"),
+    Output("total-sales", "children"),
+    Output("before-sales", "children"),
+    Output("after-sales", "children"),
+    Output("quantity-graph", "figure"),
+]
+
+
+def _triggered_id():
+    try:
+        return ctx.triggered_id
+    except Exception:
+        # Called directly (tests, benchmarks) rather than from a request.
+        return None
+
+
+def _viewport(relayout):
+    """Return the (start, end) day strings of a graph's zoomed x-range, or (None, None).
+
+    The range is widened to whole days so nearby zoom levels share cache
+    entries.
+    """
+    if not relayout or relayout.get("xaxis.autorange"):
+        return None, None
+    if "xaxis.range[0]" in relayout:
+        bounds = relayout["xaxis.range[0]"], relayout["xaxis.range[1]"]
+    elif "xaxis.range" in relayout:
+        bounds = tuple(relayout["xaxis.range"])
+    else:
+        return None, None
+    try:
+        start, end = (pd.Timestamp(b) for b in bounds)
+    except (TypeError, ValueError):
+        return None, None
+    return start.floor("D").strftime("%Y-%m-%d"), end.ceil("D").strftime("%Y-%m-%d")
+
+
+def _trace_patch(trace):
+    patch = Patch()
+    patch["data"][0]["x"] = trace["x"]
+    patch["data"][0]["y"] = trace["y"]
+    patch["data"][0]["type"] = trace["type"]
+    return patch
+
+
+def update_dashboard(region, sales_relayout=None, quantity_relayout=None,
+                     window_start=None, window_end=None, split_date=price_increase_str, granularity="daily"):
+    start = time.perf_counter()
+    trigger = _triggered_id()
+    data = get_backend().snapshot()
+
+    # Zooming or changing the resolution only changes the traces and moving
+    # the comparison window only the KPIs; a region change updates both.
+    if trigger in ("kpi-window", "split-date"):
+        traces = (no_update, no_update)
+    else:
+        # Each graph is cut to its own zoom; zooming one leaves the other be.
+        # Only the trace data changes; the figure skeletons in the layout
+        # keep their styling, marker, annotation and the user's zoom.
+        traces = []
+        for index, (graph, relayout) in enumerate([("sales-graph", sales_relayout),
+                                                   ("quantity-graph", quantity_relayout)]):
+            if trigger in ("sales-graph", "quantity-graph") and trigger != graph:
+                traces.append(no_update)
+            else:
+                series = _dashboard_series(data, region, *_viewport(relayout), granularity or "daily")
+                traces.append(_trace_patch(series[index]))
+    if trigger in ("sales-graph", "quantity-graph", "granularity"):
+        kpis = (no_update,) * 6
+    else:
+        kpis = _dashboard_outputs(data, region, window_start, window_end, split_date or price_increase_str)
+    outputs = (traces[0], *kpis, traces[1])
+
+    # Unknown inputs share one label so clients cannot grow the series set.
+    region_label = region if region in data.regions() or region == "all" else "other"
+    metrics.CALLBACK_LATENCY.observe(time.perf_counter() - start, callback="update_dashboard", input=region_label)
+    return outputs
+
+
+@outputs_cache.memoize
+def _dashboard_outputs(data, region, window_start=None, window_end=None, split_date=price_increase_str):
+    """KPI strings for ``region`` of snapshot ``data`` over a date window split at ``split_date``.
+
+    Each total is a difference of two prefix sums, so the cost does not
+    grow with the length of the history.
+    """
+    timer = perf_log.StageTimer()
+
+    with timer.stage("aggregate"):
+        before_totals, after_totals = data.split_totals(region, split_date, window_start, window_end)
+        before = before_totals.sales
+        after = after_totals.sales
+        total_sales = before + after
+        total_quantity = before_totals.quantity + after_totals.quantity
+
+        before_qty = before_totals.quantity
+        after_qty = after_totals.quantity
+
+    if perf_log.ENABLED:
+        fields = {
+            "region": region, "window": [window_start, window_end], "split_date": split_date,
+            "version": data.version, **timer.timings, "total_ms": timer.total_ms(),
+        }
+        if perf_log.DEBUG:
+            fields.update(
+                total_sales=total_sales,
+                before_sales=before,
+                after_sales=after,
+                total_quantity=total_quantity,
+                before_qty=before_qty,
+                after_qty=after_qty,
+            )
+        perf_log.log_event("update_dashboard", **fields)
+
     return (
-        fig_sales,
         f"{total_quantity:,}",
         f"{before_qty:,}",
         f"{after_qty:,}",
         f"${total_sales:,.0f}",
         f"${before:,.0f}",
         f"${after:,.0f}",
-        fig_quantity,
     )
 
+
+@outputs_cache.memoize
+def _rollup_levels(data):
+    """The rollup pyramid for snapshot ``data`` (see rollups.py).
+
+    merge_file.py writes it next to the data; if that file is missing or
+    does not reach the last loaded day, it is built from the backend's
+    daily series instead.
+    """
+    levels = rollups.read_levels(rollups.rollups_path(get_backend().csv_path))
+    last_day = data.daily_series(ALL_REGIONS)[0][-1:].strftime("%Y-%m-%d").tolist()
+    if levels is not None:
+        daily_all = levels.loc[(levels["Level"] == "daily") & (levels["Region"] == ALL_REGIONS), "Date"]
+        if daily_all.tail(1).tolist() == last_day:
+            return levels
+    return rollups.levels_from_series(
+        {region: data.daily_series(region) for region in [ALL_REGIONS, *data.regions()]}
+    )
+
+
+@outputs_cache.memoize
+def _dashboard_series(data, region, start=None, end=None, granularity="daily"):
+    """Return the sales and quantity traces for ``region`` of ``data`` between two day strings.
+
+    ``granularity`` picks a precomputed rollup level (weekly, monthly or a
+    rolling average) instead of daily totals. Long series are reduced by
+    downsample.reduce_series, so full daily detail is only sent once the
+    visible window is small enough.
+    """
+    timer = perf_log.StageTimer()
+
+    with timer.stage("filter"):
+        if granularity in rollups.LEVELS and granularity != "daily":
+            dates, sales, quantity = rollups.level_series(_rollup_levels(data), granularity, region, start, end)
+        else:
+            dates, sales, quantity = data.daily_series(region, start, end)
+
+    traces = []
+    with timer.stage("downsample"):
+        for values in (sales, quantity):
+            x, y, trace_type = downsample.reduce_series(dates, values, dates.asi8)
+            traces.append({"x": x, "y": y, "type": trace_type})
+
+    with timer.stage("serialize"):
+        for trace in traces:
+            trace["x"] = trace["x"].strftime("%Y-%m-%d").tolist()
+            trace["y"] = trace["y"].tolist()
+
+    metrics.ROWS_SCANNED.inc(len(dates), callback="update_dashboard")
+    if perf_log.ENABLED:
+        perf_log.log_event(
+            "dashboard_series", region=region, window=[start, end], granularity=granularity, daily_rows=len(dates),
+            points=[len(t["y"]) for t in traces], **timer.timings, total_ms=timer.total_ms(),
+        )
+    return tuple(traces)
+
+
+@outputs_cache.memoize
+def _price_series(data):
+    """Daily sales and quantity of every region, in the form price_stats expects."""
+    series = {}
+    for region in [ALL_REGIONS, *data.regions()]:
+        dates, sales, quantity = data.daily_series(region)
+        series[region] = (dates, {"sales": sales, "quantity": quantity})
+    return series
+
+
+@outputs_cache.memoize
+def _price_change_stats(data, split_date=price_increase_str):
+    """Bootstrap statistics for every region, computed once per dataset version and split."""
+    timer = perf_log.StageTimer()
+    with timer.stage("series"):
+        series = _price_series(data)
+    with timer.stage("bootstrap"):
+        stats = price_stats.price_change_stats(series, split_date)
+    perf_log.log_event("price_change_stats", split_date=split_date, regions=len(series),
+                       **timer.timings, total_ms=timer.total_ms())
+    return stats
+
+
+def _stat_cells(stats, money):
+    def fmt(value, signed=False):
+        sign = "-" if value < 0 else ("+" if signed else "")
+        return f"{sign}{'$' if money else ''}{abs(value):,.0f}"
+
+    if stats.pre_days == 0 or stats.post_days == 0:
+        return [html.Td(fmt(stats.pre_mean) if stats.pre_days else "–"),
+                html.Td(fmt(stats.post_mean) if stats.post_days else "–"), html.Td("–")]
+    # A zero pre-split mean has no meaningful relative change.
+    pct = f"{stats.pct_change:+.1%}" if stats.pre_mean and math.isfinite(stats.pct_change) else "–"
+    return [
+        html.Td(fmt(stats.pre_mean)),
+        html.Td(fmt(stats.post_mean)),
+        html.Td(f"{fmt(stats.diff, signed=True)} ({pct}), "
+                f"95% CI {fmt(stats.diff_low)} to {fmt(stats.diff_high)}"),
+    ]
+
+
+def update_price_stats(split_date=price_increase_str, progress=None):
+    """Table of per-day sales and quantity before/after ``split_date`` with bootstrap intervals.
+
+    ``progress(done, total)`` is called as each of the three steps starts.
+    """
+    progress = progress or (lambda done, total: None)
+    progress(0, 3)
+    data = get_backend().snapshot()
+    _price_series(data)
+    progress(1, 3)
+    stats = _price_change_stats(data, (split_date or price_increase_str)[:10])
+    progress(2, 3)
+    header = ["Region", "Sales/day before", "Sales/day after", "Change",
+              "Qty/day before", "Qty/day after", "Change"]
+    rows = [
+        html.Tr([html.Td(region.title()), *_stat_cells(stats[region, "sales"], True),
+                 *_stat_cells(stats[region, "quantity"], False)])
+        for region in dict.fromkeys(r for r, _ in stats)
+    ]
+    return html.Table(
+        [html.Thead(html.Tr([html.Th(h) for h in header])), html.Tbody(rows)],
+        style={"width": "100%", "fontSize": "13px", "color": "#334155", "borderCollapse": "collapse"},
+    )
+
+
+def update_price_stats_job(set_progress, split_date=price_increase_str):
+    """update_price_stats run as a background job, driving the progress bar."""
+    return update_price_stats(split_date, progress=lambda done, total: set_progress((str(done), str(total))))
+
+
+def load_region_series(_pathname):
+    """Ship every region's daily series plus empty figure templates to the browser."""
+    return _region_series(get_backend().snapshot())
+
+
+@outputs_cache.memoize
+def _region_series(data):
+    return {
+        "version": data.version,
+        "series": data.payload(),
+        "templates": {
+            "sales": sales_figure_skeleton.to_plotly_json(),
+            "quantity": quantity_figure_skeleton.to_plotly_json(),
+        },
+    }
+
+
+_job_manager = None
+
+
+def _background_options(name):
+    """Keyword arguments for ``app.callback`` that run callback ``name`` as a background job.
+
+    Jobs are keyed on their inputs and the dataset version, so a finished
+    view is served from the job store to every later visitor. The browser
+    drops a pending job when the same callback fires again (e.g. another
+    region is clicked) and the manager cancels it.
+    """
+    global _job_manager
+    if name not in BACKGROUND:
+        return {}
+    if _job_manager is None:
+        _job_manager = background_jobs.from_env(cache_by=[lambda: get_backend().version])
+    if name == "dashboard":
+        dimmed = {"opacity": 0.5, "transition": "opacity 0.2s"}
+        running = [
+            (Output("dashboard-status", "children"), "Updating…", ""),
+            (Output("sales-graph", "style"), dimmed, {}),
+            (Output("quantity-graph", "style"), dimmed, {}),
+        ]
+    else:
+        running = [
+            (Output("price-stats-progress", "style"), {"display": "block", "width": "100%"}, {"display": "none"}),
+            (Output("price-stats", "style"), {"opacity": 0.5}, {}),
+        ]
+    return dict(
+        background=True, manager=_job_manager, interval=BACKGROUND_POLL_MS, running=running,
+        # update_dashboard's outputs depend on which input fired.
+        cache_ignore_triggered=name != "dashboard",
+    )
+
+
+def create_app(backend=None, warm=False):
+    """Build the Dash app: layout, callbacks, the /metrics endpoint and response compression.
+
+    No data is read unless ``warm`` is set; pass ``backend`` to serve a
+    specific dataset instead of the one configured by the environment. The
+    backend is bound to this app's server, so apps built with different
+    backends serve their own data side by side; the callback cache is
+    shared but keyed by dataset version. Call callbacks directly under
+    ``app.server.app_context()`` to use the app's backend. Background jobs
+    (DASHBOARD_BACKGROUND) run in other processes and always read the
+    configured dataset.
+    """
+    app = Dash(__name__, suppress_callback_exceptions=True)
+    if backend is not None:
+        backend.on_swap(outputs_cache.invalidate)
+        app.server.config[BACKEND_CONFIG_KEY] = backend
+    http_cache.install(app, lambda: get_backend().version)
+    # Flask runs after_request hooks last-registered first, so installing
+    # metrics second lets it measure bodies before they are compressed.
+    metrics.install(app.server)
+    app.index_string = INDEX_STRING
+    app.layout = build_layout()
+
+    if CLIENTSIDE:
+        app.callback(Output("region-series", "data"), Input("url", "pathname"))(load_region_series)
+        app.clientside_callback(
+            ClientsideFunction(namespace="dashboard", function_name="updateRegion"),
+            *_dashboard_outputs_spec,
+            Input("region-filter", "value"),
+            Input("region-series", "data"),
+            Input("kpi-window", "start_date"),
+            Input("kpi-window", "end_date"),
+            Input("split-date", "date"),
+        )
+    else:
+        app.callback(
+            *_dashboard_outputs_spec,
+            Input("region-filter", "value"),
+            Input("sales-graph", "relayoutData"),
+            Input("quantity-graph", "relayoutData"),
+            Input("kpi-window", "start_date"),
+            Input("kpi-window", "end_date"),
+            Input("split-date", "date"),
+            Input("granularity", "value"),
+            **_background_options("dashboard"),
+        )(update_dashboard)
+
+    if "price_stats" in BACKGROUND:
+        app.callback(
+            Output("price-stats", "children"), Input("split-date", "date"),
+            progress=[Output("price-stats-progress", "value"), Output("price-stats-progress", "max")],
+            **_background_options("price_stats"),
+        )(update_price_stats_job)
+    else:
+        app.callback(Output("price-stats", "children"), Input("split-date", "date"))(update_price_stats)
+
+    if warm:
+        with app.server.app_context():
+            warm_up()
+    return app
+
+
+app = create_app()
+
+
 if __name__ == "__main__":
+    warm_up()
+    backend = get_backend()
+    if isinstance(backend, backends.CubeBackend) and backend.store.current().memory_bytes is not None:
+        _report = backend.store.current().memory_bytes
+        print(f"Dataset loaded from {sum(_report.values()) / 1024:,.0f} KiB of rows " + ", ".join(
+            f"{name}={size / 1024:,.0f} KiB" for name, size in _report.items()
+        ))
+    elif isinstance(backend, backends.SQLBackend):
+        print(f"Dataset served from {backend.db_path}")
     app.run(debug=True)
\ No newline at end of file
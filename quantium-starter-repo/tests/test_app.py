@@ -1,3 +1,5 @@
+import os
+import subprocess
 import sys
 from pathlib import Path
 import pytest
@@ -6,6 +8,8 @@ PROJECT_ROOT = Path(__file__).resolve().parents[1]
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
+import backends
+import sales_visulaizers
 from sales_visulaizers import app
 
 
@@ -45,3 +49,100 @@ def test_region_picker_is_present():
     """Ensure the region picker control is present in the layout."""
     region_control = _find_by_id(app.layout, "region-filter")
     assert region_control is not None
+
+
+def test_import_reads_no_data(tmp_path):
+    """Both dashboards import and build their apps in a directory without any dataset."""
+    env = dict(os.environ, PYTHONPATH=str(PROJECT_ROOT), DASHBOARD_RELOAD_INTERVAL="0")
+    code = "import app, sales_visulaizers as sv; sv.create_app(); assert sv._backend is None"
+    subprocess.run([sys.executable, "-c", code], cwd=tmp_path, env=env, check=True)
+
+
+def _backend(tmp_path, rows, name="sales.csv"):
+    csv_path = tmp_path / name
+    csv_path.write_text("Sales,Quantity,Price,Date,Region\n" + rows)
+    return backends.CubeBackend(csv_path, "2021-01-15")
+
+
+def test_callbacks_use_injected_dataset(tmp_path):
+    """A fixture dataset passed to create_app drives that app's callbacks."""
+    backend = _backend(tmp_path, "3.0,1,3.0,2021-01-14,north\n10.0,2,5.0,2021-01-15,north\n")
+    dash_app = sales_visulaizers.create_app(backend=backend)
+    with dash_app.server.app_context():
+        outputs = sales_visulaizers.update_dashboard("north")
+    assert outputs[1:7] == ("3", "1", "2", "$13", "$3", "$10")
+    assert sales_visulaizers._backend is not backend
+
+
+def test_apps_with_different_backends_serve_their_own_data(tmp_path):
+    """A second create_app does not change the data the first app serves."""
+    first = sales_visulaizers.create_app(backend=_backend(tmp_path, "3.0,1,3.0,2021-01-14,north\n", "a.csv"))
+    second = sales_visulaizers.create_app(backend=_backend(tmp_path, "7.0,1,7.0,2021-01-14,north\n", "b.csv"))
+    with first.server.app_context():
+        assert sales_visulaizers.update_dashboard("north")[4] == "$3"
+    with second.server.app_context():
+        assert sales_visulaizers.update_dashboard("north")[4] == "$7"
+    with first.server.app_context():
+        assert sales_visulaizers.update_dashboard("north")[4] == "$3"
+
+
+def test_granularity_reads_rollup_level(tmp_path):
+    """A non-daily resolution builds the traces from that rollup level."""
+    backend = _backend(tmp_path, "3.0,1,3.0,2021-01-14,north\n10.0,2,5.0,2021-02-15,north\n")
+    with sales_visulaizers.create_app(backend=backend).server.app_context():
+        traces = sales_visulaizers._dashboard_series(backend.snapshot(), "north", None, None, "monthly")
+    assert traces[0]["x"] == ["2021-01-01", "2021-02-01"]
+    assert traces[0]["y"] == [3.0, 10.0]
+
+
+def test_zoom_updates_only_the_zoomed_graph(tmp_path, monkeypatch):
+    """Each graph is cut to its own zoom; zooming one leaves the other untouched."""
+    backend = _backend(tmp_path, "".join(f"{day}.0,{day},1.0,2021-01-{day:02d},north\n" for day in range(1, 29)))
+    zoom = {"xaxis.range[0]": "2021-01-10", "xaxis.range[1]": "2021-01-12"}
+    with sales_visulaizers.create_app(backend=backend).server.app_context():
+        monkeypatch.setattr(sales_visulaizers, "_triggered_id", lambda: "sales-graph")
+        outputs = sales_visulaizers.update_dashboard("north", zoom, None)
+        assert outputs[0].to_plotly_json()["operations"][0]["params"]["value"] == [
+            "2021-01-09", "2021-01-10", "2021-01-11", "2021-01-12", "2021-01-13"]
+        assert outputs[7] is sales_visulaizers.no_update
+
+        monkeypatch.setattr(sales_visulaizers, "_triggered_id", lambda: "region-filter")
+        outputs = sales_visulaizers.update_dashboard("north", zoom, None)
+        quantity_x = outputs[7].to_plotly_json()["operations"][0]["params"]["value"]
+        assert len(quantity_x) == 28
+
+
+def test_warm_up_fills_the_callback_cache(tmp_path, monkeypatch):
+    """After warm_up the default view's first callback is served from the cache."""
+    backend = _backend(tmp_path, "3.0,1,3.0,2021-01-14,north\n10.0,2,5.0,2021-01-15,north\n")
+    dash_app = sales_visulaizers.create_app(backend=backend, warm=True)
+
+    def cold(*args):
+        raise AssertionError("callback recomputed after warm_up")
+
+    monkeypatch.setattr(backends.CubeSnapshot, "split_totals", cold)
+    monkeypatch.setattr(backends.CubeSnapshot, "daily_series", cold)
+    with dash_app.server.app_context():
+        assert sales_visulaizers.update_dashboard("all")[4] == "$13"
+
+
+def test_zero_pre_split_mean_shows_no_percent_change():
+    """A region with no pre-split sales shows "–" rather than an infinite percent change."""
+    stats = sales_visulaizers.price_stats.PriceChangeStats(
+        pre_days=3, post_days=3, pre_mean=0.0, post_mean=5.0, diff=5.0, diff_low=4.0, diff_high=6.0,
+        pct_change=float("nan"))
+    summary = sales_visulaizers._stat_cells(stats, money=True)[2].children
+    assert "(–)" in summary and "inf" not in summary and "nan" not in summary
+
+
+def test_outputs_come_from_the_snapshot_passed_in(tmp_path):
+    """A snapshot taken before a reload keeps answering, and caching, under its own version."""
+    backend = _backend(tmp_path, "3.0,1,3.0,2021-01-14,north\n")
+    sales_visulaizers.create_app(backend=backend)
+    before = backend.snapshot()
+    (tmp_path / "sales.csv").write_text("Sales,Quantity,Price,Date,Region\n7.0,1,7.0,2021-01-14,north\n")
+    assert backend.store.reload() is True
+
+    assert sales_visulaizers._dashboard_outputs(before, "north")[4] == "$3"
+    assert sales_visulaizers._dashboard_outputs(backend.snapshot(), "north")[4] == "$7"
+    assert sales_visulaizers._dashboard_outputs(before, "north")[4] == "$3"
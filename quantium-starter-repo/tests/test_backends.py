@@ -0,0 +1,78 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import backends
+
+CSV = (
+    "Sales,Quantity,Price,Date,Region\n"
+    "3.0,1,3.0,2021-01-13,north\n"
+    "6.0,2,3.0,2021-01-14,South\n"
+    "9.0,3,3.0,2021-01-15,north\n"
+    "12.0,4,3.0,2021-01-16,north\n"
+    "15.0,5,3.0,2021-01-16,south\n"
+)
+
+
+def _backends(tmp_path, engines):
+    csv_path = tmp_path / "sales.csv"
+    csv_path.write_text(CSV)
+    return [backends.create(name, csv_path, "2021-01-15") for name in engines]
+
+
+@pytest.mark.parametrize("engine", ["sqlite", "duckdb"])
+def test_sql_backend_matches_cube(tmp_path, engine):
+    """Pushed-down SQL aggregations give the same answers as the in-memory cube."""
+    if engine == "duckdb":
+        pytest.importorskip("duckdb")
+    cube, sql = _backends(tmp_path, ["cube", engine])
+    assert sql.version == cube.version
+    assert sql.regions() == cube.regions() == ["north", "south"]
+    for region in ("all", "north", "south", "atlantis"):
+        for window in ((None, None), ("2021-01-14", "2021-01-15")):
+            assert sql.split_totals(region, "2021-01-15", *window) == cube.split_totals(region, "2021-01-15", *window)
+            expected = cube.daily_series(region, *window)
+            actual = sql.daily_series(region, *window)
+            assert list(actual[0]) == list(expected[0])
+            assert list(actual[1]) == list(expected[1])
+            assert list(actual[2]) == list(expected[2])
+    assert sql.payload() == cube.payload()
+
+
+def test_sqlite_backend_reuses_and_rebuilds_database(tmp_path):
+    """The database is reused for unchanged input and swapped after a change."""
+    (first,) = _backends(tmp_path, ["sqlite"])
+    (again,) = _backends(tmp_path, ["sqlite"])
+    assert again.db_path == first.db_path
+
+    swapped = []
+    first.on_swap(lambda: swapped.append(first.version))
+    (tmp_path / "sales.csv").write_text(CSV + "30.0,10,3.0,2021-01-17,west\n")
+    assert first.reload() is True
+    assert swapped == [first.version]
+    assert first.regions() == ["north", "south", "west"]
+    assert first.split_totals("all", "2021-01-15")[1].quantity == 22
+    assert not Path(again.db_path).exists()
+
+
+def test_sqlite_snapshot_keeps_its_file_until_dropped(tmp_path):
+    """A snapshot taken before a reload keeps answering from its own file, deleted once it is dropped."""
+    (backend,) = _backends(tmp_path, ["sqlite"])
+    snapshot = backend.snapshot()
+    old_path = backend.db_path
+    (tmp_path / "sales.csv").write_text(CSV + "30.0,10,3.0,2021-01-17,west\n")
+    assert backend.reload() is True
+
+    assert snapshot.version != backend.version
+    assert snapshot.regions() == ["north", "south"]
+    assert snapshot.split_totals("all", "2021-01-15")[1].quantity == 12
+    assert Path(old_path).exists()
+    del snapshot
+    backend.split_totals("all", "2021-01-15")
+    assert not Path(old_path).exists()
+    assert backend.snapshot().split_totals("all", "2021-01-15")[1].quantity == 22
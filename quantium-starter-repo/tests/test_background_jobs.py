@@ -0,0 +1,142 @@
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import backends
+import sales_visulaizers
+from background_jobs import ProcessPoolManager, check_dash_version
+from benchmarks.load_test import callback_body
+
+
+def _add(a, b):
+    return a + b
+
+
+def _slow(seconds):
+    time.sleep(seconds)
+    return seconds
+
+
+def _counting(set_progress, steps):
+    for step in range(steps):
+        set_progress(step)
+        time.sleep(0.2)
+    return steps
+
+
+def _wait(predicate, timeout=60):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out")
+        time.sleep(0.05)
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = ProcessPoolManager(tmp_path, workers=1)
+    yield manager
+    manager.shutdown()
+
+
+def test_job_result_is_stored_and_consumed(manager):
+    """A finished job's result is returned once and the job stops running."""
+    job = manager.call_job_fn("key", manager.make_job_fn(_add, None), [2, 3], {})
+    _wait(lambda: manager.result_ready("key"))
+    _wait(lambda: not manager.job_running(job))
+    assert manager.get_result("key", job) == 5
+    assert manager.get_result("key", job) is manager.UNDEFINED
+
+
+def test_superseded_job_stores_nothing(manager):
+    """A job cancelled while queued behind another never produces a result."""
+    first = manager.call_job_fn("first", manager.make_job_fn(_slow, None), [1.0], {})
+    queued = manager.call_job_fn("queued", manager.make_job_fn(_add, None), [1, 1], {})
+    manager.terminate_job(queued)
+    assert not manager.job_running(queued)
+    _wait(lambda: manager.result_ready("first"))
+    time.sleep(0.5)
+    assert not manager.result_ready("queued")
+    _wait(lambda: not manager.job_running(first))
+
+
+def test_running_job_stops_at_next_progress_update(manager):
+    """Cancelling a job that reports progress ends it without a result."""
+    job = manager.call_job_fn("count", manager.make_job_fn(_counting, True), [50], {})
+    _wait(lambda: manager.get_progress("count") is not None)
+    manager.terminate_job(job)
+    time.sleep(1.0)
+    assert not manager.result_ready("count")
+    assert not (manager.directory / "jobs" / f"{job}.cancel").exists()
+
+
+def test_cached_results_skip_new_jobs(tmp_path):
+    """With cache_by a stored result answers later requests without running a job."""
+    manager = ProcessPoolManager(tmp_path, workers=1, cache_by=[lambda: "v1"])
+    try:
+        manager.results.set("key", 42)
+        job = manager.call_job_fn("key", manager.make_job_fn(_add, None), [1, 1], {})
+        assert not manager.job_running(job)
+        assert manager.get_result("key", job) == 42
+        assert manager.result_ready("key")
+        assert manager._pool is None
+    finally:
+        manager.shutdown()
+
+
+def test_signing_secret_is_shared(tmp_path):
+    """Every manager on one store directory agrees on the signing secret."""
+    first = ProcessPoolManager(tmp_path).get_or_create_signing_secret(lambda: b"one")
+    second = ProcessPoolManager(tmp_path).get_or_create_signing_secret(lambda: b"two")
+    assert first == second == b"one"
+
+
+def test_unsupported_dash_release_is_refused():
+    """The manager only starts on Dash releases whose job body it was run against."""
+    check_dash_version("4.4.1")
+    with pytest.raises(RuntimeError, match="pin Dash"):
+        check_dash_version("5.0.0")
+
+
+def test_dashboard_callback_runs_as_background_job(tmp_path, monkeypatch):
+    """With DASHBOARD_BACKGROUND the dashboard callback is submitted, polled and answered."""
+    csv_path = tmp_path / "sales.csv"
+    csv_path.write_text("Sales,Quantity,Price,Date,Region\n3.0,1,3.0,2021-01-14,north\n10.0,2,5.0,2021-01-15,north\n")
+    # Pool processes load the configured dataset themselves.
+    monkeypatch.setenv("DASHBOARD_DATA", str(csv_path))
+    monkeypatch.setenv("DASHBOARD_RELOAD_INTERVAL", "0")
+    monkeypatch.setenv("DASHBOARD_JOBS_DIR", str(tmp_path / "jobs"))
+    monkeypatch.setattr(sales_visulaizers, "BACKGROUND", {"dashboard"})
+    monkeypatch.setattr(sales_visulaizers, "_job_manager", None)
+    app = sales_visulaizers.create_app(backend=backends.CubeBackend(csv_path, "2021-01-15"))
+    client = app.server.test_client()
+    try:
+        page = client.get("/").get_data(as_text=True)
+        config = re.search(r'<script id="_dash-config" type="application/json">(.*?)</script>', page).group(1)
+        end_id = json.loads(config)["end_id"]
+        body = callback_body("north")
+        submitted = client.post("/_dash-update-component", json=body, query_string={"endId": end_id})
+        handles = submitted.get_json()
+        assert set(handles) >= {"cacheKey", "job"}
+
+        deadline = time.monotonic() + 60
+        while True:
+            response = client.post("/_dash-update-component", json=body,
+                                   query_string={"endId": end_id, **handles})
+            if response.status_code == 200 and response.get_json().get("response"):
+                break
+            assert time.monotonic() < deadline, "background job did not finish"
+            time.sleep(0.1)
+        assert response.get_json()["response"]["total-sales"]["children"] == "$13"
+        # The job's latency is recorded by the serving process.
+        _wait(lambda: 'callback="update_dashboard",input="background"' in client.get("/metrics").get_data(as_text=True))
+    finally:
+        sales_visulaizers._job_manager.shutdown()
@@ -0,0 +1,66 @@
+import sys
+from collections import namedtuple
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from callback_cache import CallbackCache, DiskBackend, MemoryBackend
+
+Data = namedtuple("Data", ["version"])
+
+
+def _counting_cache(backends, version):
+    calls = []
+    cache = CallbackCache(backends)
+
+    @cache.memoize
+    def compute(data, region):
+        calls.append(region)
+        return region.upper()
+
+    return cache, lambda region: compute(Data(version[0]), region), calls
+
+
+def test_entries_are_keyed_by_dataset_version():
+    """Repeat calls hit the cache until the dataset version changes."""
+    version = ["v1"]
+    cache, compute, calls = _counting_cache([MemoryBackend(maxsize=2)], version)
+    assert compute("north") == "NORTH"
+    assert compute("north") == "NORTH"
+    assert calls == ["north"]
+
+    version[0] = "v2"
+    compute("north")
+    assert calls == ["north", "north"]
+
+    cache.invalidate()
+    compute("north")
+    assert len(calls) == 3
+
+
+def test_disk_backend_is_shared_between_caches(tmp_path):
+    """A second process-local cache reuses entries written by the first."""
+    version = ["v1"]
+    _, first, first_calls = _counting_cache([MemoryBackend(), DiskBackend(tmp_path)], version)
+    _, second, second_calls = _counting_cache([MemoryBackend(), DiskBackend(tmp_path)], version)
+    first("east")
+    assert second("east") == "EAST"
+    assert first_calls == ["east"]
+    assert second_calls == []
+
+
+def test_defaulted_arguments_share_an_entry():
+    """Omitted arguments are keyed by their defaults, so both call forms hit one entry."""
+    calls = []
+    cache = CallbackCache([MemoryBackend()])
+
+    @cache.memoize
+    def compute(data, region, start=None, split="2021-01-15"):
+        calls.append(region)
+        return region
+
+    compute(Data("v1"), "all")
+    compute(Data("v1"), "all", None, "2021-01-15")
+    assert calls == ["all"]
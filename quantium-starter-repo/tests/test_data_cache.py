@@ -0,0 +1,95 @@
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from data_cache import cache_dir_for, compact_frame, load_sales
+
+CSV = "Sales,Quantity,Price,Date,Region\n3.0,1,3.0,2021-01-14,north\n6.0,2,3.0,2021-01-15,south\n"
+
+
+def test_cache_is_reused_until_content_changes(tmp_path):
+    """A second load hits the cache; changing the CSV rebuilds it under a new version."""
+    csv_path = tmp_path / "sales.csv"
+    csv_path.write_text(CSV)
+
+    first = load_sales(csv_path)
+    assert not first.attrs["cache_hit"]
+    assert cache_dir_for(csv_path).is_dir()
+
+    second = load_sales(csv_path)
+    assert second.attrs["cache_hit"]
+    assert second.attrs["version"] == first.attrs["version"]
+    assert list(second["Region"]) == ["north", "south"]
+    assert second.index.name == "Date"
+    assert second.index.dtype.kind == "M"
+    assert list(second["Quantity"]) == [1, 2]
+
+    csv_path.write_text(CSV + "9.0,3,3.0,2021-01-16,east\n")
+    third = load_sales(csv_path)
+    assert not third.attrs["cache_hit"]
+    assert third.attrs["version"] != first.attrs["version"]
+    assert len(third) == 3
+
+
+def test_touched_csv_with_same_content_is_a_hit(tmp_path):
+    """Only the content hash decides validity, not the modification time."""
+    csv_path = tmp_path / "sales.csv"
+    csv_path.write_text(CSV)
+    load_sales(csv_path)
+
+    st = os.stat(csv_path)
+    os.utime(csv_path, ns=(st.st_atime_ns, st.st_mtime_ns + 10_000_000_000))
+    assert load_sales(csv_path).attrs["cache_hit"]
+
+
+def test_compact_frame_narrows_only_when_lossless():
+    """Regions become lower-case categoricals; lossy float downcasts and money columns are skipped."""
+    df = pd.DataFrame(
+        {
+            "Date": pd.to_datetime(["2021-01-15", "2021-01-14"]),
+            "Region": [" North", "south"],
+            "Quantity": [1, 300],
+            "Price": [3.0, 4.5],
+            "Sales": [3.0, 1350.0],
+            "Weight": [0.5, 2.0],
+            "Ratio": [0.1, 1.0],
+        }
+    )
+    compact = compact_frame(df)
+    assert list(compact["Region"]) == ["south", "north"]
+    assert isinstance(compact["Region"].dtype, pd.CategoricalDtype)
+    assert compact["Quantity"].dtype == "int16"
+    assert compact["Weight"].dtype == "float32"
+    assert compact["Ratio"].dtype == "float64"
+    assert compact["Price"].dtype == "float64"
+    assert compact["Sales"].dtype == "float64"
+
+
+def test_summary_totals_match_uncompacted_sum(tmp_path):
+    """Headline totals from the compacted frame equal a plain float64 sum to the cent."""
+    from app import load_summary
+
+    rng = np.random.default_rng(0)
+    n = 200_000
+    raw = pd.DataFrame({
+        # Quarter-dollar amounts survive a per-row float32 cast; their sum does not.
+        "Sales": rng.integers(4, 4_000, n) / 4,
+        "Quantity": rng.integers(1, 20, n),
+        "Price": 3.0,
+        "Date": pd.date_range("2020-01-01", periods=730).strftime("%Y-%m-%d")[rng.integers(0, 730, n)],
+        "Region": "north",
+    })
+    csv_path = tmp_path / "sales.csv"
+    raw.to_csv(csv_path, index=False)
+
+    _, _, (total, before, after) = load_summary(csv_path)
+    expected = pd.read_csv(csv_path)["Sales"].sum()
+    assert round(total, 2) == round(expected, 2)
+    assert round(before + after, 2) == round(total, 2)
@@ -0,0 +1,68 @@
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from dataset_store import DatasetStore
+
+CSV = "Sales,Quantity,Price,Date,Region\n3.0,1,3.0,2021-01-14,north\n6.0,2,3.0,2021-01-15,south\n"
+MORE = "9.0,3,3.0,2021-01-16,east\n"
+
+
+def test_reload_swaps_snapshot_and_notifies(tmp_path):
+    """A changed CSV produces a new snapshot; an unchanged one is left alone."""
+    csv_path = tmp_path / "sales.csv"
+    csv_path.write_text(CSV)
+    store = DatasetStore(csv_path, "2021-01-15")
+    old = store.current()
+    swapped = []
+    store.on_swap(swapped.append)
+
+    assert store.reload() is False
+    csv_path.write_text(CSV + MORE)
+    assert store.reload() is True
+
+    new = store.current()
+    assert new.version != old.version
+    assert swapped == [new]
+    assert new.cube.view("all").total_quantity == 6
+    # The old snapshot stays intact for callbacks still using it.
+    assert old.cube.view("all").total_quantity == 3
+
+
+def test_watcher_picks_up_new_file(tmp_path):
+    """The background watcher reloads once the file stops changing."""
+    csv_path = tmp_path / "sales.csv"
+    csv_path.write_text(CSV)
+    store = DatasetStore(csv_path, "2021-01-15")
+    version = store.current().version
+    store.start_watching(interval=0.02)
+    try:
+        csv_path.write_text(CSV + MORE)
+        deadline = time.monotonic() + 5
+        while store.current().version == version and time.monotonic() < deadline:
+            time.sleep(0.02)
+    finally:
+        store.stop_watching()
+    assert store.current().version != version
+
+
+def test_shared_cube_is_mapped_from_disk(tmp_path):
+    """Shared stores map one prepared cube and give the same totals as an in-memory one."""
+    csv_path = tmp_path / "sales.csv"
+    csv_path.write_text(CSV)
+    first = DatasetStore(csv_path, "2021-01-15", shared=True).current()
+    second = DatasetStore(csv_path, "2021-01-15", shared=True).current()
+    assert first.memory_bytes is None
+    assert isinstance(second.cube.sales, np.memmap)
+    assert second.cube.sales.filename == first.cube.sales.filename
+    memory = DatasetStore(csv_path, "2021-01-15").current()
+    assert "df" not in memory._fields and memory.memory_bytes["Sales"] > 0
+    assert second.version == memory.version
+    assert second.cube.split_totals("all", "2021-01-15") == memory.cube.split_totals("all", "2021-01-15")
+    assert list(second.cube.view("south").dates) == list(memory.cube.view("south").dates)
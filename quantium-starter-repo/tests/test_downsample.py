@@ -0,0 +1,35 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from downsample import lttb_indices, minmax_indices
+
+
+def test_lttb_keeps_endpoints_and_spikes():
+    """LTTB returns the requested number of ordered points and keeps a lone spike."""
+    x = np.arange(10_000)
+    y = np.sin(x / 500.0)
+    y[4321] = 50.0
+    keep = lttb_indices(x, y, 200)
+    assert len(keep) == 200
+    assert keep[0] == 0 and keep[-1] == len(x) - 1
+    assert np.all(np.diff(keep) > 0)
+    assert 4321 in keep
+
+
+def test_minmax_keeps_bucket_extremes():
+    """Min/max bucketing keeps the global minimum and maximum."""
+    y = np.random.default_rng(0).normal(size=5_000)
+    keep = minmax_indices(y, 100)
+    assert len(keep) <= 100
+    assert int(np.argmin(y)) in keep and int(np.argmax(y)) in keep
+
+
+def test_short_series_are_untouched():
+    """Nothing is dropped when the series already fits."""
+    assert list(lttb_indices(np.arange(5), np.arange(5), 10)) == [0, 1, 2, 3, 4]
@@ -0,0 +1,41 @@
+import json
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import backends
+import export_snapshot
+
+
+def test_export_writes_every_region_view(tmp_path):
+    """The bundle holds one view per region with the dashboard's KPIs embedded in the page."""
+    csv_path = tmp_path / "sales.csv"
+    csv_path.write_text(
+        "Sales,Quantity,Price,Date,Region\n"
+        "3.0,1,3.0,2021-01-14,north\n10.0,2,5.0,2021-01-15,north\n4.0,1,4.0,2021-01-15,south\n"
+    )
+    backend = backends.CubeBackend(csv_path, "2021-01-15")
+    regions = export_snapshot.export_snapshot(tmp_path / "snapshot", backend=backend)
+
+    assert regions == ["all", "north", "south"]
+    bundle = tmp_path / "snapshot"
+    assert sorted(p.name for p in (bundle / "views").iterdir()) == ["all.json", "north.json", "south.json"]
+    north = json.loads((bundle / "views" / "north.json").read_text())
+    assert north["kpis"]["total-sales"] == "$13"
+    assert north["figures"]["sales"]["data"][0]["x"] == ["2021-01-14", "2021-01-15"]
+    assert (bundle / "plotly.min.js").exists()
+    page = (bundle / "index.html").read_text()
+    assert '<script src="plotly.min.js"></script>' in page
+    assert '"total-sales":"$17"' in page
+
+
+def test_forked_workers_render_the_given_backend(tmp_path):
+    """Views rendered in worker processes come from the backend passed in, not the configured one."""
+    csv_path = tmp_path / "sales.csv"
+    csv_path.write_text("Sales,Quantity,Price,Date,Region\n3.0,1,3.0,2021-01-14,north\n4.0,1,4.0,2021-01-15,south\n")
+    backend = backends.CubeBackend(csv_path, "2021-01-15")
+    regions = ["all", "north", "south"]
+    assert export_snapshot.render_views(regions, backend, workers=2) == export_snapshot.render_views(regions, backend)
@@ -0,0 +1,78 @@
+import gzip
+import json
+import sys
+from pathlib import Path
+
+import pytest
+from dash import Dash, Input, Output, html
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import http_cache
+
+BODY = {
+    "output": "out.children",
+    "outputs": {"id": "out", "property": "children"},
+    "inputs": [{"id": "in", "property": "value", "value": "north"}],
+    "changedPropIds": ["in.value"],
+    "state": [],
+}
+
+
+@pytest.fixture
+def client():
+    state = {"version": "v1", "calls": 0}
+    app = Dash(__name__)
+    app.layout = html.Div([html.Div(id="in"), html.Div(id="out")])
+
+    @app.callback(Output("out", "children"), Input("in", "value"))
+    def _echo(value):
+        state["calls"] += 1
+        return str(value) * 1000
+
+    http_cache.install(app, lambda: state["version"], min_bytes=100)
+    return app.server.test_client(), state
+
+
+def test_large_responses_are_gzipped(client):
+    """Callback bodies over the threshold are gzipped for clients that accept it."""
+    test_client, _ = client
+    response = test_client.post("/_dash-update-component", json=BODY, headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    payload = json.loads(gzip.decompress(response.get_data()))
+    assert payload["response"]["out"]["children"].startswith("north")
+
+
+def test_uncompressed_without_accept_encoding(client):
+    """Clients that do not ask for compression get plain JSON with a base ETag."""
+    test_client, _ = client
+    response = test_client.post("/_dash-update-component", json=BODY)
+    assert "Content-Encoding" not in response.headers
+    assert response.headers["ETag"].strip('"') == http_cache.request_etag("v1", BODY)
+
+
+def test_matching_etag_skips_the_callback(client):
+    """A repeat request with If-None-Match gets 304 without running the callback."""
+    test_client, state = client
+    first = test_client.post("/_dash-update-component", json=BODY, headers={"Accept-Encoding": "gzip"})
+    etag = first.headers["ETag"]
+    repeat = test_client.post("/_dash-update-component", json=BODY,
+                              headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert repeat.status_code == 304
+    assert repeat.headers["ETag"] == etag
+    assert state["calls"] == 1
+
+
+def test_etag_changes_with_version_and_inputs(client):
+    """A new dataset version or different inputs produce a different ETag."""
+    test_client, state = client
+    etag = test_client.post("/_dash-update-component", json=BODY).headers["ETag"]
+    state["version"] = "v2"
+    stale = test_client.post("/_dash-update-component", json=BODY, headers={"If-None-Match": etag})
+    assert stale.status_code == 200
+    assert stale.headers["ETag"] != etag
+    other = dict(BODY, inputs=[{"id": "in", "property": "value", "value": "south"}])
+    assert http_cache.request_etag("v2", other) != http_cache.request_etag("v2", BODY)
@@ -0,0 +1,71 @@
+import io
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import ingest
+from merge_file import process_frame
+
+HEADER = ["product", "price", "quantity", "date", "region"]
+ROWS = (
+    "pink morsel,$3.00,10,2021-01-14,north\n"
+    "gold morsel,$9.99,5,2021-01-14,north\n"
+    "pink morsel,$5.00,4,2021-01-15,south\n"
+)
+BAD = (
+    "pink morsel,$3.00,10,2021-01-14,north\n"
+    "\n"
+    "pink morsel,$x,10,2021-01-14,north\n"
+    "pink morsel,$3.00,2.5,2021-01-14,north\n"
+    "pink morsel,$3.00\n"
+    "pink morsel,$3.00,1,2021-02-30,north\n"
+    "pink morsel,$3.00,1,2021-01-14,north,extra\n"
+    "pink morsel,$5.00,4,2021-01-15,south\n"
+)
+
+
+@pytest.mark.parametrize("engine", ingest.ENGINES)
+def test_valid_rows_parse_to_typed_columns(engine):
+    """Clean rows come back typed and process into the same merged rows as before."""
+    parsed = ingest.parse_chunk(ROWS.encode(), HEADER, engine)
+    assert parsed.quarantine == []
+    assert parsed.frame["quantity"].dtype == "int64"
+    assert list(parsed.frame["price"]) == [3.0, 9.99, 5.0]
+    raw = pd.read_csv(io.StringIO(ROWS), header=None, names=HEADER)
+    pd.testing.assert_frame_equal(process_frame(parsed.frame), process_frame(raw))
+
+
+@pytest.mark.parametrize("engine", ingest.ENGINES)
+def test_malformed_rows_are_quarantined(engine):
+    """Bad rows are set aside with their line and reason; the rest are kept."""
+    parsed = ingest.parse_chunk(BAD.encode(), HEADER, engine)
+    assert list(parsed.frame["region"]) == ["north", "south"]
+    assert [(line, reason) for line, reason, _ in parsed.quarantine] == [
+        (2, "bad price"),
+        (3, "bad quantity"),
+        (4, "expected 5 fields, saw 2"),
+        (5, "bad date"),
+        (6, "expected 5 fields, saw 6"),
+    ]
+    assert parsed.quarantine[0][2] == "pink morsel,$x,10,2021-01-14,north"
+
+
+@pytest.mark.parametrize("engine", ingest.ENGINES)
+def test_empty_quantity_is_quarantined(engine):
+    """An empty quantity cell is quarantined and the rest stay integers."""
+    parsed = ingest.parse_chunk(b"pink morsel,$3.00,,2021-01-14,north\n" + ROWS.encode(), HEADER, engine)
+    assert [(line, reason) for line, reason, _ in parsed.quarantine] == [(0, "bad quantity")]
+    assert parsed.frame["quantity"].dtype == "int64"
+    assert list(parsed.frame["quantity"]) == [10, 5, 4]
+
+
+def test_missing_columns_are_rejected():
+    """A header without a schema column is an error rather than quarantined rows."""
+    with pytest.raises(ValueError, match="quantity"):
+        ingest.check_header(["product", "price", "date", "region"], "data/x.csv")
@@ -0,0 +1,66 @@
+import random
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+from werkzeug.serving import make_server
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+for path in (PROJECT_ROOT, PROJECT_ROOT / "benchmarks"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+import backends
+import sales_visulaizers
+from load_test import callback_body, check_gates, region_dependency, run_load, session_regions, summarize
+
+
+def test_sessions_start_on_all_and_always_switch():
+    """Every session opens on "all" and each step changes the region."""
+    regions = session_regions(random.Random(1), 10)
+    assert regions[0] == "all" and len(regions) == 11
+    assert all(a != b for a, b in zip(regions, regions[1:]))
+
+
+def test_summary_percentiles_and_gates():
+    """Percentiles come out in milliseconds and gates flag slow or failing runs."""
+    report = summarize([i / 1000 for i in range(1, 101)], errors=0, elapsed=2.0)
+    assert report["throughput_rps"] == 50.0
+    assert round(report["p50_ms"], 1) == 50.5
+    assert check_gates(report, max_p95_ms=200) == []
+    assert check_gates(report, max_p95_ms=10)[0].startswith("p95_ms")
+    assert check_gates(summarize([0.1, 0.1], errors=1, elapsed=1.0))[0].startswith("error rate")
+
+
+def test_load_against_local_server(tmp_path):
+    """A short run against an in-process server completes requests without errors."""
+    csv_path = tmp_path / "sales.csv"
+    csv_path.write_text("Sales,Quantity,Price,Date,Region\n3.0,1,3.0,2021-01-14,north\n5.0,1,5.0,2021-01-15,east\n")
+    app = sales_visulaizers.create_app(backend=backends.CubeBackend(csv_path, "2021-01-15"))
+    server = make_server("127.0.0.1", 0, app.server, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        report = run_load(f"http://127.0.0.1:{server.port}", concurrency=2, duration=0.5)
+    finally:
+        server.shutdown()
+    assert report["requests"] > 0
+    assert report["errors"] == 0
+
+
+def test_callback_body_matches_the_served_callback(tmp_path):
+    """The body built from /_dash-dependencies runs the region callback; other modes are refused."""
+    csv_path = tmp_path / "sales.csv"
+    csv_path.write_text("Sales,Quantity,Price,Date,Region\n3.0,1,3.0,2021-01-14,north\n")
+    client = sales_visulaizers.create_app(backend=backends.CubeBackend(csv_path, "2021-01-15")).server.test_client()
+    dependency = region_dependency(client.get("/_dash-dependencies").get_json())
+    for body in (callback_body("north"), callback_body("north", dependency=dependency)):
+        response = client.post("/_dash-update-component", json=body)
+        assert response.status_code == 200
+        assert response.get_json()["response"]["total-sales"]["children"] == "$3"
+
+    with pytest.raises(RuntimeError, match="browser"):
+        region_dependency([dict(dependency, clientside_function={"namespace": "dashboard"})])
+    with pytest.raises(RuntimeError, match="background"):
+        region_dependency([dict(dependency, background={"interval": 250})])
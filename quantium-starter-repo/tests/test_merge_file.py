@@ -0,0 +1,133 @@
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import rollups
+from merge_file import (load_manifest, merge_files, merge_incremental, process_frame, quarantine_path_for,
+                        split_file)
+
+RAW = (
+    "product,price,quantity,date,region\n"
+    "pink morsel,$3.00,10,2021-01-14,north\n"
+    "gold morsel,$9.99,5,2021-01-14,north\n"
+    "pink morsel,$5.00,4,2021-01-15,south\n"
+    "pink morsel,$5.00,7,2021-01-16,east\n"
+)
+
+
+def test_chunked_merge_matches_whole_file(tmp_path):
+    """Splitting inputs into tiny chunks produces the same rows as one pass."""
+    raw_paths = []
+    for i in range(2):
+        path = tmp_path / f"daily_sales_data_{i}.csv"
+        path.write_text(RAW)
+        raw_paths.append(str(path))
+
+    output = str(tmp_path / "merged.csv")
+    merge_files(raw_paths, output, chunk_size_mb=40 / (1024 * 1024), workers=1)
+
+    expected = pd.concat([process_frame(pd.read_csv(p)) for p in raw_paths], ignore_index=True)
+    merged = pd.read_csv(output)
+    pd.testing.assert_frame_equal(merged, expected)
+    assert list(merged["Sales"]) == [30.0, 20.0, 35.0] * 2
+
+
+def test_incremental_merge_appends_only_new_files(tmp_path):
+    """New inputs are appended; a changed input forces a full rebuild."""
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    (data_dir / "daily_sales_data_0.csv").write_text(RAW)
+    pattern = str(data_dir / "daily_sales_data_*.csv")
+    output = str(tmp_path / "merged.csv")
+
+    assert merge_incremental(pattern, output, workers=1)[0] == "full"
+    assert merge_incremental(pattern, output, workers=1) == ("up-to-date", [])
+
+    (data_dir / "daily_sales_data_1.csv").write_text(RAW.replace("north", "west"))
+    mode, merged = merge_incremental(pattern, output, workers=1)
+    assert mode == "append"
+    assert merged == [(data_dir / "daily_sales_data_1.csv").as_posix()]
+    assert list(pd.read_csv(output)["Region"]) == ["north", "south", "east", "west", "south", "east"]
+    assert load_manifest(output)["files"][merged[0]]["rows"] == 3
+
+    (data_dir / "daily_sales_data_0.csv").write_text(RAW.replace("$5.00", "$6.00"))
+    assert merge_incremental(pattern, output, workers=1)[0] == "full"
+    assert list(pd.read_csv(output)["Price"]) == [3.0, 6.0, 6.0, 3.0, 5.0, 5.0]
+
+
+def test_partitioned_merge_writes_every_product_by_month(tmp_path):
+    """One pass writes all products into product/month partitions; new inputs are appended."""
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    (data_dir / "daily_sales_data_0.csv").write_text(RAW)
+    pattern = str(data_dir / "daily_sales_data_*.csv")
+    root = tmp_path / "partitions"
+
+    assert merge_incremental(pattern, root, workers=1, partitioned=True)[0] == "full"
+    pink = pd.read_csv(root / "product=pink-morsel" / "month=2021-01" / "part.csv")
+    assert list(pink["Sales"]) == [30.0, 20.0, 35.0]
+    gold = pd.read_csv(root / "product=gold-morsel" / "month=2021-01" / "part.csv")
+    assert list(gold["Quantity"]) == [5]
+
+    (data_dir / "daily_sales_data_1.csv").write_text(RAW.replace("2021-01-16", "2021-02-01"))
+    assert merge_incremental(pattern, root, workers=1, partitioned=True)[0] == "append"
+    assert len(pd.read_csv(root / "product=pink-morsel" / "month=2021-01" / "part.csv")) == 5
+    assert len(pd.read_csv(root / "product=pink-morsel" / "month=2021-02" / "part.csv")) == 1
+
+
+def test_appended_days_update_rollups_incrementally(tmp_path):
+    """After an append the rollup file equals one rebuilt from every input."""
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    (data_dir / "daily_sales_data_0.csv").write_text(RAW)
+    pattern = str(data_dir / "daily_sales_data_*.csv")
+    output = tmp_path / "merged.csv"
+
+    merge_incremental(pattern, str(output), workers=1)
+    (data_dir / "daily_sales_data_1.csv").write_text(RAW.replace("2021-01-16", "2021-02-01"))
+    assert merge_incremental(pattern, str(output), workers=1)[0] == "append"
+    appended = rollups.read_levels(rollups.rollups_path(output))
+
+    merge_incremental(pattern, str(output), workers=1, full=True)
+    pd.testing.assert_frame_equal(appended, rollups.read_levels(rollups.rollups_path(output)))
+    monthly = appended[(appended["Level"] == "monthly") & (appended["Region"] == "all")]
+    assert list(monthly["Date"]) == ["2021-01-01", "2021-02-01"]
+
+
+def test_malformed_rows_are_quarantined_with_file_lines(tmp_path):
+    """Bad source rows are skipped, listed by file line and counted in the manifest."""
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    (data_dir / "daily_sales_data_0.csv").write_text(RAW + "pink morsel,$5.00,oops,2021-01-17,east\n"
+                                                      + RAW.split("\n", 1)[1])
+    pattern = str(data_dir / "daily_sales_data_*.csv")
+    output = str(tmp_path / "merged.csv")
+
+    merge_incremental(pattern, output, chunk_size_mb=60 / (1024 * 1024), workers=1)
+    assert len(pd.read_csv(output)) == 6
+    quarantine = pd.read_csv(quarantine_path_for(output))
+    assert list(quarantine["line"]) == [6]
+    assert list(quarantine["reason"]) == ["bad quantity"]
+    source = (data_dir / "daily_sales_data_0.csv").as_posix()
+    assert load_manifest(output)["files"][source]["quarantined"] == 1
+
+
+def test_split_file_handles_bom_and_quoted_newlines(tmp_path):
+    """A BOM is dropped from the header and files with quoted fields stay in one chunk."""
+    path = tmp_path / "daily_sales_data_0.csv"
+    path.write_bytes("\ufeff".encode("utf-8") + RAW.encode("utf-8"))
+    header, ranges = split_file(path, 40)
+    assert header[0] == "product"
+    assert len(ranges) > 1
+
+    path.write_text(RAW + '"pink\nmorsel",$5.00,7,2021-01-17,east\n' + RAW.split("\n", 1)[1])
+    output = str(tmp_path / "merged.csv")
+    merge_incremental(str(path), output, chunk_size_mb=40 / (1024 * 1024), workers=1)
+    assert len(split_file(path, 40)[1]) == 1
+    assert len(pd.read_csv(output)) == 6
+    assert load_manifest(output)["files"][path.as_posix()]["quarantined"] == 0
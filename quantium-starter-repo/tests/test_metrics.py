@@ -0,0 +1,62 @@
+import gzip
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+for path in (PROJECT_ROOT, PROJECT_ROOT / "benchmarks"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+import backends
+import sales_visulaizers
+from load_test import callback_body
+from metrics import RESPONSE_BYTES, Counter, Histogram, Registry
+from sales_visulaizers import app
+
+
+def test_histogram_renders_cumulative_buckets():
+    """Bucket counts are cumulative and end with +Inf, _sum and _count."""
+    registry = Registry()
+    latency = registry.register(Histogram("latency_seconds", "Latency.", ["input"], buckets=(0.1, 1.0)))
+    hits = registry.register(Counter("hits_total", "Hits.", ["cache"]))
+    latency.observe(0.05, input="north")
+    latency.observe(0.5, input="north")
+    hits.inc(cache="dataset")
+
+    text = registry.render()
+    assert 'latency_seconds_bucket{input="north",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{input="north",le="+Inf"} 2' in text
+    assert 'latency_seconds_count{input="north"} 2' in text
+    assert 'hits_total{cache="dataset"} 1' in text
+
+
+def test_metrics_endpoint_is_local_only():
+    """The dashboard serves /metrics to loopback clients and refuses others."""
+    client = app.server.test_client()
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert b"dashboard_dataset_load_seconds" in response.data
+    assert client.get("/metrics", environ_base={"REMOTE_ADDR": "10.1.2.3"}).status_code == 403
+
+
+def test_payload_sizes_are_uncompressed_and_skip_not_modified(tmp_path):
+    """Callback payloads are measured before gzip, and 304 revalidations are not counted."""
+    csv_path = tmp_path / "sales.csv"
+    csv_path.write_text("".join(["Sales,Quantity,Price,Date,Region\n"]
+                                + [f"{day}.0,1,1.0,2021-01-{day:02d},north\n" for day in range(1, 29)]))
+    client = sales_visulaizers.create_app(backend=backends.CubeBackend(csv_path, "2021-01-15")).server.test_client()
+
+    def observed():
+        counts, total = RESPONSE_BYTES._values.get((), ([0], 0.0))
+        return sum(counts), total
+
+    count, total = observed()
+    first = client.post("/_dash-update-component", json=callback_body("north"), headers={"Accept-Encoding": "gzip"})
+    assert first.headers["Content-Encoding"] == "gzip"
+    plain = len(gzip.decompress(first.get_data()))
+    assert observed() == (count + 1, total + plain)
+
+    again = client.post("/_dash-update-component", json=callback_body("north"),
+                        headers={"Accept-Encoding": "gzip", "If-None-Match": first.headers["ETag"]})
+    assert again.status_code == 304
+    assert observed() == (count + 1, total + plain)
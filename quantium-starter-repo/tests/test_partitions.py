@@ -0,0 +1,48 @@
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from data_cache import load_sales
+from partitions import list_partitions, partition_path, product_dir, read_partitions
+
+HEADER = "Sales,Quantity,Price,Date,Region\n"
+
+
+def _write(root, product, month, rows):
+    path = partition_path(root, product, month)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(HEADER + rows)
+
+
+def _layout(root):
+    _write(root, "pink morsel", "2021-01", "3.0,1,3.0,2021-01-14,north\n")
+    _write(root, "pink morsel", "2021-02", "5.0,1,5.0,2021-02-01,south\n")
+    _write(root, "gold morsel", "2021-01", "9.99,1,9.99,2021-01-14,north\n")
+
+
+def test_partitions_are_pruned_by_product(tmp_path):
+    """Only the requested products' partitions are selected, every month of each."""
+    _layout(tmp_path)
+    assert len(list_partitions(tmp_path)) == 3
+    assert list_partitions(tmp_path, ["pink morsel"]) == [
+        partition_path(tmp_path, "pink morsel", "2021-01"),
+        partition_path(tmp_path, "pink morsel", "2021-02"),
+    ]
+    both = read_partitions(tmp_path)
+    assert sorted(both["Product"]) == ["gold-morsel", "pink-morsel", "pink-morsel"]
+
+
+def test_load_sales_reads_a_product_directory(tmp_path):
+    """A product directory loads like a merged CSV and is re-versioned when a partition changes."""
+    _layout(tmp_path)
+    source = product_dir(tmp_path, "pink morsel")
+    df = load_sales(source)
+    assert list(df["Sales"]) == [3.0, 5.0]
+
+    _write(tmp_path, "pink morsel", "2021-03", "5.0,2,5.0,2021-03-01,east\n")
+    again = load_sales(source)
+    assert again.attrs["version"] != df.attrs["version"]
+    assert int(again["Quantity"].sum()) == 4
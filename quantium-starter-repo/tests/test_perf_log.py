@@ -0,0 +1,34 @@
+import json
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from perf_log import LogSink, StageTimer
+
+
+def test_sink_writes_queued_records_on_close(tmp_path):
+    """Records emitted from the hot path end up as JSON lines once the sink is closed."""
+    path = tmp_path / "perf.log"
+    sink = LogSink(str(path), flush_interval=0.01)
+    timer = StageTimer()
+    with timer.stage("filter"):
+        pass
+    for i in range(3):
+        sink.emit({"event": "update_dashboard", "i": i, **timer.timings})
+    sink.close()
+
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [r["i"] for r in records] == [0, 1, 2]
+    assert "filter_ms" in records[0]
+
+
+def test_sink_sampling_drops_records(tmp_path):
+    """A zero sample rate keeps nothing."""
+    path = tmp_path / "perf.log"
+    sink = LogSink(str(path), flush_interval=0.01, sample_rate=0.0)
+    sink.emit({"event": "x"})
+    sink.close()
+    assert not path.exists()
@@ -0,0 +1,47 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from price_stats import bootstrap_means, price_change_stats
+
+
+def _series(days, level_before, level_after, rng):
+    dates = pd.date_range("2021-01-01", periods=days, freq="D")
+    sales = np.where(dates < "2021-01-15", level_before, level_after) + rng.normal(0, 1, days)
+    return dates, {"sales": sales, "quantity": np.round(sales / 3)}
+
+
+def test_bootstrap_means_of_constant_samples_are_exact():
+    """Resampling constant days returns the constant; short and empty samples are handled."""
+    samples = [np.full((5, 1), 2.0), np.full((2, 1), 7.0), np.zeros((0, 1))]
+    means = bootstrap_means(samples, 50, np.random.default_rng(0))
+    assert means.shape == (50, 3, 1)
+    assert np.allclose(means[:, 0, 0], 2.0)
+    assert np.allclose(means[:, 1, 0], 7.0)
+    assert np.isnan(means[:, 2, 0]).all()
+
+
+def test_interval_covers_the_true_shift_per_region():
+    """Per-day means are compared and the interval brackets each region's shift."""
+    rng = np.random.default_rng(3)
+    series = {"north": _series(28, 10.0, 15.0, rng), "south": _series(28, 10.0, 10.0, rng)}
+    stats = price_change_stats(series, "2021-01-15", n_boot=500)
+    north, south = stats["north", "sales"], stats["south", "sales"]
+    assert (north.pre_days, north.post_days) == (14, 14)
+    assert north.diff_low < 5.0 < north.diff_high and north.diff_low > 0
+    assert south.diff_low < 0.0 < south.diff_high
+    assert stats == price_change_stats(series, "2021-01-15", n_boot=500)
+
+
+def test_region_without_post_days_gets_nan():
+    """A region that never traded after the split has no difference or interval."""
+    dates = pd.date_range("2021-01-01", periods=5, freq="D")
+    stats = price_change_stats({"east": (dates, {"sales": np.ones(5)})}, "2021-02-01", n_boot=20)
+    assert stats["east", "sales"].pre_days == 5
+    assert np.isnan(stats["east", "sales"].diff_low)
@@ -0,0 +1,55 @@
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import rollups
+
+
+def _rows(days, region="north"):
+    dates = pd.date_range("2021-01-01", periods=days, freq="D").strftime("%Y-%m-%d")
+    return pd.DataFrame({"Sales": [float(i + 1) for i in range(days)], "Quantity": [1] * days,
+                         "Price": 1.0, "Date": dates, "Region": region})
+
+
+def _level(levels, level, region="all"):
+    return levels[(levels["Level"] == level) & (levels["Region"] == region)]
+
+
+def test_weeks_start_on_monday_and_months_on_the_first():
+    """Weekly and monthly totals are labelled by period start and add up to the daily totals."""
+    levels = rollups.build_levels(rollups.daily_totals(_rows(40)))
+    weekly = _level(levels, "weekly")
+    assert weekly["Date"].iloc[0] == "2020-12-28"
+    assert set(pd.to_datetime(weekly["Date"]).dt.weekday) == {0}
+    assert weekly["Sales"].sum() == _level(levels, "daily")["Sales"].sum()
+    assert list(_level(levels, "monthly")["Sales"]) == [sum(range(1, 32)), sum(range(32, 41))]
+
+
+def test_rolling_levels_average_full_windows_only():
+    """Rolling levels start once a full window exists and count missing days as zero."""
+    daily = rollups.daily_totals(_rows(10).drop(index=8))
+    rolling = _level(rollups.build_levels(daily), "rolling7")
+    assert rolling["Date"].iloc[0] == "2021-01-07"
+    assert rolling["Sales"].iloc[0] == sum(range(1, 8)) / 7
+    assert rolling["Sales"].iloc[-1] == (4 + 5 + 6 + 7 + 8 + 10) / 7
+
+
+def test_update_matches_full_rebuild():
+    """Folding new days into existing rollups equals building them from every row."""
+    rows = pd.concat([_rows(60), _rows(45, region="South")], ignore_index=True)
+    old, new = rows[rows["Date"] < "2021-02-10"], rows[rows["Date"] >= "2021-02-10"]
+    updated = rollups.update_levels(rollups.build_levels(rollups.daily_totals(old)), rollups.daily_totals(new))
+    pd.testing.assert_frame_equal(updated, rollups.build_levels(rollups.daily_totals(rows)))
+
+
+def test_level_series_keeps_one_period_beyond_the_window():
+    """A zoomed window includes the nearest period label on either side."""
+    levels = rollups.build_levels(rollups.daily_totals(_rows(90)))
+    dates, sales, _ = rollups.level_series(levels, "monthly", "north", "2021-02-10", "2021-02-20")
+    assert [d.month for d in dates] == [2, 3]
+    assert len(sales) == 2
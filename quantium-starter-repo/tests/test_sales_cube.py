@@ -0,0 +1,84 @@
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from sales_cube import build_cube
+
+
+def _sample_frame():
+    return pd.DataFrame(
+        {
+            "Date": pd.to_datetime(["2021-01-14", "2021-01-14", "2021-01-15", "2021-01-16", "2021-01-16"]),
+            "Region": ["north", "South", "north", "north", "south"],
+            "Sales": [10.0, 20.0, 30.0, 40.0, 50.0],
+            "Quantity": [1, 2, 3, 4, 5],
+        }
+    )
+
+
+def test_all_view_matches_groupby():
+    """The "all" column equals a plain groupby over every row."""
+    df = _sample_frame()
+    view = build_cube(df, "2021-01-15").view("all")
+    expected = df.groupby("Date")[["Sales", "Quantity"]].sum()
+    assert list(view.dates) == list(expected.index)
+    assert list(view.sales) == list(expected["Sales"])
+    assert list(view.quantity) == list(expected["Quantity"])
+    assert view.before_sales == 30.0
+    assert view.after_sales == 120.0
+    assert view.total_quantity == 15
+
+
+def test_region_view_skips_days_without_rows():
+    """Regions are matched case-insensitively and only list days they traded."""
+    view = build_cube(_sample_frame(), "2021-01-15").view("south")
+    assert [d.day for d in view.dates] == [14, 16]
+    assert list(view.sales) == [20.0, 50.0]
+    assert view.before_quantity == 2
+    assert view.after_quantity == 5
+
+
+def test_unknown_region_is_empty():
+    """An unknown region yields an empty series and zero totals."""
+    view = build_cube(_sample_frame(), "2021-01-15").view("atlantis")
+    assert len(view.dates) == 0
+    assert view.total_sales == 0.0
+
+
+def test_payload_lists_region_positions_only_when_sparse():
+    """The browser payload shares one date list and indexes into it for sparse regions."""
+    payload = build_cube(_sample_frame(), "2021-01-15").to_payload()
+    assert payload["dates"] == ["2021-01-14", "2021-01-15", "2021-01-16"]
+    assert payload["split_date"] == "2021-01-15"
+    assert payload["regions"]["all"]["index"] is None
+    assert payload["regions"]["south"] == {"index": [0, 2], "sales": [20.0, 50.0], "quantity": [2, 5]}
+
+
+def test_window_totals_use_inclusive_bounds():
+    """Window totals include both end days and match a masked sum."""
+    cube = build_cube(_sample_frame(), "2021-01-15")
+    totals = cube.window_totals("all", "2021-01-15", "2021-01-16")
+    assert (totals.sales, totals.quantity, totals.days) == (120.0, 12, 2)
+    assert cube.window_totals("north").quantity == 8
+    assert cube.window_totals("south", "2021-01-15", "2021-01-15").days == 0
+
+
+def test_split_totals_with_moved_split_and_window():
+    """Moving the split or narrowing the window only changes the lookups."""
+    cube = build_cube(_sample_frame(), "2021-01-15")
+    before, after = cube.split_totals("all", "2021-01-16", start="2021-01-15")
+    assert (before.sales, after.sales) == (30.0, 90.0)
+    before, after = cube.split_totals("north", "2020-01-01")
+    assert (before.quantity, after.quantity) == (0, 8)
+
+
+def test_period_over_period_compares_equal_lengths():
+    """The previous period is the same number of days immediately before."""
+    cube = build_cube(_sample_frame(), "2021-01-15")
+    current, previous = cube.period_over_period("all", "2021-01-16", "2021-01-16")
+    assert (current.sales, previous.sales) == (90.0, 30.0)
@@ -0,0 +1,26 @@
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+for path in (PROJECT_ROOT, PROJECT_ROOT / "benchmarks"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from merge_file import merge_files
+from synthetic_data import generate
+
+
+def test_generated_files_merge_like_real_drops(tmp_path):
+    """Synthetic inputs have the raw schema and the Pink Morsels price increase."""
+    paths = generate(tmp_path / "data", rows=3000, files=2, chunk_rows=700)
+    assert [Path(p).name for p in paths] == ["daily_sales_data_0.csv", "daily_sales_data_1.csv"]
+    assert sum(len(pd.read_csv(p)) for p in paths) == 3000
+
+    output = tmp_path / "merged.csv"
+    merge_files(paths, str(output), workers=1)
+    merged = pd.read_csv(output, parse_dates=["Date"])
+    assert not merged.empty
+    assert set(merged.loc[merged["Date"] < "2021-01-15", "Price"]) == {3.0}
+    assert set(merged.loc[merged["Date"] >= "2021-01-15", "Price"]) == {5.0}
@@ -0,0 +1,15 @@
+"""Production entry point for multi-worker serving:
+
+    gunicorn -c gunicorn.conf.py wsgi:server
+
+Defaults to the ``mmap`` backend: the prepared cube is written once and
+every worker maps it read-only (see dataset_store.open_shared_cube).
+"""
+import os
+
+os.environ.setdefault("DASHBOARD_BACKEND", "mmap")
+
+import sales_visulaizers  # noqa: E402
+
+app = sales_visulaizers.app
+server = app.server